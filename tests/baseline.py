@@ -0,0 +1,124 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for regression detection
+import json
+import statistics
+from collections import defaultdict, deque
+import results_store
+
+# Number of most recent samples per board used for its median
+window = 5
+# Minimum number of sibling boards with history needed to build a baseline
+min_boards = 3
+# Robust z-score beyond which a measurement is a regression (Iglewicz and Hoaglin)
+z_threshold = 3.5
+
+# Regression check mode: off, warn or fail
+mode = "warn"
+
+# (board, label, metric) -> serial -> recent values, loaded on first check
+history = None
+
+
+def configure(regression_mode):
+    """
+    Set how regressions are reported
+
+    Args:
+            regression_mode: off, warn or fail
+    """
+    global mode, history
+    mode = regression_mode
+    history = None
+
+
+def load_history():
+    """
+    Read the recent samples of every board from the results file
+
+    Returns:
+            dict: (board, label, metric) -> serial -> deque of recent values
+    """
+    samples = defaultdict(lambda: defaultdict(lambda: deque(maxlen=window)))
+    store = results_store.store
+    if store is None:
+        return samples
+    try:
+        with open(store.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    key = (record['board'], record['label'], record['metric'])
+                    samples[key][record['serial']].append(float(record['value']))
+                except (ValueError, KeyError, TypeError):
+                    continue
+    except OSError:
+        pass
+    return samples
+
+
+def robust_z_score(value, sibling_medians):
+    """
+    Robust z-score of a value against the medians of the sibling boards
+
+    Args:
+            value: Value to score
+            sibling_medians: Median of the recent samples of each sibling board
+
+    Returns:
+            float/None: Robust z-score/None if the siblings show no spread
+    """
+    median = statistics.median(sibling_medians)
+    mad = statistics.median([abs(x - median) for x in sibling_medians])
+    if mad == 0:
+        return None
+    return 0.6745 * (value - median) / mad
+
+
+def check(label, metric, value, higher_is_better, logger):
+    """
+    Compare a measurement with the same measurement on sibling boards of the same model
+
+    The board's value is the median of its last samples and the new value, so a
+    single noisy run does not trigger a regression.
+
+    Args:
+            label: Test label
+            metric: Name of the measured quantity
+            value: Measured value
+            higher_is_better: True if lower values are worse, eg throughput
+            logger: Handle for logging
+
+    Returns:
+            bool: False if a regression was found and the mode is fail, True otherwise
+    """
+    global history
+    store = results_store.store
+    if mode == "off" or store is None:
+        return True
+    if history is None:
+        history = load_history()
+
+    serials = history.get((store.env['board'], label, metric), {})
+    sibling_medians = [statistics.median(values) for serial, values in serials.items()
+                       if serial != store.env['serial'] and values]
+    if len(sibling_medians) < min_boards:
+        logger.debug(f"No {metric} baseline yet: history of {len(sibling_medians)} of {min_boards} sibling boards")
+        return True
+
+    own_samples = list(serials.get(store.env['serial'], []))[-(window - 1):] + [float(value)]
+    own_median = statistics.median(own_samples)
+    z_score = robust_z_score(own_median, sibling_medians)
+    if z_score is None:
+        return True
+    baseline = round(statistics.median(sibling_medians), 2)
+    logger.debug(f"{metric}: median {round(own_median, 2)} vs baseline {baseline} of {len(sibling_medians)} boards, z-score {z_score:.2f}")
+    if (z_score < -z_threshold) if higher_is_better else (z_score > z_threshold):
+        message = (f"{metric} of {round(own_median, 2)} is significantly worse than the baseline of {baseline} "
+                   f"measured on {len(sibling_medians)} other boards (robust z-score {z_score:.2f})")
+        if mode == "fail":
+            logger.error(message)
+            return False
+        logger.warning(message)
+    return True
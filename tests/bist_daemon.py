@@ -0,0 +1,388 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for the BIST service
+import argparse
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import pytest
+import board_id
+import board_profiles
+import hw_discovery
+import results_store
+import baseline
+import sample_log
+import log_queue
+import cmd_cache
+import conftest
+import dependencies
+import device_pool
+import state_planner
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+default_socket = "/run/kria-bist.sock"
+
+# Same format as the pytest log file
+log_format = "%(asctime)s [%(levelname)8s] [%(label)s] %(message)s"
+log_date_format = "%Y-%m-%d %H:%M:%S"
+
+
+class TestRunner:
+    """
+    Runs BIST tests in the service process
+
+    Test modules, hardware libraries, the hardware index and the pooled device handles
+    stay loaded between requests. Test functions are called directly with the fixtures they use, one
+    test at a time.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.lock = threading.Lock()
+        self.modules = {}
+        self.subscribers = []
+        self.subscribers_lock = threading.Lock()
+
+    def load_module(self, module):
+        """
+        Args:
+                module: Test module name, eg gpio
+
+        Returns:
+                list: Test functions of the module, without the benchmarks
+        """
+        if module not in self.modules:
+            module_dir = os.path.join(tests_dir, module)
+            if module_dir not in sys.path:
+                sys.path.insert(0, module_dir)
+            path = os.path.join(module_dir, f"test_bist_{module}.py")
+            spec = importlib.util.spec_from_file_location(f"test_bist_{module}", path)
+            source = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(source)
+            # Benchmarks are only run by pytest --benchmark
+            self.modules[module] = [function for name, function in inspect.getmembers(source, inspect.isfunction)
+                                    if name.startswith("test_") and function.__module__ == source.__name__
+                                    and not any(mark.name == "benchmark" for mark in getattr(function, "pytestmark", []))]
+        return self.modules[module]
+
+    def list_tests(self):
+        """
+        Returns:
+                list: Module and label of every test of the board
+        """
+        return [{'module': module, 'label': label}
+                for module, (entries, labels) in sorted(board_profiles.registry.get(self.board, {}).items())
+                for label in labels]
+
+    def subscribe(self):
+        """
+        Returns:
+                queue.Queue: Queue receiving every result from now on
+        """
+        subscriber = queue.Queue()
+        with self.subscribers_lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.subscribers_lock:
+            self.subscribers.remove(subscriber)
+
+    def publish(self, result):
+        with self.subscribers_lock:
+            for subscriber in self.subscribers:
+                subscriber.put(result)
+
+    def run_function(self, function, entry):
+        """
+        Call a test function with its fixtures
+
+        Args:
+                function: Test function
+                entry: Config entry of the test
+
+        Returns:
+                str: Outcome, passed/failed/skipped
+                str: Reason of a failure or skip
+        """
+        fixtures = {'id': entry, 'helpers': conftest.Helpers, 'hw_index': hw_discovery.get_index(),
+                    'devices': device_pool.get_pool()}
+        parameters = inspect.signature(function).parameters
+        missing = [name for name in parameters if name not in fixtures]
+        if missing:
+            return "skipped", f"Fixtures {missing} are only available when run with pytest"
+        try:
+            function(**{name: fixtures[name] for name in parameters})
+        except AssertionError as e:
+            return "failed", str(e)
+        except pytest.skip.Exception as e:
+            return "skipped", str(e.msg)
+        except Exception as e:
+            return "failed", f"{type(e).__name__}: {e}"
+        return "passed", ""
+
+    def run_test(self, module, label, outcomes=None):
+        """
+        Run the test functions of a module for one config entry
+
+        Prerequisites declared by the entry are run first, unless they already ran
+        in the same request.
+
+        Args:
+                module: Test module name
+                label: Label of the config entry
+                outcomes: (module, label) -> outcome of the tests run by the request, None for a new request
+
+        Returns:
+                list: Result of each test function
+        """
+        if outcomes is None:
+            outcomes = {}
+        parameters = board_profiles.get_parameters(self.board, module)
+        entries = {entry['label']: entry for entry in parameters[0]} if parameters else {}
+        if label not in entries:
+            result = {'event': 'result', 'module': module, 'label': label, 'outcome': 'error',
+                      'message': f"No {module} test {label} on {self.board}"}
+            self.publish(result)
+            return [result]
+        entry = entries[label]
+
+        results = []
+        failed_prerequisite = None
+        for key in dependencies.get_depends(module, entry):
+            if key not in outcomes:
+                results.extend(self.run_test(*key, outcomes))
+            if outcomes[key] != "passed" and failed_prerequisite is None:
+                failed_prerequisite = key
+        for function in self.load_module(module):
+            result = {'event': 'result', 'test': f"{module}/test_bist_{module}.py::{function.__name__}[{label}]",
+                      'module': module, 'label': label}
+            if 'console' in entry.get('resources', []):
+                outcome, message, duration, phases = "skipped", "Interactive test, run it with pytest", 0, {}
+            elif failed_prerequisite:
+                outcome, message, duration, phases = ("skipped", f"Prerequisite {failed_prerequisite[1]} "
+                                                      f"{outcomes[failed_prerequisite]}", 0, {})
+            else:
+                with self.lock:
+                    conftest.test_phases.clear()
+                    start = time.monotonic()
+                    state_planner.begin_test(entry.get('setup_state'))
+                    outcome, message = self.run_function(function, entry)
+                    duration = time.monotonic() - start
+                    state_planner.leave(conftest.Helpers.logger_init(label))
+                    device_pool.get_pool().end_test(conftest.Helpers.logger_init(label))
+                    sample_log.flush()
+                    phases = conftest.finish_phases(label)
+                    results_store.flush()
+                    log_queue.flush()
+            result.update({'outcome': outcome, 'message': message, 'duration': round(duration, 3),
+                           'phases': {name: round(seconds, 3) for name, seconds in phases.items()}})
+            dependencies.record((module, label), outcome, outcomes)
+            self.publish(result)
+            results.append(result)
+        return results
+
+    def run_suite(self, modules=None):
+        """
+        Run every test of the board, or of some modules
+
+        Args:
+                modules: Test module names, None for all
+
+        Yields:
+                dict: Result of each test function as it completes
+        """
+        outcomes = {}
+        for test in self.list_tests():
+            if (modules is None or test['module'] in modules) and \
+               (test['module'], test['label']) not in outcomes:
+                yield from self.run_test(test['module'], test['label'], outcomes)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Serves the JSON lines requests of one client connection
+
+    Every request is answered with a stream of JSON events ending with a "done" event.
+    """
+
+    def send(self, event):
+        self.wfile.write((json.dumps(event) + "\n").encode())
+        self.wfile.flush()
+
+    def send_results(self, results):
+        counts = {'passed': 0, 'failed': 0, 'skipped': 0, 'error': 0}
+        for result in results:
+            self.send(result)
+            counts[result['outcome']] += 1
+        self.send({'event': 'done', **counts})
+
+    def handle(self):
+        runner = self.server.runner
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                command = request['cmd']
+            except (ValueError, KeyError, TypeError):
+                self.send({'event': 'done', 'error': "Invalid request"})
+                continue
+            if command == "list":
+                self.send({'event': 'tests', 'board': runner.board, 'tests': runner.list_tests()})
+                self.send({'event': 'done'})
+            elif command == "run_test":
+                # Prerequisites are run once per request, the hardware may have changed since the last one
+                self.send_results(runner.run_test(request.get('module'), request.get('label')))
+            elif command == "run_suite":
+                self.send_results(runner.run_suite(request.get('modules')))
+            elif command == "stream_results":
+                self.stream_results()
+                return
+            elif command == "rediscover":
+                with runner.lock:
+                    device_pool.get_pool().close_all(conftest.Helpers.logger_init("bist_daemon"))
+                hw_discovery.reset()
+                cmd_cache.invalidate()
+                self.send({'event': 'done'})
+            else:
+                self.send({'event': 'done', 'error': f"Unknown command {command}"})
+
+    def stream_results(self):
+        runner = self.server.runner
+        subscriber = runner.subscribe()
+        try:
+            while(1):
+                self.send(subscriber.get())
+        except OSError:
+            pass
+        finally:
+            runner.unsubscribe(subscriber)
+
+
+class BistServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(args):
+    """
+    Run the BIST service until interrupted
+
+    Args:
+            args: Parsed command line arguments
+    """
+    handler = logging.FileHandler(args.log_file)
+    handler.setFormatter(logging.Formatter(log_format, log_date_format, defaults={'label': 'bist_daemon'}))
+    logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.DEBUG)
+
+    board_profiles.load()
+    board = args.board
+    if board is None:
+        product, serial = board_id.identify_carrier()
+        board = board_id.get_product_board(product) if product else None
+    if board not in board_profiles.registry:
+        sys.exit(f"Unknown board {board}, use --board")
+    results_store.configure(args.results_file, board)
+    baseline.configure(args.regression_check)
+    sample_log.configure(args.samples_file)
+    # Warm up the hardware index, a section that fails is discovered again by the first test using it
+    for module in board_profiles.registry[board]:
+        try:
+            hw_discovery.discover([module])
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Discovery for {module} failed - {e}", extra={'label': 'bist_daemon'})
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    server = BistServer(args.socket, RequestHandler)
+    os.chmod(args.socket, 0o660)
+    server.runner = TestRunner(board)
+    # Stop cleanly when the service manager terminates the service
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
+        device_pool.get_pool().close_all(conftest.Helpers.logger_init("bist_daemon"))
+        results_store.flush()
+        sample_log.flush()
+        log_queue.stop()
+
+
+def request(message, socket_path=default_socket):
+    """
+    Send a request to the BIST service
+
+    Args:
+            message: Request, eg {'cmd': 'run_test', 'module': 'gpio', 'label': 'pmod0'}
+            socket_path: Path of the service socket
+
+    Yields:
+            dict: Events of the response
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall((json.dumps(message) + "\n").encode())
+        for line in client.makefile('r'):
+            event = json.loads(line)
+            yield event
+            if event['event'] == 'done':
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kria BIST service and client")
+    parser.add_argument("--socket", default=default_socket, help="Path of the service socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Run the service")
+    serve_parser.add_argument("--board", help="Board to use, identified from the carrier card FRU EEPROM if not given")
+    serve_parser.add_argument("--results-file", default="kria_bist_results.jsonl",
+                              help="File the numeric test results are appended to, empty to disable")
+    serve_parser.add_argument("--regression-check", choices=["off", "warn", "fail"], default="warn",
+                              help="Action on a result significantly worse than the same result on sibling boards")
+    serve_parser.add_argument("--samples-file", default="kria_bist_samples.bin",
+                              help="Binary file the per-sample measurements are appended to, empty to disable")
+    serve_parser.add_argument("--log-file", default="kria_bist_daemon.log", help="Log file of the service")
+    run_test_parser = commands.add_parser("run-test", help="Run one test")
+    run_test_parser.add_argument("module", help="Test module, eg gpio")
+    run_test_parser.add_argument("label", help="Test label, eg pmod0")
+    run_suite_parser = commands.add_parser("run-suite", help="Run every test, or the tests of some modules")
+    run_suite_parser.add_argument("modules", nargs="*", help="Test modules, all if none given")
+    commands.add_parser("list", help="List the tests of the board")
+    commands.add_parser("stream", help="Print the results of every test run by the service")
+    commands.add_parser("rediscover", help="Discover the hardware again on next use")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args)
+        return
+    if args.command == "run-test":
+        message = {'cmd': 'run_test', 'module': args.module, 'label': args.label}
+    elif args.command == "run-suite":
+        message = {'cmd': 'run_suite', 'modules': args.modules or None}
+    elif args.command == "stream":
+        message = {'cmd': 'stream_results'}
+    else:
+        message = {'cmd': args.command}
+    status = 0
+    for event in request(message, args.socket):
+        print(json.dumps(event), flush=True)
+        if event.get('failed') or event.get('error'):
+            status = 1
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
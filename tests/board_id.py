@@ -0,0 +1,190 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for board identification
+import glob
+import board_profiles
+
+# Carrier card FRU product name code -> board
+carrier_products = {
+    'KV': 'kv260',
+    'KR': 'kr260',
+    'KD': 'kd240',
+}
+
+boot_id_file = "/proc/sys/kernel/random/boot_id"
+
+# Cache keys, boot ID -> carrier serial number and carrier serial number -> product code
+boot_cache_key = "board_id/boot"
+serial_cache_key = "board_id/serial"
+
+
+def get_eeprom_file(eeprom_addr):
+    """
+    Args:
+            eeprom_addr: I2C address of the EEPROM, eg '50' for the SOM or '51' for the carrier card
+
+    Returns:
+            str/None: Sysfs path of the EEPROM
+    """
+    eeprom_files = glob.glob('/sys/devices/platform/axi/*.i2c/*/*' + eeprom_addr + '/eeprom')
+    return eeprom_files[0] if eeprom_files else None
+
+
+def decode_field(type_length, data):
+    """
+    Decode an IPMI FRU type/length encoded field
+
+    Args:
+            type_length: Type/length byte of the field
+            data: Field data
+
+    Returns:
+            str: Field value
+    """
+    field_type = type_length >> 6
+    if field_type == 3:
+        # 8-bit ASCII + Latin 1
+        return data.decode('latin-1').strip()
+    if field_type == 2:
+        # 6-bit packed ASCII, four characters in every three bytes
+        bits = int.from_bytes(data, 'little')
+        return "".join(chr(((bits >> (6 * i)) & 0x3f) + 0x20) for i in range(len(data) * 8 // 6)).strip()
+    if field_type == 1:
+        # BCD plus
+        bcd_plus = "0123456789 -.???"
+        return "".join(bcd_plus[byte >> 4] + bcd_plus[byte & 0xf] for byte in data).strip()
+    return data.hex()
+
+
+def parse_board_area(fru):
+    """
+    Parse the board info area of an IPMI FRU image
+
+    Args:
+            fru: Raw FRU image
+
+    Returns:
+            dict/None: Board info fields (manufacturer, product_name, serial_number, part_number)/None if
+                       the image has no valid board info area
+    """
+    if len(fru) < 8 or fru[0] != 0x01 or sum(fru[:8]) & 0xff:
+        return None
+    area_start = fru[3] * 8
+    if not area_start or area_start + 6 > len(fru):
+        return None
+    area_end = area_start + fru[area_start + 1] * 8
+    if area_end > len(fru) or sum(fru[area_start:area_end]) & 0xff:
+        return None
+
+    # Skip version, length, language code and 3 bytes of manufacturing date/time
+    offset = area_start + 6
+    fields = []
+    for name in ('manufacturer', 'product_name', 'serial_number', 'part_number'):
+        type_length = fru[offset]
+        if type_length == 0xc1:
+            break
+        length = type_length & 0x3f
+        fields.append((name, decode_field(type_length, fru[offset + 1:offset + 1 + length])))
+        offset += 1 + length
+    return dict(fields)
+
+
+def read_board_info(eeprom_addr):
+    """
+    Read the board info area of a FRU EEPROM
+
+    Args:
+            eeprom_addr: I2C address of the EEPROM
+
+    Returns:
+            dict/None: Board info fields/None if the EEPROM cannot be read or parsed
+    """
+    eeprom_file = get_eeprom_file(eeprom_addr)
+    if eeprom_file is None:
+        return None
+    try:
+        with open(eeprom_file, 'rb') as f:
+            fru = f.read(512)
+    except OSError:
+        return None
+    return parse_board_area(fru)
+
+
+def get_boot_id():
+    """
+    Returns:
+            str/None: ID of the current boot
+    """
+    try:
+        with open(boot_id_file, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def get_product_board(product):
+    """
+    Args:
+            product: Carrier card FRU product name code, eg KV
+
+    Returns:
+            str/None: Board with that carrier card
+    """
+    for name, profile in board_profiles.get_custom_boards().items():
+        if profile.get('fru_product') == product:
+            return name
+    return carrier_products.get(product)
+
+
+def get_board_product(board):
+    """
+    Args:
+            board: Board name
+
+    Returns:
+            str/None: Carrier card FRU product name code expected on the board
+    """
+    custom_boards = board_profiles.get_custom_boards()
+    if board in custom_boards:
+        profile = custom_boards[board]
+        return profile.get('fru_product') or get_board_product(profile.get('base'))
+    for product, name in carrier_products.items():
+        if name == board:
+            return product
+    return None
+
+
+def identify_carrier(cache=None):
+    """
+    Identify the carrier card from its FRU EEPROM at 0x51
+
+    The result is cached per carrier serial number, and the serial number per boot,
+    so later runs in the same boot do not read the EEPROM.
+
+    Args:
+            cache: Pytest cache, None disables caching
+
+    Returns:
+            str/None: Carrier card FRU product name code/None if it cannot be read
+            str/None: Carrier card serial number
+    """
+    boot_id = get_boot_id()
+    boots = cache.get(boot_cache_key, {}) if cache else {}
+    serials = cache.get(serial_cache_key, {}) if cache else {}
+    serial = boots.get(boot_id)
+    if serial in serials:
+        return serials[serial], serial
+
+    board_info = read_board_info('51')
+    if board_info is None or '-' not in board_info.get('product_name', ''):
+        return None, None
+    # Product name is of the form SCK-KV-G, with the carrier code in the middle
+    product = board_info['product_name'].split('-')[1]
+    serial = board_info.get('serial_number', '')
+    if cache and boot_id and serial:
+        serials[serial] = product
+        # Only the current boot can reuse the probe result
+        cache.set(serial_cache_key, serials)
+        cache.set(boot_cache_key, {boot_id: serial})
+    return product, serial
@@ -0,0 +1,224 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for the board profile registry
+import copy
+import glob
+import importlib.util
+import os
+import pickle
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+custom_boards_file = os.path.join(tests_dir, "custom_boards.py")
+
+# Keys allowed in a derived board profile
+derived_keys = {'base', 'fru_product', 'exclude', 'drop_labels', 'override', 'add'}
+
+# Board -> module -> (tuple of config entries, tuple of test IDs)
+registry = {}
+
+
+def get_source_files():
+    """
+    Returns:
+            list: Paths of the files the registry is built from
+    """
+    return sorted(glob.glob(os.path.join(tests_dir, "*", "bist_*_config.py"))) + [custom_boards_file]
+
+
+def load_source(path, attribute):
+    """
+    Load a dict from a python source file without importing it as a module
+
+    Args:
+            path: Path of the source file
+            attribute: Name of the dict in the file
+
+    Returns:
+            dict: Contents of the dict, empty if the file does not exist
+    """
+    if not os.path.exists(path):
+        return {}
+    spec = importlib.util.spec_from_file_location(os.path.basename(path)[:-3], path)
+    source = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(source)
+    return getattr(source, attribute)
+
+
+def get_custom_boards():
+    """
+    Returns:
+            dict: Custom board name -> derived profile, see custom_boards.py
+    """
+    return load_source(custom_boards_file, "custom_boards")
+
+
+def validate_entries(board, module, entries):
+    """
+    Check the config entries of a module for a board
+
+    Args:
+            board: Board name
+            module: Test module name
+            entries: List of config entries
+
+    Raises:
+            ValueError: An entry is malformed
+    """
+    where = f"{module} config for {board}"
+    labels = set()
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get('label'), str):
+            raise ValueError(f"{where}: every entry must be a dict with a 'label'")
+        if entry['label'] in labels:
+            raise ValueError(f"{where}: duplicate label '{entry['label']}'")
+        labels.add(entry['label'])
+        resources = entry.get('resources', [])
+        if not isinstance(resources, list) or not all(isinstance(resource, str) for resource in resources):
+            raise ValueError(f"{where}: 'resources' of '{entry['label']}' must be a list of names")
+        if not isinstance(entry.get('setup_state', ""), str):
+            raise ValueError(f"{where}: 'setup_state' of '{entry['label']}' must be a name")
+
+    # Prerequisites are tests of the same module, without cycles
+    depends = {}
+    for entry in entries:
+        depends[entry['label']] = entry.get('depends', [])
+        if not isinstance(depends[entry['label']], list) or \
+           not all(label in labels for label in depends[entry['label']]):
+            raise ValueError(f"{where}: 'depends' of '{entry['label']}' must be a list of labels of the module")
+
+    done = set()
+
+    def visit(label, chain):
+        if label in chain:
+            raise ValueError(f"{where}: circular 'depends' {' -> '.join(chain + [label])}")
+        if label not in done:
+            for prerequisite in depends[label]:
+                visit(prerequisite, chain + [label])
+            done.add(label)
+
+    for label in depends:
+        visit(label, [])
+
+
+def derive_board(name, profile, boards):
+    """
+    Build the config entries of a custom carrier from the board it is derived from
+
+    Args:
+            name: Custom board name
+            profile: Derived profile, see custom_boards.py
+            boards: Board -> module -> list of config entries of the base boards
+
+    Returns:
+            dict: Module -> list of config entries
+
+    Raises:
+            ValueError: The profile is malformed or refers to unknown modules or labels
+    """
+    unknown_keys = set(profile) - derived_keys
+    if unknown_keys:
+        raise ValueError(f"Custom board {name}: unknown keys {sorted(unknown_keys)}")
+    base = profile.get('base')
+    if base not in boards:
+        raise ValueError(f"Custom board {name}: unknown base board '{base}'")
+    modules = copy.deepcopy(boards[base])
+
+    for module in profile.get('exclude', []):
+        if module not in modules:
+            raise ValueError(f"Custom board {name}: cannot exclude '{module}', {base} has no such module")
+        del modules[module]
+
+    for module, labels in profile.get('drop_labels', {}).items():
+        entries = modules.get(module, [])
+        missing = set(labels) - {entry['label'] for entry in entries}
+        if missing:
+            raise ValueError(f"Custom board {name}: cannot drop {sorted(missing)} from '{module}'")
+        modules[module] = [entry for entry in entries if entry['label'] not in labels]
+
+    for module, overrides in profile.get('override', {}).items():
+        entries = {entry['label']: entry for entry in modules.get(module, [])}
+        for label, values in overrides.items():
+            if label not in entries:
+                raise ValueError(f"Custom board {name}: cannot override unknown '{module}' label '{label}'")
+            entries[label].update(values)
+
+    for module, entries in profile.get('add', {}).items():
+        modules.setdefault(module, []).extend(copy.deepcopy(entries))
+
+    return {module: entries for module, entries in modules.items() if entries}
+
+
+def build():
+    """
+    Load, validate and compile every board profile
+
+    Returns:
+            dict: Board -> module -> (tuple of config entries, tuple of test IDs)
+
+    Raises:
+            ValueError: A config or custom board profile is malformed
+    """
+    boards = {}
+    for path in get_source_files()[:-1]:
+        module = os.path.basename(os.path.dirname(path))
+        for board, entries in load_source(path, "supported_boards").items():
+            validate_entries(board, module, entries)
+            boards.setdefault(board, {})[module] = entries
+
+    for name, profile in get_custom_boards().items():
+        if name in boards:
+            raise ValueError(f"Custom board {name} shadows a supported board")
+        boards[name] = derive_board(name, profile, boards)
+        for module, entries in boards[name].items():
+            validate_entries(name, module, entries)
+
+    return {board: {module: (tuple(entries), tuple(entry['label'] for entry in entries))
+                    for module, entries in modules.items()}
+            for board, modules in boards.items()}
+
+
+def load(cache_dir=None):
+    """
+    Load the registry, from the on-disk cache if no source file changed since it was written
+
+    Args:
+            cache_dir: Directory of the pickled registry, None disables caching
+
+    Returns:
+            dict: Board -> module -> (tuple of config entries, tuple of test IDs)
+    """
+    global registry
+    key = [(path, os.stat(path).st_mtime_ns) for path in get_source_files() if os.path.exists(path)]
+    cache_file = os.path.join(cache_dir, "registry.pickle") if cache_dir else None
+    if cache_file:
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_key, cached_registry = pickle.load(f)
+            if cached_key == key:
+                registry = cached_registry
+                return registry
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+
+    registry = build()
+    if cache_file:
+        try:
+            with open(cache_file, 'wb') as f:
+                pickle.dump((key, registry), f)
+        except OSError:
+            pass
+    return registry
+
+
+def get_parameters(board, module):
+    """
+    Args:
+            board: Board name
+            module: Test module name
+
+    Returns:
+            tuple/None: (config entries, test IDs)/None if the module is not supported on the board
+    """
+    return registry.get(board, {}).get(module)
+
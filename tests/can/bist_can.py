@@ -2,12 +2,15 @@
 # SPDX-License-Identifier: MIT
 
 # Import the 'modules' that are required for test cases execution
-import can
-import glob
 import time
 import re
-import os
-import subprocess
+import hw_discovery
+import state_planner
+from cmd_cache import invalidate
+from proc_runner import run
+from lazy_import import lazy_import
+
+can = lazy_import("can")
 
 
 def get_can_node(can_controller, logger):
@@ -21,21 +24,12 @@ def get_can_node(can_controller, logger):
     Returns:
         str: CAN node
     """
-    can_base_path = f"/sys/class/net/can*/device/modalias"
-    can_modalias_files = glob.glob(can_base_path)
-    if not can_modalias_files:
+    can_interface = hw_discovery.get_index().can_node(can_controller)
+    if can_interface is None:
         logger.error(f"Error finding CAN node for '{can_controller}' device")
         return None
-    for can_modalias_file in can_modalias_files:
-        with open(can_modalias_file, 'r') as f:
-            controller_contents = f.read()
-            if can_controller in controller_contents:
-                # Extract the can node of the form canX from the modalias file path
-                can_interface = os.path.basename(os.path.dirname(os.path.dirname(can_modalias_file)))
-                logger.info(f"CAN node for '{can_controller}': {can_interface} ")
-                return can_interface
-    logger.error(f"Error finding CAN node for '{can_controller}' device")
-    return None
+    logger.info(f"CAN node for '{can_controller}': {can_interface} ")
+    return can_interface
 
 
 def can_node_initialize(can_channel, buffer_length, baudrate, logger):
@@ -53,19 +47,20 @@ def can_node_initialize(can_channel, buffer_length, baudrate, logger):
     """
     # Set baudrate for the can interface
     can_baudrate_cmd = ["ip", "link", "set", can_channel, "type", "can", "bitrate", str(baudrate)]
-    set_baudrate_result = subprocess.run(can_baudrate_cmd, capture_output=True, text=True)
+    set_baudrate_result = run(can_baudrate_cmd, logger=logger)
     if set_baudrate_result.returncode:
         logger.error(f"Error setting baudrate for node: {can_channel}")
         return None  
     logger.debug(f"Baudrate of {can_channel} set to {baudrate}")
     # Set transmit buffer length
-    set_txbuffer_result = subprocess.run(["ifconfig", can_channel, "txqueuelen",  str(buffer_length)], capture_output=True, text=True)
+    set_txbuffer_result = run(["ifconfig", can_channel, "txqueuelen",  str(buffer_length)], logger=logger)
     if set_txbuffer_result.returncode:
         logger.error(f"Error setting {can_channel} transmit buffer length: {buffer_length}")
         return None
     logger.debug(f"Transmit queue length of {can_channel} set to {buffer_length}")
     # Set CAN node to state 'up'
-    set_can_result = subprocess.run(["ip", "link", "set", can_channel, "up"], capture_output=True, text=True)
+    set_can_result = run(["ip", "link", "set", can_channel, "up"], logger=logger)
+    invalidate("net")
     if set_can_result.returncode:
         logger.error(f"Error setting {can_channel} interface state: up")
         return None
@@ -79,6 +74,39 @@ def can_node_initialize(can_channel, buffer_length, baudrate, logger):
         return None
 
 
+def can_link_up(can_transmitter_node, can_receiver_node, buffer_length, baudrate, logger):
+    """
+    Initialize the transmitter and receiver CAN nodes, or keep them initialized from
+    the previous test using the same nodes
+
+    Args:
+        can_transmitter_node: CAN message transmitter node
+        can_receiver_node: CAN message receiver node
+        buffer_length: Transmit buffer length
+        baudrate: Baudrate for communication
+        logger: Calling function's logger object
+
+    Returns:
+        dict/None: CAN node -> CAN device bus object/None on failure
+    """
+    def setup():
+        can_transmit_bus = can_node_initialize(can_transmitter_node, buffer_length, baudrate, logger)
+        if can_transmit_bus is None:
+            return None
+        can_receive_bus = can_node_initialize(can_receiver_node, buffer_length, baudrate, logger)
+        if can_receive_bus is None:
+            can_node_shutdown(can_transmit_bus, can_transmitter_node, logger)
+            return None
+        return {can_transmitter_node: can_transmit_bus, can_receiver_node: can_receive_bus}
+
+    def teardown(can_buses, logger):
+        for can_channel, can_bus in can_buses.items():
+            can_node_shutdown(can_bus, can_channel, logger)
+
+    return state_planner.enter(setup, teardown, logger,
+                               key=(frozenset([can_transmitter_node, can_receiver_node]), buffer_length, baudrate))
+
+
 def send_can_message(can_transmit_bus, can_transmitter_node, can_transmit_message, logger):
     """
     Send CAN message from transmitter node
@@ -137,13 +165,15 @@ def can_node_shutdown(can_bus, can_channel, logger):
         can_channel: CAN node for shutting down
         logger: Calling function's logger object
     """
+    logger.phase("teardown")
     try:
         can_bus.shutdown()
         logger.debug(f"CAN node {can_channel} shutdown")
     except can.CanError as e:
         logger.error(f"Error shutting down CAN node {can_channel} - {e}")
     # Set CAN node to state 'down'
-    set_can_result = subprocess.run(["ip", "link", "set", can_channel, "down"], capture_output=True, text=True)
+    set_can_result = run(["ip", "link", "set", can_channel, "down"], logger=logger)
+    invalidate("net")
     if set_can_result.returncode:
         logger.error(f"Error setting {can_channel} interface state: down")
     logger.debug(f"CAN interface {can_channel} is set to state: down")
@@ -167,39 +197,38 @@ def run_can_transmission_test(label, can_transmitter, can_receiver, helpers):
     baudrate = 100000  # Choose baudrate of 100Kbps for communication between CAN nodes
     buffer_length = 1000  # To set transmit buffer length
     can_transmit_message = bytes([1, 2, 3, 4, 5])
+    logger.phase("discovery")
     can_transmitter_node = get_can_node(can_transmitter, logger)
     if can_transmitter_node is None:
         return False
     can_receiver_node = get_can_node(can_receiver, logger)
     if can_receiver_node is None:
         return False
-    can_transmit_bus = can_node_initialize(can_transmitter_node, buffer_length, baudrate, logger)
-    if can_transmit_bus is None:
-        return False
-    can_receive_bus = can_node_initialize(can_receiver_node, buffer_length, baudrate, logger)
-    if can_receive_bus is None:
-        can_node_shutdown(can_transmit_bus, can_transmitter_node, logger)
+    logger.phase("setup")
+    # The nodes are shut down when the test fails or the next test does not use them
+    can_buses = can_link_up(can_transmitter_node, can_receiver_node, buffer_length, baudrate, logger)
+    if can_buses is None:
         return False
+    can_transmit_bus = can_buses[can_transmitter_node]
+    can_receive_bus = can_buses[can_receiver_node]
+    # Drop messages left from a previous test on the receiver
+    while can_receive_bus.recv(0) is not None:
+        pass
+    logger.phase("measure")
     can_message_transmit = send_can_message(can_transmit_bus, can_transmitter_node, can_transmit_message, logger)
     if can_message_transmit is False:
-        can_node_shutdown(can_transmit_bus, can_transmitter_node, logger)
-        can_node_shutdown(can_receive_bus, can_receiver_node, logger)
         return False
     # Allow sufficient time for the CAN message detection at the receiver node
+    logger.phase("settle")
     time.sleep(1)
+    logger.phase("measure")
     can_receive_message = read_can_message(can_receive_bus, can_receiver_node, logger)
     if can_receive_message is None:
-        can_node_shutdown(can_transmit_bus, can_transmitter_node, logger)
-        can_node_shutdown(can_receive_bus, can_receiver_node, logger)
         return False
     if can_transmit_message != can_receive_message:
         logger.error("CAN message received does not match with transmitted message")
         logger.error("CAN communication failed")
-        can_node_shutdown(can_transmit_bus, can_transmitter_node, logger)
-        can_node_shutdown(can_receive_bus, can_receiver_node, logger)
         return False
     logger.info("CAN message received matches with transmitted message")
     logger.info("CAN communication successful")
-    can_node_shutdown(can_transmit_bus, can_transmitter_node, logger)
-    can_node_shutdown(can_receive_bus, can_receiver_node, logger)
     return True
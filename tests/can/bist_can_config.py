@@ -7,11 +7,15 @@ supported_boards = {
             'label': 'can_bus_send',  # Send CAN messages from PS CAN
             'can_transmitter': 'zynq-can',  # PS CAN controller
             'can_receiver': 'mcp25625',   # AXI CAN controller
+            'resources': ['can'],
+            'setup_state': 'can_link',
         },
         {
             'label': 'can_bus_receive',  # Receive CAN messages to PS CAN
             'can_transmitter': 'mcp25625',
             'can_receiver': 'zynq-can',
+            'resources': ['can'],
+            'setup_state': 'can_link',
         }
     ]
 }
@@ -0,0 +1,56 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for caching command output
+import threading
+import time
+from proc_runner import run
+
+# Default lifetime of a cached output in seconds
+default_ttl = 60
+
+# (scope, command) -> (expiry time, completed process)
+cache = {}
+cache_lock = threading.Lock()
+
+
+def run_cached(cmd, scope, ttl=default_ttl, check=False):
+    """
+    Run a read-only command, reusing its output while it is still fresh
+
+    Only successful runs are cached. Commands that change the state read by a
+    scope must call invalidate() with the same scope.
+
+    Args:
+            cmd: Command as a list of arguments
+            scope: Name of the state read by the command, eg "display" or "net"
+            ttl: Seconds the output stays valid
+            check: Raise CalledProcessError if the command fails
+
+    Returns:
+            ProcessResult: Result of the command with text stdout/stderr
+    """
+    key = (scope, tuple(cmd))
+    now = time.monotonic()
+    with cache_lock:
+        entry = cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+    result = run(cmd, check=check)
+    if result.returncode == 0:
+        with cache_lock:
+            cache[key] = (now + ttl, result)
+    return result
+
+
+def invalidate(scope=None):
+    """
+    Drop the cached outputs of a scope
+
+    Args:
+            scope: Name of the state that has changed, None drops everything
+    """
+    with cache_lock:
+        for key in list(cache):
+            if scope is None or key[0] == scope:
+                del cache[key]
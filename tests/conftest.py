@@ -3,13 +3,35 @@
 
 # Import the 'modules' that are required for test cases execution
 import pytest
+from _pytest.junitxml import xml_key, mangle_test_address
+import xml.etree.ElementTree as ET
 import logging
 import os
+import time
+import scheduler
+import hw_discovery
+import results_store
+import baseline
+import board_profiles
+import board_id
+import log_queue
+import sample_log
+import prompt_manager
+import soak
+import dependencies
+import device_pool
+import state_planner
+import history
+
+# Phases marked by the running test as [name, start time, end time]
+test_phases = []
 
 
 class Helpers:
     def logger_init(label):
         logger = logging.getLogger(__name__)
+        # Records are written by a background thread so logging never stalls a measurement
+        log_queue.install(logger)
         extra = {'label':label}
         logger = logging.LoggerAdapter(logger, extra)
 
@@ -30,6 +52,34 @@ class Helpers:
             logger.info("End of test")
         logger.stop_test = stop_test
 
+        def record_metric(name, value, units):
+            logger.debug(f"Recording {name}: {value} {units}")
+            results_store.record(label, name, value, units)
+            soak.record_metric(label, name, value, units)
+        logger.record_metric = record_metric
+
+        def check_regression(name, value, higher_is_better=True):
+            return baseline.check(label, name, value, higher_is_better, logger)
+        logger.check_regression = check_regression
+
+        def phase(name):
+            # A phase lasts until the next phase is marked or the test ends
+            now = time.monotonic()
+            if test_phases and test_phases[-1][2] is None:
+                test_phases[-1][2] = now
+            test_phases.append([name, now, None])
+        logger.phase = phase
+
+        def sample(name, value):
+            # Per-sample data goes to the binary sample log instead of formatted log lines
+            sample_log.sample(label, name, value)
+        logger.sample = sample
+
+        def flush():
+            log_queue.flush()
+            sample_log.flush()
+        logger.flush = flush
+
         return logger
 
     def get_output_dir(module_file):
@@ -78,13 +128,483 @@ class Helpers:
 def helpers():
     return Helpers
 
+def finish_phases(label):
+    """
+    End the phases marked by the test and log the time spent in each
+
+    Args:
+            label: Test label
+
+    Returns:
+            dict: Phase name -> seconds spent in it
+    """
+    if not test_phases:
+        return {}
+    if test_phases[-1][2] is None:
+        test_phases[-1][2] = time.monotonic()
+    durations = {}
+    for name, start, end in test_phases:
+        durations[name] = durations.get(name, 0) + end - start
+    logger = Helpers.logger_init(label)
+    logger.debug("Phase timing: " + ", ".join(f"{name} {duration:.3f}s" for name, duration in durations.items()))
+    test_phases.clear()
+    return durations
+
+@pytest.fixture(autouse=True)
+def prerequisites(request):
+    """
+    Skip the test if a prerequisite declared in its config entry did not pass, running
+    the prerequisites that were not selected first
+
+    Args:
+            request: Pytest request of the test
+    """
+    dependencies.check(request)
+
+@pytest.fixture(autouse=True)
+def phase_timing(request):
+    """
+    Report the time spent in each phase marked by the test, in the log and as JUnit properties
+
+    Args:
+            request: Pytest request of the test
+    """
+    test_phases.clear()
+    yield
+    sample_log.flush()
+    callspec = getattr(request.node, "callspec", None)
+    for name, duration in finish_phases(callspec.id if callspec else request.node.name).items():
+        request.node.user_properties.append((f"phase_{name}", round(duration, 3)))
+    log_queue.flush()
+
+@pytest.fixture(autouse=True)
+def deferred_prompts(request):
+    """
+    Keep the confirmations deferred by the test for its teardown report, so they reach the
+    main process when the test runs in a worker
+
+    They are not user properties, which the JUnit XML report would list.
+
+    Args:
+            request: Pytest request of the test
+    """
+    yield
+    request.node.deferred_prompts = prompt_manager.take_test_prompts()
+
+@pytest.fixture(scope="session")
+def hw_index():
+    return hw_discovery.get_index()
+
+@pytest.fixture(scope="session")
+def devices():
+    """
+    Device handles shared by the tests of the session, closed at the end of the session
+    """
+    pool = device_pool.get_pool()
+    yield pool
+    pool.close_all(Helpers.logger_init("devices"))
+
+@pytest.fixture(autouse=True)
+def device_reset(request, devices):
+    """
+    Reset the pooled device handles used by the test, so the next test starts from a known state
+
+    Args:
+            request: Pytest request of the test
+            devices: Device pool of the session
+    """
+    yield
+    callspec = getattr(request.node, "callspec", None)
+    devices.end_test(Helpers.logger_init(callspec.id if callspec else request.node.name))
+
+@pytest.fixture(scope="session")
+def setup_states(devices):
+    """
+    Leave the setup state kept by the last test at the end of the session, before the
+    device handles are closed
+
+    Args:
+            devices: Device pool of the session
+    """
+    yield
+    state_planner.leave(Helpers.logger_init("setup_state"))
+
+@pytest.fixture(autouse=True)
+def setup_state_reuse(request, setup_states):
+    """
+    Keep the setup state of the test for the next test if it declares the same one
+
+    Args:
+            request: Pytest request of the test
+            setup_states: Session fixture leaving the last setup state
+    """
+    state_planner.begin_test(state_planner.get_item_state(request.node))
+    yield
+    callspec = getattr(request.node, "callspec", None)
+    state_planner.end_test(state_planner.next_states.get(request.node.nodeid),
+                           Helpers.logger_init(callspec.id if callspec else request.node.name))
+
 def pytest_addoption(parser):
     """
     Addition to command line arguements
 
-    :board  - Command line arguement which takes board name as input (eg --board kv260/kr260/kd240)
-    :action - Store the command(will store the board name)
-    :help   - Description of the command added to pytest help console
+    :board   - Command line arguement which takes board name as input (eg --board kv260/kr260/kd240),
+               identified from the carrier card FRU EEPROM if not given
+    :workers - Number of tests run concurrently in worker processes (eg --workers 4)
+    :results-file - JSON lines file the numeric results are appended to, empty to disable
+    :regression-check - Action on a result significantly worse than on sibling boards (off/warn/fail)
+    :samples-file - Binary file the per-sample measurements are appended to, empty to disable
+    :defer-prompts - Record visual check confirmations and ask them all at the end of the session
+    :prompt-answers - File of "<label> Y|N" lines answering deferred confirmations
+    :soak-duration - Run the selected tests in a loop for a duration (eg 3600, 90m or 24h)
+    :soak-iterations - Run the selected tests in a loop for a number of iterations
+    :time-budget - Run the tests most likely to fail that fit in a duration (eg 60, 5m)
+    :fail-fast-order - Run the tests most likely to fail first, with -x to stop at the first failure
+    :benchmark - Also run the benchmark tests
+    :gpio-sim - Run the GPIO tests on a gpio-sim chip with loopback pairs, for hosts without a board
+    :action  - Store the command(will store the board name)
+    :help    - Description of the command added to pytest help console
+
+    """
+    parser.addoption("--board", action="store",
+                     help="Board to use, identified from the carrier card FRU EEPROM if not given")
+    parser.addoption("--workers", action="store", type=int, default=1,
+                     help="Number of tests to run concurrently, tests sharing a resource are serialized")
+    parser.addoption("--results-file", action="store", default="kria_bist_results.jsonl",
+                     help="File the numeric test results are appended to, empty to disable")
+    parser.addoption("--regression-check", action="store", choices=["off", "warn", "fail"], default="warn",
+                     help="Action on a result significantly worse than the same result on sibling boards")
+    parser.addoption("--samples-file", action="store", default="kria_bist_samples.bin",
+                     help="Binary file the per-sample measurements are appended to, empty to disable")
+    parser.addoption("--defer-prompts", action="store_true", default=False,
+                     help="Record visual check confirmations and ask them all at the end of the session")
+    parser.addoption("--prompt-answers", action="store", default=None,
+                     help="File of '<label> Y|N' lines answering deferred confirmations, may be written during the run")
+    parser.addoption("--soak-duration", action="store", default=None,
+                     help="Run the selected tests in a loop for a duration in seconds, or with an m or h suffix")
+    parser.addoption("--soak-iterations", action="store", type=int, default=None,
+                     help="Run the selected tests in a loop for a number of iterations")
+    parser.addoption("--time-budget", action="store", default=None,
+                     help="Run the tests most likely to fail that fit in a duration in seconds, or with an m or h suffix")
+    parser.addoption("--fail-fast-order", action="store_true", default=False,
+                     help="Run the tests most likely to fail first, combine with -x to stop at the first failure")
+    parser.addoption("--benchmark", action="store_true", default=False,
+                     help="Also run the benchmark tests, eg the GPIO toggle rate and latency")
+    parser.addoption("--gpio-sim", action="store_true", default=False,
+                     help="Run the GPIO tests on a gpio-sim chip wired as loopback pairs, needs the gpio-sim module")
+
+
+def identify_board(config):
+    """
+    Select the board from the carrier card FRU EEPROM, or check that --board matches it
+
+    Args:
+            config: Pytest config
+
+    Raises:
+            pytest.UsageError: --board names a board with a different carrier card
+    """
+    product, serial = board_id.identify_carrier(getattr(config, "cache", None))
+    if product is None:
+        return
+    board = config.getoption("board")
+    if board is None:
+        config.option.board = board_id.get_product_board(product)
+    elif board_id.get_board_product(board) != product:
+        raise pytest.UsageError(f"--board {board} does not match the carrier card, "
+                                f"FRU product {product} (serial {serial}) is a {board_id.get_product_board(product)}")
+
+
+def pytest_configure(config):
+    """
+    Load the board profiles, identify the board, open the results store of the session and set up
+    regression checks against it
+
+    Args:
+            config: Pytest config
+    """
+    cache = getattr(config, "cache", None)
+    try:
+        board_profiles.load(str(cache.mkdir("board_profiles")) if cache else None)
+    except ValueError as e:
+        raise pytest.UsageError(f"Invalid board profile: {e}")
+    identify_board(config)
+    if not config.option.collectonly:
+        results_store.configure(config.getoption("results_file"), config.getoption("board"))
+        baseline.configure(config.getoption("regression_check"))
+        sample_log.configure(config.getoption("samples_file"))
+        prompt_manager.configure(config.getoption("defer_prompts"), config.getoption("prompt_answers"))
+        try:
+            soak.configure(config.getoption("soak_duration"), config.getoption("soak_iterations"),
+                           logging.getLogger(__name__))
+        except ValueError:
+            raise pytest.UsageError(f"Invalid --soak-duration {config.getoption('soak_duration')}")
+        if soak.duration is not None and not 0 < soak.duration < float("inf"):
+            raise pytest.UsageError(f"--soak-duration must be a positive duration, got {config.getoption('soak_duration')}")
+        if soak.iterations is not None and soak.iterations < 1:
+            raise pytest.UsageError(f"--soak-iterations must be at least 1, got {soak.iterations}")
+        if soak.active() and config.getoption("workers") > 1:
+            raise pytest.UsageError("--soak-duration and --soak-iterations cannot be combined with --workers")
+        if config.getoption("gpio_sim") and config.getoption("workers") > 1:
+            raise pytest.UsageError("--gpio-sim cannot be combined with --workers")
+    if config.getoption("time_budget"):
+        try:
+            budget = soak.parse_duration(config.getoption("time_budget"))
+        except ValueError:
+            raise pytest.UsageError(f"Invalid --time-budget {config.getoption('time_budget')}")
+        if not 0 < budget < float("inf"):
+            raise pytest.UsageError(f"--time-budget must be a positive duration, got {config.getoption('time_budget')}")
+    if not config.option.collectonly or config.getoption("time_budget") or config.getoption("fail_fast_order"):
+        history.load(config.getoption("results_file"), config.getoption("board"))
+
+
+def pytest_generate_tests(metafunc):
+    """
+    Collection and parametrization of tests from the board profile registry
+
+    Args:
+            metafunc: Has a parametrize function,way to provide multiple variants of values for parametrization
+
+    Tests are parametrized with the config entries of their module for the selected
+    board, using the entry labels as test IDs.
+    """
+    if "id" not in metafunc.fixturenames:
+        return
+    board = metafunc.config.getoption("board")
+    module = metafunc.definition.path.parent.name
+    parameters = board_profiles.get_parameters(board, module)
+    if parameters is None:
+        pytest.skip("Not supported")
+    val, test_id = parameters
+
+    # Parametrize tests based on test IDs
+    metafunc.parametrize("id", val, ids=test_id)
+
+
+def report_deferred(session, results):
+    """
+    Report the tests with a rejected or unanswered deferred confirmation as failed, in
+    place of their passed report in the terminal summary and the JUnit XML report, and
+    record their outcomes in the run history
+
+    Args:
+            session: Pytest session
+            results: (deferred confirmation, True/False/None if unanswered) of every deferred confirmation
+    """
+    reasons = {}
+    locations = {}
+    for prompt, answer in results:
+        locations[prompt['nodeid']] = prompt['location']
+        if answer is not True:
+            reasons.setdefault(prompt['nodeid'], []).append(
+                f"{'User rejects' if answer is False else 'Not confirmed'}: {prompt['question']}")
+    for nodeid in locations:
+        history.record_deferred(nodeid, nodeid in reasons)
+
+    terminal = session.config.pluginmanager.get_plugin("terminalreporter")
+    junit = session.config.stash.get(xml_key, None)
+    for nodeid, messages in reasons.items():
+        message = "\n".join(messages)
+        if terminal is not None:
+            # Replace the passed report of the test in the summary
+            terminal.stats['passed'] = [report for report in terminal.stats.get('passed', [])
+                                        if report.nodeid != nodeid]
+            for when in ("call", "teardown"):
+                terminal.pytest_runtest_logreport(report=pytest.TestReport(
+                    nodeid, locations[nodeid], {}, "failed" if when == "call" else "passed",
+                    message if when == "call" else None, when))
+        if junit is not None:
+            # Add the failure to the test case already written for the test
+            names = mangle_test_address(nodeid)
+            for reporter in junit.node_reporters_ordered:
+                testcase = reporter.to_xml()
+                if testcase.get("name") == names[-1] and testcase.get("classname", "").endswith(".".join(names[:-1])):
+                    ET.SubElement(testcase, "failure", message=messages[0]).text = message
+                    junit.stats['passed'] -= 1
+                    junit.stats['failure'] += 1
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    """
+    Ask the deferred confirmations and report the tests whose confirmations were not
+    given as failed, then write the numeric results, samples and log records still
+    buffered at the end of the session
+
+    Runs before the JUnit XML report is written, so it includes those failures.
+
+    Args:
+            session: Pytest session
+    """
+    if prompt_manager.pending:
+        results = prompt_manager.run_batch(Helpers.logger_init("prompts"))
+        report_deferred(session, results)
+        if not all(answer for prompt, answer in results):
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    results_store.flush()
+    sample_log.flush()
+    log_queue.flush()
+
+
+def pytest_runtest_logreport(report):
+    """
+    Record the outcome of a test for the tests depending on it, its duration and outcome
+    in the run history, and collect the confirmations deferred by the test from its
+    teardown report
+
+    Args:
+            report: Test report
+    """
+    dependencies.record_reports([report])
+    history.add_report(report, not soak.active(), Helpers.logger_init("eta"))
+    for prompt in getattr(report, "deferred_prompts", []):
+        prompt_manager.add_pending(prompt, report.nodeid, report.location)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """
+    List the pass rates and metric distributions of a soak run, and the answers to the
+    deferred confirmations
+
+    Args:
+            terminalreporter: Pytest terminal reporter
+    """
+    if soak.test_stats:
+        terminalreporter.section("soak summary")
+        logger = Helpers.logger_init("soak")
+        for line in soak.summary_lines():
+            terminalreporter.line(line)
+            logger.debug(line)
+    if not prompt_manager.answered:
+        return
+    terminalreporter.section("deferred confirmations")
+    for prompt, answer in prompt_manager.answered:
+        status = {True: "CONFIRMED", False: "REJECTED", None: "UNANSWERED"}[answer]
+        terminalreporter.line(f"{status} {prompt['label']}: {prompt['question']}")
+
+
+def pytest_unconfigure(config):
+    """
+    Stop the background log writer
+
+    Args:
+            config: Pytest config
+    """
+    log_queue.stop()
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Deselect the benchmark tests unless requested, select the tests that fit in the time
+    budget, order them by failure likelihood if requested, run the prerequisites declared
+    in the config entries before the tests depending on them, and the tests sharing a
+    setup state one after the other, then plan the reuse of setup states in that order
+
+    Tests sharing a setup state are not grouped in fail fast order, which would delay
+    likely failures.
+
+    Runs after the deselection of tests, so the plan covers the selected tests only.
+
+    Args:
+            config: Pytest config
+            items: Collected pytest items
+    """
+    if not config.getoption("benchmark"):
+        benchmarks = [item for item in items if item.get_closest_marker("benchmark")]
+        if benchmarks:
+            config.hook.pytest_deselected(items=benchmarks)
+            items[:] = [item for item in items if item not in benchmarks]
+    if config.getoption("time_budget"):
+        selected = history.select(items, soak.parse_duration(config.getoption("time_budget")))
+        config.hook.pytest_deselected(items=[item for item in items if item not in selected])
+        items[:] = selected
+    if config.getoption("fail_fast_order"):
+        history.order_by_failure(items)
+    dependencies.order_items(items)
+    if not config.getoption("fail_fast_order"):
+        state_planner.order_items(items)
+    state_planner.plan(items)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Do not reuse the setup state of a test that failed, and attach the confirmations
+    deferred by the test to its teardown report
+
+    Args:
+            item: Pytest item
+            call: Call of the test phase
+    """
+    outcome = yield
+    report = outcome.get_result()
+    if report.failed:
+        state_planner.mark_failed()
+    if call.when == "teardown" and getattr(item, "deferred_prompts", None):
+        report.deferred_prompts = item.deferred_prompts
+
+
+def pytest_report_collectionfinish(config, items):
+    """
+    Report the estimated duration of the tests selected for the time budget, the tests run
+    first in fail fast order with their failure rates, and the time saved by reusing setup states in the planned order
+
+    Args:
+            config: Pytest config
+            items: Pytest items in run order
+
+    Returns:
+            list: Lines of the report
+    """
+    lines = []
+    if config.getoption("time_budget"):
+        estimate = sum(history.estimated_duration(history.get_label(item)) for item in items)
+        lines.append(f"time budget {config.getoption('time_budget')}: {len(items)} tests selected, "
+                     f"estimated {history.format_seconds(estimate)}")
+    if config.getoption("fail_fast_order") and items:
+        first = ", ".join(f"{history.get_label(item)} ({100 * history.failure_rate(history.get_label(item)):.0f}%)"
+                          for item in items[:3])
+        lines.append(f"fail fast order: {first} first")
+    if state_planner.reused_tests and config.getoption("workers") == 1:
+        lines.append(f"setup state reuse: {state_planner.reused_tests} tests reuse the setup state of the previous "
+                     f"test, estimated {state_planner.estimated_saving:.1f}s saved")
+    return lines
+
+
+def pytest_collection_finish(session):
+    """
+    Start the ETA of the run, and discover the hardware needed by the selected tests once,
+    before any test runs, so that forked workers inherit the index
+
+    Args:
+            session: Pytest session
+    """
+    if session.config.option.collectonly:
+        return
+    if not soak.active():
+        history.start_run(session.items, session.config.getoption("workers"))
+    markers = {marker.name for item in session.items for marker in item.iter_markers()}
+    hw_discovery.discover(markers)
+
+
+def pytest_runtestloop(session):
+    """
+    Run the collected tests in a soak loop, or through the parallel scheduler when more than
+    one worker is requested
+
+    Args:
+            session: Pytest session
 
+    Returns:
+            bool/None: True if the tests were run by the soak loop or the scheduler/None to fall back to the
+                       default run loop
     """
-    parser.addoption("--board", action="store", help="Board to use")
+    workers = session.config.getoption("workers")
+    if workers < 1:
+        raise pytest.UsageError("--workers must be at least 1")
+    if soak.active() and session.items and not session.config.option.collectonly and not session.testsfailed:
+        return soak.run(session, Helpers.logger_init("soak"))
+    if workers == 1 or session.config.option.collectonly or session.testsfailed:
+        return None
+    return scheduler.run_parallel(session, workers)
@@ -0,0 +1,30 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Custom carrier cards derived from a supported board. Each profile starts from
+# the tests of its 'base' board and can:
+#   fru_product - carrier card FRU product name code identifying the board,
+#                 eg 'KR' for a product name of SCK-KR-G, instead of the base board
+#   exclude     - drop whole test modules
+#   drop_labels - drop individual tests of a module
+#   override    - change config values of a test, by module and label
+#   add         - add config entries to a module
+#
+# Example:
+#
+# custom_boards = {
+#     'mycarrier': {
+#         'base': 'kr260',
+#         'fru_product': 'MC',
+#         'exclude': ['video', 'display'],
+#         'drop_labels': {'gpio': ['pmod2', 'pmod3']},
+#         'override': {'eth': {'ethernet1_ping': {'phy_addr': '3'}}},
+#         'add': {'i2c': [{'label': 'ps_i2c_bus_temp', 'controller': 'ff030000', 'mux_channel': None,
+#                          'i2c_devices': {'tmp': 0x48}, 'resources': ['ps_i2c']}]},
+#     },
+# }
+#
+# Run the tests of a custom board with --board <name>
+
+custom_boards = {
+}
@@ -0,0 +1,208 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for test dependencies
+import inspect
+import pytest
+import board_profiles
+import state_planner
+
+# Outcomes from best to worst, a test run by several functions keeps its worst outcome
+outcome_rank = {'passed': 0, 'skipped': 1, 'failed': 2}
+
+# (module, label) -> outcome of the test in this session, passed/skipped/failed
+outcomes = {}
+# Node ID -> (module, label) of every collected test
+item_keys = {}
+
+
+def get_item_key(item):
+    """
+    Args:
+            item: Collected pytest item
+
+    Returns:
+            tuple/None: (module, label) of the test/None if it is not parametrized with a config entry
+    """
+    callspec = getattr(item, "callspec", None)
+    entry = callspec.params.get("id") if callspec else None
+    if not isinstance(entry, dict):
+        return None
+    return (item.path.parent.name, entry['label'])
+
+
+def get_depends(module, entry):
+    """
+    Args:
+            module: Test module name
+            entry: Config entry of the test
+
+    Returns:
+            list: (module, label) of the prerequisites declared by the entry
+    """
+    return [(module, label) for label in entry.get('depends', [])]
+
+
+def get_item_depends(item):
+    """
+    Args:
+            item: Collected pytest item
+
+    Returns:
+            list: (module, label) of the prerequisites of the test
+    """
+    key = get_item_key(item)
+    if key is None:
+        return []
+    return get_depends(key[0], item.callspec.params["id"])
+
+
+def order_items(items):
+    """
+    Move every prerequisite before the tests depending on it, keeping the collection
+    order otherwise
+
+    Args:
+            items: Collected pytest items, reordered in place
+    """
+    by_key = {}
+    for item in items:
+        key = get_item_key(item)
+        item_keys[item.nodeid] = key
+        by_key.setdefault(key, []).append(item)
+
+    ordered = []
+    placed = set()
+
+    def place(item):
+        if item.nodeid in placed:
+            return
+        placed.add(item.nodeid)
+        for key in get_item_depends(item):
+            for prerequisite in by_key.get(key, []):
+                place(prerequisite)
+        ordered.append(item)
+
+    for item in items:
+        place(item)
+    items[:] = ordered
+
+
+def reset():
+    """
+    Forget the recorded outcomes, so the prerequisites are run again
+    """
+    outcomes.clear()
+
+
+def record(key, outcome, recorded=outcomes):
+    """
+    Record an outcome of a test, keeping the worst one
+
+    Args:
+            key: (module, label) of the test
+            outcome: passed/skipped/failed
+            recorded: (module, label) -> outcome map to record in, the outcomes of the session by default
+    """
+    if key not in recorded or outcome_rank[outcome] > outcome_rank[recorded[key]]:
+        recorded[key] = outcome
+
+
+def record_reports(reports):
+    """
+    Record the outcomes of the tests from their reports, which may come from a worker process,
+    and of the prerequisites run with them
+
+    Args:
+            reports: Setup, call and teardown reports
+    """
+    for report in reports:
+        for name, value in report.user_properties:
+            if name == "prerequisite_outcome":
+                module, label, outcome = value
+                record((module, label), outcome)
+        key = item_keys.get(report.nodeid)
+        if key is None:
+            continue
+        if report.failed:
+            record(key, "failed")
+        elif report.skipped:
+            record(key, "skipped")
+        elif report.when == "call":
+            record(key, "passed")
+
+
+def is_waiting(item, unfinished, running=()):
+    """
+    Args:
+            item: Collected pytest item
+            unfinished: Items not run yet or still running
+            running: Items still running
+
+    Returns:
+            bool: True if a prerequisite of the item has not finished, or is not selected
+                  and may be running with another test
+    """
+    keys = {item_keys.get(other.nodeid) for other in unfinished if other is not item}
+    running_depends = {key for other in running for key in get_item_depends(other)}
+    return any(key in keys or (key not in outcomes and key in running_depends) for key in get_item_depends(item))
+
+
+def run_prerequisite(request, key):
+    """
+    Run a prerequisite that was not selected, with the test function of the dependent
+
+    Prerequisites are tests of the same module, so the dependent's test function runs them
+    with their own config entry.
+
+    Args:
+            request: Pytest request of the dependent test
+            key: (module, label) of the prerequisite
+    """
+    module, label = key
+    entries, labels = board_profiles.get_parameters(request.config.getoption("board"), module)
+    entry = entries[labels.index(label)]
+    for prerequisite in get_depends(module, entry):
+        if prerequisite not in outcomes:
+            run_prerequisite(request, prerequisite)
+        if outcomes[prerequisite] != "passed":
+            record(key, "skipped")
+            return
+
+    logger = request.getfixturevalue("helpers").logger_init(label)
+    logger.info(f"Running prerequisite of {request.node.name}")
+    arguments = {name: entry if name == "id" else request.getfixturevalue(name)
+                 for name in inspect.signature(request.function).parameters}
+    state_planner.begin_test(entry.get('setup_state'))
+    try:
+        request.function(**arguments)
+        record(key, "passed")
+    except pytest.skip.Exception:
+        record(key, "skipped")
+    except Exception as e:
+        logger.error(f"Prerequisite failed - {type(e).__name__}: {e}")
+        record(key, "failed")
+    finally:
+        state_planner.leave(logger)
+
+
+def check(request):
+    """
+    Skip a test whose prerequisites did not pass, running the ones that did not run yet
+
+    The outcomes of the prerequisites run are attached to the reports of the test, so they
+    reach the main process when the test runs in a worker.
+
+    Args:
+            request: Pytest request of the test
+    """
+    recorded = set(outcomes)
+    try:
+        for key in get_item_depends(request.node):
+            if key not in outcomes:
+                run_prerequisite(request, key)
+            if outcomes[key] != "passed":
+                pytest.skip(f"Prerequisite {key[1]} {outcomes[key]}")
+    finally:
+        for key in outcomes.keys() - recorded:
+            request.node.user_properties.append(("prerequisite_outcome", (*key, outcomes[key])))
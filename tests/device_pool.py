@@ -0,0 +1,128 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for pooled device handles
+import os
+import threading
+
+
+class DevicePool:
+    """
+    Device handles opened once and shared by the tests of a session
+
+    A handle is opened by the first test acquiring it, reset at the end of every test
+    that used it, and closed when the pool is closed. A handle whose reset fails is
+    closed, and opened again by the next test acquiring it.
+    """
+
+    def __init__(self):
+        self.handles = {}  # Key -> [handle, closer, reset], in opening order
+        self.used = set()
+        self.lock = threading.Lock()
+
+    def acquire(self, key, opener, closer=None, reset=None):
+        """
+        Get the pooled handle of a device, opening it on first use
+
+        Args:
+                key: Identifies the device, eg ("spi", "/dev/spidev1.0")
+                opener: Function returning a new handle, exceptions are passed to the caller
+                closer: Function called with the handle to close it, None if it needs no closing
+                reset: Function called with the handle at the end of each test that used it,
+                       None if it keeps no state between tests
+
+        Returns:
+                object/None: Device handle/None if the opener returned None, which is not pooled
+        """
+        with self.lock:
+            if key not in self.handles:
+                handle = opener()
+                if handle is None:
+                    return None
+                self.handles[key] = [handle, closer, reset]
+            self.used.add(key)
+            return self.handles[key][0]
+
+    def close_handle(self, key, logger=None):
+        handle, closer, reset = self.handles.pop(key)
+        self.used.discard(key)
+        if closer is None:
+            return
+        try:
+            closer(handle)
+        except Exception as e:
+            if logger is not None:
+                logger.warning(f"Closing device {key} failed - {e}")
+
+    def discard(self, key, logger=None):
+        """
+        Close a handle that is no longer usable, the next acquire opens the device again
+
+        Args:
+                key: Identifies the device
+                logger: Handle for logging close errors, None to ignore them
+        """
+        with self.lock:
+            if key in self.handles:
+                self.close_handle(key, logger)
+
+    def end_test(self, logger=None):
+        """
+        Reset the handles used by the test that ended
+
+        Args:
+                logger: Handle for logging reset errors, None to ignore them
+        """
+        with self.lock:
+            for key in [key for key in self.handles if key in self.used]:
+                handle, closer, reset = self.handles[key]
+                if reset is None:
+                    continue
+                try:
+                    reset(handle)
+                except Exception as e:
+                    if logger is not None:
+                        logger.warning(f"Resetting device {key} failed, closing it - {e}")
+                    self.close_handle(key, logger)
+            self.used.clear()
+
+    def close_all(self, logger=None):
+        """
+        Close every handle, in the reverse order they were opened
+
+        Args:
+                logger: Handle for logging close errors, None to ignore them
+        """
+        with self.lock:
+            for key in reversed(list(self.handles)):
+                self.close_handle(key, logger)
+
+    def forget(self):
+        """
+        Drop the handles without closing them
+        """
+        self.handles.clear()
+        self.used.clear()
+        self.lock = threading.Lock()
+
+
+# Device pool of the process
+pool = DevicePool()
+
+
+def get_pool():
+    """
+    Returns:
+            DevicePool: Device pool of the process
+    """
+    return pool
+
+
+def forget_handles():
+    """
+    Drop the handles inherited from the parent in a forked child, the parent owns and closes them
+    """
+    pool.forget()
+
+
+os.register_at_fork(after_in_child=forget_handles)
@@ -2,11 +2,12 @@
 # SPDX-License-Identifier: MIT
 
 # Import the 'modules' that are required for test cases execution
-import subprocess
 import os
 import shutil
 from pathlib import Path
 import re
+from proc_runner import run
+import state_planner
 
 
 def get_dev_path_speed(port_name, hw_path, logger):
@@ -77,7 +78,7 @@ def find_block(bus, path, max_depth=3):
 
 def check_disk_space(device_path, data_size, logger):
     # Check available space on the disk to proceed with the test
-    space_result = subprocess.run(["df", device_path], capture_output=True, text=True)
+    space_result = run(["df", device_path], logger=logger)
     if space_result.returncode:
         logger.error(f"Error retrieving available storage space on the disk")
         return False
@@ -100,7 +101,7 @@ def mount_device(dev_path, port_name, mount_path, logger):
     except OSError:
         logger.error(f"Error creating directory {mount_path} to mount {dev_path} for {port_name} port")
         return False
-    mount_result = subprocess.run(["mount", dev_path, mount_path], check=True)
+    mount_result = run(["mount", dev_path, mount_path], logger=logger)
     if mount_result.returncode:
         logger.error(f"Error mounting {dev_path} device at {mount_path} for {port_name} port")
         return False
@@ -111,7 +112,7 @@ def mount_device(dev_path, port_name, mount_path, logger):
 def unmount_device(mount_point, port_name, logger):
     flag = "-l" # Lazy unmount to safely unmount the volume and reuse the mount_point if needed.
     # Through lazy unmount, the volume is still mounted but not accessible through the filesystem and unmounted only after finishing the task performed on the files.
-    unmount_result = subprocess.run(["umount", flag, mount_point], check=True)
+    unmount_result = run(["umount", flag, mount_point], logger=logger)
     if unmount_result.returncode:
         logger.warning(f"Device could not be unmounted at {mount_point} for {port_name} port")
     else:
@@ -122,7 +123,7 @@ def get_write_speed(write_path, data_size, logger):
     # Check write performance of the disk
     count = str(data_size // 32) # Equate block size * count to required data size
     write_cmd = f'dd if=/dev/urandom of={write_path} bs=32M count={count} oflag=dsync iflag=fullblock'
-    write_result = subprocess.run(write_cmd.split(), capture_output=True, text=True)
+    write_result = run(write_cmd.split(), logger=logger)
     if write_result.returncode:
         logger.error(f"{write_cmd} failed with return code: {str(write_result.returncode)}")
         return None
@@ -149,7 +150,7 @@ def get_read_speed(read_path, data_size, logger):
     # Check read performance of the disk
     count = str(data_size // 32) # Equate block size * count to required data size
     read_cmd = f'dd of=/dev/null if={read_path} bs=32M count={count} oflag=dsync iflag=fullblock'
-    read_result = subprocess.run(read_cmd.split(), capture_output=True, text=True)
+    read_result = run(read_cmd.split(), logger=logger)
     if read_result.returncode:
         logger.error(f"{read_cmd} failed with return code: {str(read_result.returncode)}")
         return None
@@ -166,6 +167,7 @@ def log_disk_performance(measured_speed, mode, port_name, port_speed, logger):
     if measured_speed is None:
         logger.error(f"Failed to parse {mode} speed")
         return False
+    logger.record_metric(f"{mode.lower()}_speed", measured_speed, "MB/s")
     speed_dict = {
         'SD Speed C-class': {'Read': 6, 'Write': 2},
         'SD Speed UHS-class': {'Read': 12, 'Write': 6},
@@ -182,12 +184,21 @@ def log_disk_performance(measured_speed, mode, port_name, port_speed, logger):
     if float(measured_speed) < min_speed:
         logger.error(f"{mode} performance test failed for {port_name} port\n")
         return False
+    # Compare measured speed with the same port on other boards
+    if not logger.check_regression(f"{mode.lower()}_speed", measured_speed):
+        logger.error(f"{mode} performance test failed for {port_name} port\n")
+        return False
     logger.info(f"{mode} performance test passed for {port_name} port\n")
     return True
 
 
-def remove_test_dir(test_file, mount_directory, port_name, logger):
+def remove_test_file(test_file, logger):
+    logger.phase("teardown")
     os.remove(test_file)  # Remove test file
+
+
+def remove_test_dir(mount_directory, port_name, logger):
+    logger.phase("teardown")
     unmount_device(mount_directory, port_name, logger)  # Unmount test directory
     test_directory = os.path.dirname(mount_directory)
     shutil.rmtree(test_directory, ignore_errors=True)  # Remove test directory
@@ -199,57 +210,61 @@ def run_disk_performance(label, hw_path, mode, helpers):
     port_name = label.split('_')[0].upper()  # Strip the port name
     data_size = 128  # To set data size to 128MiB
     # Obtain /dev/{sdx/mmcblxpx} device path and data transfer standard/ speed of the port
+    logger.phase("discovery")
     disk_part, device_path, port_speed = get_dev_path_speed(port_name, hw_path, logger)
     if disk_part is None:
         return False
     # Check for available storage on the disk
+    logger.phase("setup")
     disk_space = check_disk_space(device_path, data_size, logger)
     if not disk_space:
         return False
-    # Mount the disk under test
+    # Mount the disk under test, or keep it mounted from the previous test on the same port
     mount_path = f"/media/disk/{disk_part}"
-    mounted = mount_device(device_path, port_name, mount_path, logger)
+    mounted = state_planner.enter(lambda: mount_device(device_path, port_name, mount_path, logger),
+                                  lambda mounted, logger: remove_test_dir(mount_path, port_name, logger),
+                                  logger, key=(device_path, mount_path))
     if not mounted:
         return False
     test_file = f'{mount_path}/test'
-    mount_directory = os.path.dirname(test_file)
     # Performance test based on write, read and read_write modes
+    logger.phase("measure")
     match mode:
         case 'w':
             wr_speed = get_write_speed(test_file, data_size, logger)
             write_test = log_disk_performance(wr_speed, 'Write', port_name, port_speed, logger)
             if not write_test:
-                 remove_test_dir(test_file, mount_directory, port_name, logger)
+                 remove_test_file(test_file, logger)
                  return False
         case 'r':
             # Write to test file for measuring the read performance
             wr_speed = get_write_speed(test_file, data_size, logger)
             if wr_speed is None:
-                 remove_test_dir(test_file, mount_directory, port_name, logger)
+                 remove_test_file(test_file, logger)
                  return False
             cache_cleared = clear_cache(logger)
             if not cache_cleared:
-                 remove_test_dir(test_file, mount_directory, port_name, logger)
+                 remove_test_file(test_file, logger)
                  return False
             rd_speed = get_read_speed(test_file, data_size, logger)
             read_test = log_disk_performance(rd_speed, 'Read', port_name, port_speed, logger)
             if not read_test:
-                 remove_test_dir(test_file, mount_directory, port_name, logger)
+                 remove_test_file(test_file, logger)
                  return False
         case 'rw':
             wr_speed = get_write_speed(test_file, data_size, logger)
             write_test = log_disk_performance(wr_speed, 'Write', port_name, port_speed, logger)
             if not write_test:
-                 remove_test_dir(test_file, mount_directory, port_name, logger)
+                 remove_test_file(test_file, logger)
                  return False
             cache_cleared = clear_cache(logger)
             if not cache_cleared:
-                 remove_test_dir(test_file, mount_directory, port_name, logger)
+                 remove_test_file(test_file, logger)
                  return False
             rd_speed = get_read_speed(test_file, data_size, logger)
             read_test = log_disk_performance(rd_speed, 'Read', port_name, port_speed, logger)
             if not read_test:
-                 remove_test_dir(test_file, mount_directory, port_name, logger)
+                 remove_test_file(test_file, logger)
                  return False
-    remove_test_dir(test_file, mount_directory, port_name, logger)
+    remove_test_file(test_file, logger)
     return True
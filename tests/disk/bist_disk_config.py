@@ -4,42 +4,42 @@
 supported_boards = {
     'kv260': [
 
-            {'label': 'usb1_read_performance', 'hw_path': ['1-1.1', '2-1.1']},
-            {'label': 'usb1_write_performance', 'hw_path': ['1-1.1', '2-1.1']},
-            {'label': 'usb2_read_performance', 'hw_path': ['1-1.2', '2-1.2']},
-            {'label': 'usb2_write_performance', 'hw_path': ['1-1.2', '2-1.2']},
-            {'label': 'usb3_read_performance', 'hw_path': ['1-1.3', '2-1.3']},
-            {'label': 'usb3_write_performance', 'hw_path': ['1-1.3', '2-1.3']},
-            {'label': 'usb4_read_performance', 'hw_path': ['1-1.4', '2-1.4']},
-            {'label': 'usb4_write_performance', 'hw_path': ['1-1.4', '2-1.4']},
-            {'label': 'sd_read_performance', 'hw_path': ['mmc0:', 'mmc1:']},
-            {'label': 'sd_write_performance', 'hw_path': ['mmc0:', 'mmc1:']},
+            {'label': 'usb1_read_performance', 'hw_path': ['1-1.1', '2-1.1'], 'resources': ['usb1', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb1'},
+            {'label': 'usb1_write_performance', 'hw_path': ['1-1.1', '2-1.1'], 'resources': ['usb1', 'usb_hub'], 'setup_state': 'mount:usb1'},
+            {'label': 'usb2_read_performance', 'hw_path': ['1-1.2', '2-1.2'], 'resources': ['usb2', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb2'},
+            {'label': 'usb2_write_performance', 'hw_path': ['1-1.2', '2-1.2'], 'resources': ['usb2', 'usb_hub'], 'setup_state': 'mount:usb2'},
+            {'label': 'usb3_read_performance', 'hw_path': ['1-1.3', '2-1.3'], 'resources': ['usb3', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb3'},
+            {'label': 'usb3_write_performance', 'hw_path': ['1-1.3', '2-1.3'], 'resources': ['usb3', 'usb_hub'], 'setup_state': 'mount:usb3'},
+            {'label': 'usb4_read_performance', 'hw_path': ['1-1.4', '2-1.4'], 'resources': ['usb4', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb4'},
+            {'label': 'usb4_write_performance', 'hw_path': ['1-1.4', '2-1.4'], 'resources': ['usb4', 'usb_hub'], 'setup_state': 'mount:usb4'},
+            {'label': 'sd_read_performance', 'hw_path': ['mmc0:', 'mmc1:'], 'resources': ['sd', 'drop_caches'], 'setup_state': 'mount:sd'},
+            {'label': 'sd_write_performance', 'hw_path': ['mmc0:', 'mmc1:'], 'resources': ['sd'], 'setup_state': 'mount:sd'},
 
     ],
 
     'kr260': [
 
-            {'label': 'usb1_read_performance', 'hw_path': ['3-1.1', '4-1.1']},
-            {'label': 'usb1_write_performance', 'hw_path': ['3-1.1', '4-1.1']},
-            {'label': 'usb2_read_performance', 'hw_path': ['3-1.2', '4-1.2']},
-            {'label': 'usb2_write_performance', 'hw_path': ['3-1.2', '4-1.2']},
-            {'label': 'usb3_read_performance', 'hw_path': ['1-1.2', '2-1.2']},
-            {'label': 'usb3_write_performance', 'hw_path': ['1-1.2', '2-1.2']},
-            {'label': 'usb4_read_performance', 'hw_path': ['1-1.3', '2-1.3']},
-            {'label': 'usb4_write_performance', 'hw_path': ['1-1.3', '2-1.3']},
-            {'label': 'sd_read_performance', 'hw_path': ['1-1.1']},
-            {'label': 'sd_write_performance', 'hw_path': ['1-1.1']},
+            {'label': 'usb1_read_performance', 'hw_path': ['3-1.1', '4-1.1'], 'resources': ['usb1', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb1'},
+            {'label': 'usb1_write_performance', 'hw_path': ['3-1.1', '4-1.1'], 'resources': ['usb1', 'usb_hub'], 'setup_state': 'mount:usb1'},
+            {'label': 'usb2_read_performance', 'hw_path': ['3-1.2', '4-1.2'], 'resources': ['usb2', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb2'},
+            {'label': 'usb2_write_performance', 'hw_path': ['3-1.2', '4-1.2'], 'resources': ['usb2', 'usb_hub'], 'setup_state': 'mount:usb2'},
+            {'label': 'usb3_read_performance', 'hw_path': ['1-1.2', '2-1.2'], 'resources': ['usb3', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb3'},
+            {'label': 'usb3_write_performance', 'hw_path': ['1-1.2', '2-1.2'], 'resources': ['usb3', 'usb_hub'], 'setup_state': 'mount:usb3'},
+            {'label': 'usb4_read_performance', 'hw_path': ['1-1.3', '2-1.3'], 'resources': ['usb4', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb4'},
+            {'label': 'usb4_write_performance', 'hw_path': ['1-1.3', '2-1.3'], 'resources': ['usb4', 'usb_hub'], 'setup_state': 'mount:usb4'},
+            {'label': 'sd_read_performance', 'hw_path': ['1-1.1'], 'resources': ['sd', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:sd'},
+            {'label': 'sd_write_performance', 'hw_path': ['1-1.1'], 'resources': ['sd', 'usb_hub'], 'setup_state': 'mount:sd'},
 
     ],
 
     'kd240': [
 
-            {'label': 'usb1_read_performance', 'hw_path': ['1-1.2', '2-1.2']},
-            {'label': 'usb1_write_performance', 'hw_path': ['1-1.2', '2-1.2']},
-            {'label': 'usb2_read_performance', 'hw_path': ['1-1.3', '2-1.3']},
-            {'label': 'usb2_write_performance', 'hw_path': ['1-1.3', '2-1.3']},
-            {'label': 'sd_read_performance', 'hw_path': ['1-1.1']},
-            {'label': 'sd_write_performance', 'hw_path': ['1-1.1']},
+            {'label': 'usb1_read_performance', 'hw_path': ['1-1.2', '2-1.2'], 'resources': ['usb1', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb1'},
+            {'label': 'usb1_write_performance', 'hw_path': ['1-1.2', '2-1.2'], 'resources': ['usb1', 'usb_hub'], 'setup_state': 'mount:usb1'},
+            {'label': 'usb2_read_performance', 'hw_path': ['1-1.3', '2-1.3'], 'resources': ['usb2', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:usb2'},
+            {'label': 'usb2_write_performance', 'hw_path': ['1-1.3', '2-1.3'], 'resources': ['usb2', 'usb_hub'], 'setup_state': 'mount:usb2'},
+            {'label': 'sd_read_performance', 'hw_path': ['1-1.1'], 'resources': ['sd', 'usb_hub', 'drop_caches'], 'setup_state': 'mount:sd'},
+            {'label': 'sd_write_performance', 'hw_path': ['1-1.1'], 'resources': ['sd', 'usb_hub'], 'setup_state': 'mount:sd'},
 
     ]
 }
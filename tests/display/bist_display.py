@@ -2,12 +2,11 @@
 # SPDX-License-Identifier: MIT
 
 # Import the 'modules' that are required for test cases execution
-import subprocess
 import re
-import os
-import signal
 import time
-from timeout_handler import input_timeout, TimeoutException
+import prompt_manager
+from cmd_cache import run_cached, invalidate
+from proc_runner import spawn
 
 
 def get_display_status(display_device):
@@ -21,7 +20,7 @@ def get_display_status(display_device):
             string: Status connected/disconnected
     """
     modetest_cmd = f"modetest -D {display_device} -c"
-    modetest_output = subprocess.run(modetest_cmd.split(' '), capture_output=True, check=True, text=True)
+    modetest_output = run_cached(modetest_cmd.split(' '), "display", check=True)
     matches = re.search(r"\bconnected\b", modetest_output.stdout)
     if matches:
         return "connected"
@@ -41,7 +40,7 @@ def get_display_property_key(prop, key, display_device):
             str/None: string of the key properties/None if key properties is just whitespace 
     """
     modetest_cmd = f"modetest -D {display_device} -c"
-    modetest_output = subprocess.run(modetest_cmd.split(' '), capture_output=True, check=True, text=True)
+    modetest_output = run_cached(modetest_cmd.split(' '), "display", check=True)
     # Search for property in modetest_output
     output = re.split(r'(\d+ [\w-]+:)', modetest_output.stdout)
     for i in range(len(output)):
@@ -73,7 +72,7 @@ def get_plane_id(prop, display_device):
             str/None: Plane ID as a string/None if not found
     """
     modetest_cmd = f"modetest -D {display_device} -c"
-    modetest_output = subprocess.run(modetest_cmd.split(' '), capture_output=True, check=True, text=True)
+    modetest_output = run_cached(modetest_cmd.split(' '), "display", check=True)
     output = re.split(r'[\n\t]', modetest_output.stdout)
     # Search for property in modetest_output
     for i in output:
@@ -88,40 +87,28 @@ def get_plane_id(prop, display_device):
     return None
 
 
-def run_modetest_pipeline(plane_id, fmt, logger):
+def run_modetest_pipeline(plane_id, fmt, logger, label):
     """
     Args:
             plane_id: Plane ID of display device
             fmt: Display format value
             logger: Handle for logging
+            label: Label for Interface under test
 
     Returns:
             bool: True if output observed, False if not observed or user input timed out
     """
     modetest_cmd = f"modetest -M xlnx -s {plane_id}:#0@{fmt}"
-    try:
-        logger.info("Please observe output on Monitor")
-        process = subprocess.Popen(modetest_cmd.split(' '), stdout=subprocess.PIPE)
-        time.sleep(10)
-        os.kill(process.pid, signal.SIGKILL)
-        while(1):
-            logger.info("Did you see color bar test pattern on Monitor [Y/N]?")
-            user_timeout = 30
-            var = input_timeout(user_timeout).strip().upper()
-            if var == 'Y':
-                logger.info("User reports pattern was observed on Monitor")
-                ret_val = True
-                break
-            elif var == 'N':
-                logger.error("User reports pattern was not observed on Monitor")
-                ret_val = False
-                break
-            else:
-                logger.info("Invalid input, please try again")
-    except TimeoutException:
-        logger.error("No user input entered after " + str(user_timeout) + " seconds, aborting test")
-        ret_val = False
-    return ret_val
+    logger.info("Please observe output on Monitor")
+    logger.phase("measure")
+    process = spawn(modetest_cmd.split(' '), capture=False, logger=logger)
+    time.sleep(10)
+    process.stop()
+    # The modeset changed the connector/plane state
+    invalidate("display")
+    logger.phase("confirm")
+    return prompt_manager.confirm(label, "Did you see color bar test pattern on Monitor", logger,
+                                  evidence={'format': fmt, 'shown for': "10s"})
 
 
 def run_display_connectivity_test(label, display_device, helpers):
@@ -136,6 +123,7 @@ def run_display_connectivity_test(label, display_device, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
     # Function call to get Display status,property/key
+    logger.phase("measure")
     status = get_display_status(display_device)
     edid_value = get_display_property_key('EDID', 'value', display_device)
     if status == "disconnected" or edid_value == None:
@@ -159,9 +147,10 @@ def run_display_modetest(label, display_device, fmt, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
     # Fetch the Plane ID
+    logger.phase("discovery")
     plane_id = get_plane_id('id', display_device)
     if plane_id == None:
         logger.error("Plane ID not found")
         return False
     # Function call to Run Modetest Pipeline
-    return run_modetest_pipeline(plane_id, fmt, logger)
+    return run_modetest_pipeline(plane_id, fmt, logger, label)
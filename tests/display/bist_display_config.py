@@ -3,11 +3,11 @@
 
 supported_boards = {
     'kv260': [
-        {'label': 'display_connectivity', 'display_device': 'fd4a0000.display'},
-        {'label': 'display_modetest', 'display_device': 'fd4a0000.display', 'fmt': 'AR24'},
+        {'label': 'display_connectivity', 'display_device': 'fd4a0000.display', 'resources': ['display']},
+        {'label': 'display_modetest', 'display_device': 'fd4a0000.display', 'fmt': 'AR24', 'resources': ['display', 'console']},
     ],
     'kr260': [
-        {'label': 'display_connectivity', 'display_device': 'fd4a0000.display'},
-        {'label': 'display_modetest', 'display_device': 'fd4a0000.display', 'fmt': 'AR24'},
+        {'label': 'display_connectivity', 'display_device': 'fd4a0000.display', 'resources': ['display']},
+        {'label': 'display_modetest', 'display_device': 'fd4a0000.display', 'fmt': 'AR24', 'resources': ['display', 'console']},
     ],
 }
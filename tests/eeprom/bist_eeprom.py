@@ -2,13 +2,16 @@
 # SPDX-License-Identifier: MIT
 
 import glob
-import subprocess
+from proc_runner import run
 
 def run_eeprom_test(label, eeprom_addr, field, value, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
+    logger.phase("measure")
     eeprom_file = glob.glob('/sys/devices/platform/axi/*.i2c/*/*' + eeprom_addr + '/eeprom')[0]
-    ret, fru = subprocess.getstatusoutput('/usr/sbin/ipmi-fru' + ' --fru-file=' + eeprom_file  + ' --interpret-oem-data')
+    # Errors of ipmi-fru are checked in its output, so merge stderr into stdout
+    result = run('/usr/sbin/ipmi-fru' + ' --fru-file=' + eeprom_file  + ' --interpret-oem-data 2>&1', shell=True, logger=logger)
+    ret, fru = result.returncode, result.stdout.rstrip('\n')
     data_from_eeprom = fru.split(field+": ",1)[1].split("\n",1)[0].strip()
 
     if field == "FRU Board Product Name":
@@ -7,13 +7,15 @@ supported_boards = {
             'label': 'som_eeprom',
             'eeprom_addr': '50',
             'field': 'FRU Board Product Name',
-            'value': 'K26'
+            'value': 'K26',
+            'resources': ['ps_i2c']
         },
         {
             'label': 'carrier_card_eeprom',
             'eeprom_addr': '51',
             'field': 'FRU Board Product Name',
-            'value': 'KV'
+            'value': 'KV',
+            'resources': ['ps_i2c']
         }
     ],
 
@@ -22,13 +24,15 @@ supported_boards = {
             'label': 'som_eeprom',
             'eeprom_addr': '50',
             'field': 'FRU Board Product Name',
-            'value': 'K26'
+            'value': 'K26',
+            'resources': ['ps_i2c']
         },
         {
             'label': 'carrier_card_eeprom',
             'eeprom_addr': '51',
             'field': 'FRU Board Product Name',
-            'value': 'KR'
+            'value': 'KR',
+            'resources': ['ps_i2c']
         }
     ],
 
@@ -37,13 +41,15 @@ supported_boards = {
             'label': 'som_eeprom',
             'eeprom_addr': '50',
             'field': 'FRU Board Product Name',
-            'value': 'K24'
+            'value': 'K24',
+            'resources': ['ps_i2c']
         },
         {
             'label': 'carrier_card_eeprom',
             'eeprom_addr': '51',
             'field': 'FRU Board Product Name',
-            'value': 'KD'
+            'value': 'KD',
+            'resources': ['ps_i2c']
         }
     ]
 }
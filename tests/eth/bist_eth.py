@@ -2,14 +2,16 @@
 # SPDX-License-Identifier: MIT
 
 import os
-import signal
-import subprocess
-import netifaces
 import ipaddress
-from ping3 import ping
-import glob
 from time import sleep
 import re
+import hw_discovery
+from cmd_cache import run_cached
+from proc_runner import run
+from lazy_import import lazy_import
+
+netifaces = lazy_import("netifaces")
+ping3 = lazy_import("ping3")
 
 
 def eth_get_interface_speed(phy_addr, logger):
@@ -24,35 +26,19 @@ def eth_get_interface_speed(phy_addr, logger):
             string: eth interface
             float: Max speed in Gb/s
     """
-    # Get list of eth interfaces
-    interface_list = [interface for interface in netifaces.interfaces() if "eth" in interface]
+    eth_interface = hw_discovery.get_index().eth_interface(phy_addr)
+    if eth_interface is None:
+        return None, None
 
     # Check for SFP case where PHY address is None
     if phy_addr is None:
-        # Find eth interface without a PHY
-        for interface in interface_list:
-            if glob.glob("/sys/class/net/" + interface + "/phydev") == []:
-                logger.debug("The SFP interface is: " + interface)
-                # Default speed for SFP
-                sfp_max_speed = 0.5 # Gbps
-                return interface, sfp_max_speed
-
-    # Check for matching PHY address
-    for interface in interface_list:
-        cmd = "ethtool " + interface
-        ret = subprocess.run(cmd.split(' '), check=True, capture_output=True, text=True)
-        if ret.returncode:
-            logger.error("Failed to run " + cmd)
-            return None, None
-        output = ret.stdout
-        if not output:
-            logger.error("Failed to read ethtool output")
-            return None, None
-        phy_addr_string = "PHYAD: " + str(phy_addr)
-        if phy_addr_string in output:
-            speed = eth_get_speed(interface, logger)
-            return interface, speed
-    return None, None
+        logger.debug("The SFP interface is: " + eth_interface)
+        # Default speed for SFP
+        sfp_max_speed = 0.5 # Gbps
+        return eth_interface, sfp_max_speed
+
+    speed = eth_get_speed(eth_interface, logger)
+    return eth_interface, speed
 
 def eth_get_speed(eth_interface, logger):
     """
@@ -66,7 +52,7 @@ def eth_get_speed(eth_interface, logger):
             float: Max speed in Gb/s
     """
     cmd = "ethtool " + eth_interface
-    ret = subprocess.run(cmd.split(' '), check=True, capture_output=True, text=True)
+    ret = run_cached(cmd.split(' '), "net")
     if ret.returncode:
         logger.error("Failed to run " + cmd)
         return None
@@ -147,21 +133,25 @@ def run_eth_ping_test(label, phy_addr, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("discovery")
     eth_interface, _ = eth_get_interface_speed(phy_addr, logger)
     if eth_interface is None:
         logger.error("Failed to get eth interface")
         return False
 
+    logger.phase("setup")
     _, host_ip = eth_setup(label, eth_interface, logger)
     if not host_ip:
         return False
 
+    logger.phase("measure")
     logger.info("Pinging remote host " + host_ip)
-    ping_result = ping(host_ip, interface=eth_interface)
+    ping_result = ping3.ping(host_ip, interface=eth_interface)
     logger.info("Delay: " + str(ping_result))
 
     # ping returns delay if successful, False otherwise
     if ping_result:
+        logger.record_metric("ping_delay", ping_result, "s")
         return True
     else:
         return False
@@ -203,11 +193,13 @@ def run_eth_perf_test(label, phy_addr, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("discovery")
     eth_interface, max_speed_gbps = eth_get_interface_speed(phy_addr, logger)
     if eth_interface is None or max_speed_gbps is None:
         logger.error("Failed to get eth interface and speed")
         return False
 
+    logger.phase("setup")
     interface_ip, host_ip = eth_setup(label, eth_interface, logger)
     if not interface_ip or not host_ip:
         return False
@@ -215,29 +207,29 @@ def run_eth_perf_test(label, phy_addr, helpers):
     # iperf3 command,run it for 5 seconds,display rate in Mbits/sec,use zerocopy flag
     iperf3_cmd = f"iperf3 -c {host_ip} -B {interface_ip} -f m -t 5 -Z"
     # Run the iperf3 command
-    try:
-        process = subprocess.Popen(iperf3_cmd.split(' '), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
-        stdout, stderr = process.communicate(timeout=10)
-    except subprocess.TimeoutExpired as e:
-        logger.error("iperf3 command timed out after " + str(e.timeout) + " seconds.")
-        os.kill(process.pid, signal.SIGKILL)
+    logger.phase("measure")
+    iperf3_timeout = 10
+    process = run(iperf3_cmd.split(' '), timeout=iperf3_timeout, logger=logger)
+    if process.timed_out:
+        logger.error("iperf3 command timed out after " + str(iperf3_timeout) + " seconds.")
         return False
     if process.returncode:
         logger.error("iperf3 failed to measure bitrate. "
             "Please ensure the remote host IP is correct and an iperf3 server is running on the remote host.")
-        os.kill(process.pid, signal.SIGKILL)
         return False
-    iperf3_output = stdout.decode('utf8')
+    iperf3_output = process.stdout
     logger.debug(iperf3_output)
 
     # Check if measured bitrate is above threshold
     iperf3_result = get_bitrate(iperf3_output, logger)
     if not iperf3_result:
         return False
+    logger.record_metric("bitrate", iperf3_result, "Mbit/s")
 
     perf_speed_threshold = 800
     if iperf3_result >= perf_speed_threshold:
-        return True
+        # Compare measured bitrate with the same interface on other boards
+        return logger.check_regression("bitrate", iperf3_result)
     else:
         logger.error("The measured bitrate is lower than " + str(int(perf_speed_threshold/10)) + "% of the "
             "max bitrate of " + str(max_speed_gbps) + " Gbits/sec")
@@ -3,29 +3,29 @@
 
 supported_boards = {
     'kv260': [
-        {'label': 'ethernet1_ping', 'phy_addr': '1'},
-        {'label': 'ethernet1_perf', 'phy_addr': '1'}
+        {'label': 'ethernet1_ping', 'phy_addr': '1', 'resources': ['ethernet1']},
+        {'label': 'ethernet1_perf', 'phy_addr': '1', 'resources': ['ethernet1', 'iperf3_server']}
     ],
 
     'kr260': [
-        {'label': 'ethernet1_ping', 'phy_addr': '2'},
-        {'label': 'ethernet1_perf', 'phy_addr': '2'},
-        {'label': 'ethernet2_ping', 'phy_addr': '3'},
-        {'label': 'ethernet2_perf', 'phy_addr': '3'},
-        {'label': 'ethernet3_ping', 'phy_addr': '4'},
-        {'label': 'ethernet3_perf', 'phy_addr': '4'},
-        {'label': 'ethernet4_ping', 'phy_addr': '8'},
-        {'label': 'ethernet4_perf', 'phy_addr': '8'},
-        {'label': 'ethernet_sfp_ping', 'phy_addr': None},
-        {'label': 'ethernet_sfp_perf', 'phy_addr': None}
+        {'label': 'ethernet1_ping', 'phy_addr': '2', 'resources': ['ethernet1']},
+        {'label': 'ethernet1_perf', 'phy_addr': '2', 'resources': ['ethernet1', 'iperf3_server']},
+        {'label': 'ethernet2_ping', 'phy_addr': '3', 'resources': ['ethernet2']},
+        {'label': 'ethernet2_perf', 'phy_addr': '3', 'resources': ['ethernet2', 'iperf3_server']},
+        {'label': 'ethernet3_ping', 'phy_addr': '4', 'resources': ['ethernet3']},
+        {'label': 'ethernet3_perf', 'phy_addr': '4', 'resources': ['ethernet3', 'iperf3_server']},
+        {'label': 'ethernet4_ping', 'phy_addr': '8', 'resources': ['ethernet4']},
+        {'label': 'ethernet4_perf', 'phy_addr': '8', 'resources': ['ethernet4', 'iperf3_server']},
+        {'label': 'ethernet_sfp_ping', 'phy_addr': None, 'resources': ['ethernet_sfp']},
+        {'label': 'ethernet_sfp_perf', 'phy_addr': None, 'resources': ['ethernet_sfp', 'iperf3_server']}
     ],
 
     'kd240': [
-        {'label': 'ethernet1_ping', 'phy_addr': '2'},
-        {'label': 'ethernet1_perf', 'phy_addr': '2'},
-        {'label': 'ethernet2_ping', 'phy_addr': '3'},
-        {'label': 'ethernet2_perf', 'phy_addr': '3'},
-        {'label': 'ethernet3_ping', 'phy_addr': '8'},
-        {'label': 'ethernet3_perf', 'phy_addr': '8'},
+        {'label': 'ethernet1_ping', 'phy_addr': '2', 'resources': ['ethernet1']},
+        {'label': 'ethernet1_perf', 'phy_addr': '2', 'resources': ['ethernet1', 'iperf3_server']},
+        {'label': 'ethernet2_ping', 'phy_addr': '3', 'resources': ['ethernet2']},
+        {'label': 'ethernet2_perf', 'phy_addr': '3', 'resources': ['ethernet2', 'iperf3_server']},
+        {'label': 'ethernet3_ping', 'phy_addr': '8', 'resources': ['ethernet3']},
+        {'label': 'ethernet3_perf', 'phy_addr': '8', 'resources': ['ethernet3', 'iperf3_server']},
     ]
 }
@@ -2,136 +2,158 @@
 # SPDX-License-Identifier: MIT
 
 # Import the 'modules' that are required for test cases execution
-import glob
 import itertools
-import errno
-from periphery import GPIO, GPIOError
+import random
+import statistics
+import time
+import hw_discovery
+from gpio_cdev import GPIOPort
 
+# Label of the GPIO chip under test, "<8-digit hex value>.gpio"
+chip_label_pattern = r"[0-9a-fA-F]{8}\.gpio"
 
-def gpio_get_chip():
-    """
-    Find correct devpath for GPIO under test
+# Seed and number of the pseudo-random loopback patterns, fixed so runs are reproducible
+pattern_seed = 0x4B524941
+random_patterns = 16
 
-    Returns:
-            string: GPIO devpath
-    """
-    chips = glob.glob('/dev/gpiochip*')
-    for chip in chips:
-        try:
-            gpio = GPIO(chip, 0, "in")
-            label = gpio.chip_label
-            # Check for a label in format "<8-digit hex value>.gpio"
-            if (len(label) == 13) and label.split('.')[1] == 'gpio':
-                try:
-                    int(label.split('.')[0], 16)
-                    device_path = gpio.devpath
-                    gpio.close()
-                    return device_path
-                except ValueError:
-                    gpio.close()
-            else:
-                gpio.close()
-        except GPIOError as e:
-            if e.errno == errno.EBUSY:
-                # Device or resource busy
-                continue
-            else:
-                raise e
-    print('No gpiochip found with label in format "<8-digit hex value>.gpio"')
+# Edges timed per pin for the latency histogram, square wave periods driven for the toggle
+# rate, and seconds to wait for an edge before the pin counts as not toggling
+latency_samples = 200
+toggle_periods = 1000
+edge_timeout = 0.1
 
 
-def gpio_write(chip, offset, value):
+def gpio_get_chip(label_pattern=None):
     """
-    Writes value (True or False) at given offset
+    Find correct devpath for GPIO under test, from the chip labels read once per session
 
     Args:
-            chip: GPIO devpath
-            offset: Write offset, value written at this offset
-            value: Value to be written
+            label_pattern: Regular expression matching the whole chip label, None for chip_label_pattern
+
+    Returns:
+            string/None: GPIO devpath/None if no chip label matches
     """
-    # Open legitimate GPIO out line, write the value, close GPIO line
-    gpio_out = GPIO(chip, offset, "out")
-    gpio_out.write(bool(value))
-    gpio_out.close()
+    return hw_discovery.get_index().gpio_chip(label_pattern or chip_label_pattern)
 
 
-def gpio_read(chip, offset):
+def generate_patterns(width, seed=pattern_seed, random_count=random_patterns):
     """
-    Reads value at given offset
+    Generate the patterns written to the loopback, as bitmasks with bit i driving write pin i
 
     Args:
-            chip: GPIO devpath
-            offset: Read offset, value read from this offset
+            width: Number of bits
+            seed: Seed of the pseudo-random patterns
+            random_count: Number of pseudo-random patterns
 
     Returns:
-                int: Value read from given offset
+            list: (pattern name, bitmask) tuples, walking ones, walking zeros, checkerboard and
+                  its inverse, then the pseudo-random patterns
     """
-    # Open legitimate GPIO in line, read the value, close GPIO line
-    gpio_in = GPIO(chip, offset, "in")
-    read_val = int(gpio_in.read())
-    gpio_in.close()
-    return read_val
+    full = (1 << width) - 1
+    checkerboard = int("01" * width, 2) & full
+    generator = random.Random(seed)
+    return ([("walking ones", 1 << i) for i in range(width)]
+            + [("walking zeros", full ^ (1 << i)) for i in range(width)]
+            + [("checkerboard", checkerboard), ("inverse checkerboard", full ^ checkerboard)]
+            + [("random", generator.getrandbits(width)) for _ in range(random_count)])
 
 
-def gpio_write_range(chip, offset, width, values):
+def format_bits(bits, width):
     """
     Args:
-            chip: GPIO devpath
-            offset: Write offset, value written at this offset
-            width: Number of bits to write
-            values: Tuple of int values
+            bits: Bitmask
+            width: Number of bits
+
+    Returns:
+            str: Bits as 1's and 0's, bit 0 first
     """
-    # Function call to write values to a GPIO line
-    for i in range(width):
-        gpio_write(chip, offset + i, values[i])
+    return "".join(str((bits >> i) & 1) for i in range(width))
 
 
-def gpio_read_range(chip, offset, width):
+def get_traces(patterns, width):
     """
+    Transpose patterns into one trace per pin
+
     Args:
-            chip: GPIO devpath
-            offset: Read offset,value read from this offset
-            width: Number of bits to read
+            patterns: Bitmasks, bit i for pin i
+            width: Number of pins
 
     Returns:
-                tuple: Tuple of int values
+            list: Trace of each pin, bit k being the value of the pin in pattern k
+    """
+    traces = [0] * width
+    for k, bits in enumerate(patterns):
+        for i in range(width):
+            traces[i] |= ((bits >> i) & 1) << k
+    return traces
+
+
+def classify_pins(written, read, width, inverted):
     """
-    r_pattern = []
+    Classify each loopback pin from all the patterns written and read back
 
-    # Function call to read values from a GPIO line
-    for i in range(width):
-        r_pattern.append(gpio_read(chip, offset + i))
-    return tuple(r_pattern)
+    A pin is ok if it reads what its write pin drove (inverted for an inverted loopback),
+    stuck-at-0 or stuck-at-1 if it always reads the same value, shorted to a neighbour if it
+    reads the same value as a neighbouring pin in every pattern, and open otherwise.
 
+    Args:
+            written: Bitmasks written
+            read: Bitmasks read back
+            width: Number of pins
+            inverted: True if the loopback inverts the written values
 
-def generate_patterns(width):
+    Returns:
+            list: Fault of each pin, None for an ok pin, else stuck-at-0, stuck-at-1, open
+                  or (shorted, neighbour pin)
     """
-    Generate bit patterns, with only one bit set, for all permutations of <width> number of bits
+    all_patterns = (1 << len(written)) - 1
+    expected = [trace ^ all_patterns if inverted else trace for trace in get_traces(written, width)]
+    traces = get_traces(read, width)
+    faults = []
+    for i, trace in enumerate(traces):
+        neighbours = [j for j in (i - 1, i + 1) if 0 <= j < width and traces[j] == trace]
+        if trace == expected[i]:
+            faults.append(None)
+        elif trace == 0:
+            faults.append("stuck-at-0")
+        elif trace == all_patterns:
+            faults.append("stuck-at-1")
+        elif neighbours:
+            faults.append(("shorted", neighbours[0]))
+        else:
+            faults.append("open")
+    return faults
 
+
+def format_fault_map(faults):
+    """
     Args:
-            width: Number of bits
+            faults: Fault of each pin, see classify_pins()
 
     Returns:
-                list: List of tuples of type int with binary pattern
+            str: One character per pin, pin 0 first: . ok, 0 stuck-at-0, 1 stuck-at-1,
+                 S shorted to a neighbour, O open
     """
-    patterns = []
-    for i in range(width):
-        # Generate binary patterns with only one set bit & add padding based on total bits(width)
-        # Convert tuple of type str to tuple of type int
-        patterns.append(tuple(int(digit) for digit in format(1 << i, 'b').zfill(width)))
-    return patterns
+    codes = {None: ".", "stuck-at-0": "0", "stuck-at-1": "1", "open": "O"}
+    return "".join("S" if isinstance(fault, tuple) else codes[fault] for fault in faults)
 
 
-def run_gpio_loopback(label, width, offset, helpers):
+def run_gpio_loopback(label, width, offset, inverted, helpers):
     """
     GPIO Loopback test execution
 
+    Every pattern is written and read back, then each pin is classified from all of them
+    and the faulty pins are logged with their offsets.
+
     Args:
             label: Interface under test
             width: Width of the GPIO under test
             offset: Offset of the GPIO under test
+            inverted: True if the loopback inverts the written values
             helpers: Handle for logging
 
+    Returns:
+            bool: True if every pin is ok
     """
     logger = helpers.logger_init(label)
     logger.start_test()
@@ -140,41 +162,190 @@ def run_gpio_loopback(label, width, offset, helpers):
     r_offset = offset + width
 
     # Function call to get legitimate GPIO devpath
+    logger.phase("discovery")
     chip = gpio_get_chip()
-    # Function call to generate patterns(1's and 0's)
+    if chip is None:
+        logger.error('No gpiochip found with label in format "<8-digit hex value>.gpio"')
+        logger.test_failed()
+        logger.stop_test()
+        return False
     patterns = generate_patterns(width)
+    full = (1 << width) - 1
+
+    # Request the write and read lines once, then write each pattern of specified
+    # width(number of bits) and read it back from the loopbacked pins with one ioctl each
+    logger.phase("setup")
+    written = []
+    read = []
+    with GPIOPort(chip, range(w_offset, w_offset + width), range(r_offset, r_offset + width)) as port:
+        logger.phase("measure")
+        for name, w_bits in patterns:
+            port.write(w_bits)
+            r_bits = port.read()
+            written.append(w_bits)
+            read.append(r_bits)
+            result = "Match" if r_bits == (w_bits ^ full if inverted else w_bits) else "Mismatch"
+            logger.info(f"Write pattern: {format_bits(w_bits, width)}, Read pattern {format_bits(r_bits, width)} : "
+                        f"{result}{' (inverted as expected)' if inverted and result == 'Match' else ''} ({name})")
+    logger.info(f"Pseudo-random patterns seeded with {pattern_seed:#x}")
+
+    faults = classify_pins(written, read, width, inverted)
+    logger.info(f"Fault map (pin 0 first, . ok, 0/1 stuck-at-0/1, S shorted, O open): {format_fault_map(faults)}")
+    for i, fault in enumerate(faults):
+        if fault is None:
+            continue
+        if isinstance(fault, tuple):
+            fault = f"shorted to pin {fault[1]} (offsets {w_offset + fault[1]}->{r_offset + fault[1]})"
+        elif fault == "open" and inverted and get_traces(read, width)[i] == get_traces(written, width)[i]:
+            fault = "open, read follows the written value. Wire is not connected. Please check wire connection"
+        logger.error(f"Pin {i} (offsets {w_offset + i}->{r_offset + i}): {fault}")
+    pattern_match = not any(faults)
 
-    # Write pattern(1's and 0's) of specified width(number of bits) at given offsets
-    # Read pattern(1's and 0's) from given offsets(loopbacked pins)
-    # Perform comparison of both patterns and conclude match/mismatch
-    for w_pattern in patterns:
-        gpio_write_range(chip, w_offset, width, w_pattern)
-        r_pattern = gpio_read_range(chip, r_offset, width)
+    logger.test_passed() if pattern_match else logger.test_failed()
+    logger.stop_test()
+    return pattern_match
 
-        wp = "".join(map(str, w_pattern))
-        rp = "".join(map(str, r_pattern))
-        result = "Match" if rp == wp else "Mismatch"
 
-        # Check if rp and wp are equal and it is brake_1wire gpio test
-        if rp == wp and "brake" in label:
-            logger.info("Wire is not connected. Please check wire connection")
-            pattern_match = False
+def wait_edge(port, offset, timeout):
+    """
+    Args:
+            port: GPIOPort requested with edges
+            offset: Offset of the input line
+            timeout: Seconds to wait for the edge
 
-        # Check if rp and wp are inverted and it is brake_1wire gpio test
-        elif all(rp != wp for rp,wp in zip(rp,wp)) and "brake" in label:
-            logger.info("Write pattern: " + wp + ", Read pattern " + rp + " : Pattern is inverted which is expected")
-            pattern_match = True
+    Returns:
+            int/None: Kernel timestamp in ns of the next edge of the line/None on timeout
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for event in port.read_events(deadline - time.monotonic()):
+            if event.offset == offset:
+                return event.timestamp_ns
+    return None
 
-        # Case for PMOD and RPI gpio test
-        elif rp == wp:
-            logger.info("Write pattern: " + wp + ", Read pattern " + rp + " : " + result)
-            pattern_match = True
 
-        else:
-            logger.info("Write pattern: " + wp + ", Read pattern " + rp + " : " + result)
-            pattern_match = False
-            break
-    
-    logger.test_passed() if pattern_match else logger.test_failed()
+def drain_edges(port, edges, timeout=0):
+    """
+    Count the queued edge events of each input line
+
+    Args:
+            port: GPIOPort requested with edges
+            edges: Offset -> number of edges, updated
+            timeout: Seconds to wait for the first event
+    """
+    events = port.read_events(timeout)
+    while events:
+        for event in events:
+            edges[event.offset] = edges.get(event.offset, 0) + 1
+        events = port.read_events()
+
+
+def format_histogram(latencies):
+    """
+    Args:
+            latencies: Latencies in microseconds
+
+    Returns:
+            str: Number of latencies in each power of two bucket, eg <8us:12 <16us:180 <32us:8
+    """
+    buckets = {}
+    for latency in latencies:
+        bound = 1 << int(latency).bit_length()
+        buckets[bound] = buckets.get(bound, 0) + 1
+    return " ".join(f"<{bound}us:{count}" for bound, count in sorted(buckets.items()))
+
+
+def run_gpio_benchmark(label, width, offset, helpers):
+    """
+    GPIO loopback toggle rate and propagation latency benchmark
+
+    Each write pin is toggled latency_samples times on its own, and the time from just
+    before the write ioctl to the kernel timestamp of the edge on its read pin is a latency
+    sample. Then all the write pins drive a square wave as fast as the ioctls allow for
+    toggle_periods periods, and the edges seen on the read pins give the toggle frequency
+    they followed.
+
+    Args:
+            label: Interface under test
+            width: Width of the GPIO under test
+            offset: Offset of the GPIO under test
+            helpers: Handle for logging
+
+    Returns:
+            bool: True if every read pin saw the edges of its write pin
+    """
+    logger = helpers.logger_init(label)
+    logger.start_test()
+    width = width // 2
+    w_offset = offset
+    r_offset = offset + width
+
+    logger.phase("discovery")
+    chip = gpio_get_chip()
+    if chip is None:
+        logger.error('No gpiochip found with label in format "<8-digit hex value>.gpio"')
+        logger.test_failed()
+        logger.stop_test()
+        return False
+    full = (1 << width) - 1
+
+    logger.phase("setup")
+    benchmark_pass = True
+    with GPIOPort(chip, range(w_offset, w_offset + width), range(r_offset, r_offset + width), edges=True) as port:
+        drain_edges(port, {})
+
+        # Write-to-edge latency of each pin, toggled on its own
+        logger.phase("measure")
+        value = 0
+        for i in range(width):
+            latencies = []
+            for sample in range(latency_samples):
+                value ^= 1 << i
+                start = time.monotonic_ns()
+                port.write(value)
+                timestamp = wait_edge(port, r_offset + i, edge_timeout)
+                if timestamp is None:
+                    logger.error(f"Pin {i} (offsets {w_offset + i}->{r_offset + i}): no edge within "
+                                 f"{edge_timeout}s after {sample} edges")
+                    benchmark_pass = False
+                    break
+                latency = (timestamp - start) / 1000
+                latencies.append(latency)
+                logger.sample(f"pin{i}_latency", latency)
+            if len(latencies) < 2:
+                continue
+            percentiles = statistics.quantiles(latencies, n=100)
+            logger.info(f"Pin {i} (offsets {w_offset + i}->{r_offset + i}) latency p50 {percentiles[49]:.1f}us "
+                        f"p99 {percentiles[98]:.1f}us max {max(latencies):.1f}us: {format_histogram(latencies)}")
+            logger.record_metric(f"pin{i}_latency_p50", percentiles[49], "us")
+            logger.record_metric(f"pin{i}_latency_p99", percentiles[98], "us")
+
+        # Square wave on all the write pins, draining the events before the kernel buffer fills
+        port.write(0)
+        time.sleep(edge_timeout)
+        drain_edges(port, {})
+        edges = {}
+        start = time.monotonic()
+        for period in range(toggle_periods):
+            port.write(full)
+            port.write(0)
+            if period % 16 == 15:
+                drain_edges(port, edges)
+        elapsed = time.monotonic() - start
+        drain_edges(port, edges, edge_timeout)
+
+    frequency = toggle_periods / elapsed
+    logger.info(f"Toggle frequency {frequency:.0f}Hz ({toggle_periods} periods in {elapsed * 1000:.1f}ms)")
+    logger.record_metric("toggle_frequency", frequency, "Hz")
+    missed = {i: 2 * toggle_periods - edges.get(r_offset + i, 0) for i in range(width)}
+    for i, count in missed.items():
+        if count:
+            logger.warning(f"Pin {i} (offsets {w_offset + i}->{r_offset + i}): {count} of {2 * toggle_periods} "
+                           f"edges missed at {frequency:.0f}Hz")
+    logger.record_metric("missed_edges", sum(missed.values()), "")
+    if not logger.check_regression("toggle_frequency", frequency):
+        benchmark_pass = False
+
+    logger.test_passed() if benchmark_pass else logger.test_failed()
     logger.stop_test()
-    return pattern_match
\ No newline at end of file
+    return benchmark_pass
@@ -3,18 +3,19 @@
 
 supported_boards = {
     'kv260': [
-        {'label': 'pmod0', 'width': 8, 'offset': 0},
+        {'label': 'pmod0', 'width': 8, 'offset': 0, 'resources': ['gpiochip']},
     ],
 
     'kd240': [
-        {'label': 'brake_ctrl_1wire_loopback', 'width': 2, 'offset': 8},
+        {'label': 'brake_ctrl_1wire_loopback', 'width': 2, 'offset': 8, 'inverted': True,
+         'resources': ['gpiochip']},
     ],
 
     'kr260': [
-        {'label': 'pmod0', 'width': 8, 'offset': 0},
-        {'label': 'pmod1', 'width': 8, 'offset': 8},
-        {'label': 'pmod2', 'width': 8, 'offset': 16},
-        {'label': 'pmod3', 'width': 8, 'offset': 24},
-        {'label': 'rpi', 'width': 28, 'offset': 32},
+        {'label': 'pmod0', 'width': 8, 'offset': 0, 'resources': ['gpiochip']},
+        {'label': 'pmod1', 'width': 8, 'offset': 8, 'resources': ['gpiochip']},
+        {'label': 'pmod2', 'width': 8, 'offset': 16, 'resources': ['gpiochip']},
+        {'label': 'pmod3', 'width': 8, 'offset': 24, 'resources': ['gpiochip']},
+        {'label': 'rpi', 'width': 28, 'offset': 32, 'resources': ['gpiochip']},
     ]
 }
@@ -1,36 +1,60 @@
-# Copyright (C) 2022-2023 Advanced Micro Devices, Inc.
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
 # SPDX-License-Identifier: MIT
 
-# Import the 'modules' that are required for execution
+# Import the 'modules' that are required for running the GPIO tests on gpio-sim
+import os
+import re
 import pytest
-from bist_gpio_config import supported_boards
+import board_profiles
+import hw_discovery
+import bist_gpio
+import gpio_cdev
+import gpio_sim
 
 
-def pytest_generate_tests(metafunc):
+@pytest.fixture(scope="session")
+def gpio_sim_chip(request):
     """
-    Collection and parametrization of tests
+    Provision a gpio-sim chip with the loopback pairs of the board's GPIO tests when run
+    with --gpio-sim, and remove it at the end of the session
 
     Args:
-            metafunc: Has a parametrize function,way to provide multiple variants of values for parametrization
+            request: Pytest request of the first GPIO test
 
-    Data Structure:
-            val(list): Lookup for board parameters
-            test_id(list): Lookup for Test labels.Tests are parametrized based on label
+    Returns:
+            GPIOSim/None: Simulated chip/None if --gpio-sim is not given
+    """
+    if not request.config.getoption("gpio_sim"):
+        yield None
+        return
+    if not os.path.isdir(gpio_sim.configfs_root):
+        pytest.fail(f"--gpio-sim needs {gpio_sim.configfs_root}, load the gpio-sim module and mount configfs")
+    entries, labels = board_profiles.get_parameters(request.config.getoption("board"), "gpio")
+    chip = gpio_sim.GPIOSim(gpio_sim.get_pairs(entries))
+    chip.create()
+    # The GPIO chip labels were read before the chip existed
+    hw_discovery.reset()
+    yield chip
+    chip.remove()
+    hw_discovery.reset()
+
+
+@pytest.fixture(autouse=True)
+def gpio_sim_loopback(gpio_sim_chip, monkeypatch):
+    """
+    Test the simulated chip even if the host has other chips with a matching label, and
+    drive its read lines after every write, as the loopback wires do
 
+    Args:
+            gpio_sim_chip: Simulated chip/None
+            monkeypatch: Pytest monkeypatch of the test
     """
-    board = metafunc.config.getoption("board")
-    val = []
-    test_id = []
-
-    # Create a list of configs(based on the board) and test IDs for
-    # parametrization
-    if board in supported_boards.keys():
-        val = supported_boards[board]
-        for value in supported_boards[board]:
-            test_id.append(value['label'])
-
-    else:
-        val = pytest.skip("Not supported")
-
-    # Parametrize tests based on test IDs
-    metafunc.parametrize("id", val, ids=test_id)
+    if gpio_sim_chip is None:
+        return
+    monkeypatch.setattr(bist_gpio, "chip_label_pattern", re.escape(gpio_sim.sim_label))
+    set_values = gpio_cdev.GPIOLines.set_values
+
+    def set_values_and_propagate(lines, bits):
+        set_values(lines, bits)
+        gpio_sim_chip.propagate(lines.offsets, bits)
+    monkeypatch.setattr(gpio_cdev.GPIOLines, "set_values", set_values_and_propagate)
@@ -0,0 +1,260 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for GPIO character device access
+import ctypes
+import fcntl
+import os
+import select
+
+# GPIO character device v2 API, see linux/gpio.h
+GPIO_MAX_NAME_SIZE = 32
+GPIO_V2_LINES_MAX = 64
+GPIO_V2_LINE_NUM_ATTRS_MAX = 10
+
+GPIO_V2_LINE_FLAG_INPUT = 1 << 2
+GPIO_V2_LINE_FLAG_OUTPUT = 1 << 3
+GPIO_V2_LINE_FLAG_EDGE_RISING = 1 << 4
+GPIO_V2_LINE_FLAG_EDGE_FALLING = 1 << 5
+
+GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES = 2
+
+GPIO_V2_LINE_EVENT_RISING_EDGE = 1
+GPIO_V2_LINE_EVENT_FALLING_EDGE = 2
+
+# Largest event buffer of a line request, the kernel limits it to 16 events per line
+GPIO_V2_EVENT_BUFFER_MAX = GPIO_V2_LINES_MAX * 16
+# Edge events read from the kernel per read call
+event_read_count = 64
+
+
+class gpio_v2_line_attribute_value(ctypes.Union):
+    _fields_ = [
+        ('flags', ctypes.c_uint64),
+        ('values', ctypes.c_uint64),
+        ('debounce_period_us', ctypes.c_uint32),
+    ]
+
+
+class gpio_v2_line_attribute(ctypes.Structure):
+    _anonymous_ = ('value',)
+    _fields_ = [
+        ('id', ctypes.c_uint32),
+        ('padding', ctypes.c_uint32),
+        ('value', gpio_v2_line_attribute_value),
+    ]
+
+
+class gpio_v2_line_config_attribute(ctypes.Structure):
+    _fields_ = [
+        ('attr', gpio_v2_line_attribute),
+        ('mask', ctypes.c_uint64),
+    ]
+
+
+class gpio_v2_line_config(ctypes.Structure):
+    _fields_ = [
+        ('flags', ctypes.c_uint64),
+        ('num_attrs', ctypes.c_uint32),
+        ('padding', ctypes.c_uint32 * 5),
+        ('attrs', gpio_v2_line_config_attribute * GPIO_V2_LINE_NUM_ATTRS_MAX),
+    ]
+
+
+class gpio_v2_line_request(ctypes.Structure):
+    _fields_ = [
+        ('offsets', ctypes.c_uint32 * GPIO_V2_LINES_MAX),
+        ('consumer', ctypes.c_char * GPIO_MAX_NAME_SIZE),
+        ('config', gpio_v2_line_config),
+        ('num_lines', ctypes.c_uint32),
+        ('event_buffer_size', ctypes.c_uint32),
+        ('padding', ctypes.c_uint32 * 5),
+        ('fd', ctypes.c_int32),
+    ]
+
+
+class gpio_v2_line_values(ctypes.Structure):
+    _fields_ = [
+        ('bits', ctypes.c_uint64),
+        ('mask', ctypes.c_uint64),
+    ]
+
+
+class gpio_v2_line_event(ctypes.Structure):
+    _fields_ = [
+        ('timestamp_ns', ctypes.c_uint64),  # CLOCK_MONOTONIC, as time.monotonic_ns()
+        ('id', ctypes.c_uint32),
+        ('offset', ctypes.c_uint32),
+        ('seqno', ctypes.c_uint32),
+        ('line_seqno', ctypes.c_uint32),
+        ('padding', ctypes.c_uint32 * 6),
+    ]
+
+
+def gpio_iowr(number, struct):
+    """
+    Args:
+            number: Command number of the ioctl
+            struct: ctypes type of the argument, read and written by the kernel
+
+    Returns:
+            int: ioctl request code
+    """
+    return (3 << 30) | (ctypes.sizeof(struct) << 16) | (0xB4 << 8) | number
+
+
+GPIO_V2_GET_LINE_IOCTL = gpio_iowr(0x07, gpio_v2_line_request)
+GPIO_V2_LINE_GET_VALUES_IOCTL = gpio_iowr(0x0E, gpio_v2_line_values)
+GPIO_V2_LINE_SET_VALUES_IOCTL = gpio_iowr(0x0F, gpio_v2_line_values)
+
+
+class GPIOLines:
+    """
+    Lines of a GPIO chip requested together, set or read as a bitmask in a single ioctl
+
+    Bit i of a bitmask is the value of the i-th requested offset.
+    """
+
+    def __init__(self, chip, offsets, direction, values=0, consumer="kria-bist", edges=False):
+        """
+        Args:
+                chip: GPIO devpath
+                offsets: Line offsets, at most GPIO_V2_LINES_MAX
+                direction: "in" or "out"
+                values: Initial bitmask of output lines
+                consumer: Consumer label of the lines
+                edges: True to queue an event on every edge of the input lines, see read_events()
+        """
+        if not 0 < len(offsets) <= GPIO_V2_LINES_MAX:
+            raise ValueError(f"Cannot request {len(offsets)} GPIO lines, 1 to {GPIO_V2_LINES_MAX} are supported")
+        self.offsets = list(offsets)
+        self.mask = (1 << len(offsets)) - 1
+        self.fd = None
+
+        request = gpio_v2_line_request()
+        for index, offset in enumerate(offsets):
+            request.offsets[index] = offset
+        request.consumer = consumer.encode()[:GPIO_MAX_NAME_SIZE - 1]
+        request.num_lines = len(offsets)
+        if direction == "out":
+            request.config.flags = GPIO_V2_LINE_FLAG_OUTPUT
+            request.config.num_attrs = 1
+            request.config.attrs[0].attr.id = GPIO_V2_LINE_ATTR_ID_OUTPUT_VALUES
+            request.config.attrs[0].attr.values = values & self.mask
+            request.config.attrs[0].mask = self.mask
+        else:
+            request.config.flags = GPIO_V2_LINE_FLAG_INPUT
+            if edges:
+                request.config.flags |= GPIO_V2_LINE_FLAG_EDGE_RISING | GPIO_V2_LINE_FLAG_EDGE_FALLING
+                request.event_buffer_size = GPIO_V2_EVENT_BUFFER_MAX
+
+        chip_fd = os.open(chip, os.O_RDWR | os.O_CLOEXEC)
+        try:
+            fcntl.ioctl(chip_fd, GPIO_V2_GET_LINE_IOCTL, request)
+        finally:
+            os.close(chip_fd)
+        self.fd = request.fd
+
+    def set_values(self, bits):
+        """
+        Args:
+                bits: Bitmask of the values of all the lines
+        """
+        fcntl.ioctl(self.fd, GPIO_V2_LINE_SET_VALUES_IOCTL, gpio_v2_line_values(bits & self.mask, self.mask))
+
+    def get_values(self):
+        """
+        Returns:
+                int: Bitmask of the values of all the lines
+        """
+        values = gpio_v2_line_values(0, self.mask)
+        fcntl.ioctl(self.fd, GPIO_V2_LINE_GET_VALUES_IOCTL, values)
+        return values.bits & self.mask
+
+    def read_events(self, timeout=0):
+        """
+        Read the edge events queued by the kernel, waiting up to timeout for the first one
+
+        Events that do not fit in the kernel buffer are dropped, which shows as a gap in
+        their seqno.
+
+        Args:
+                timeout: Seconds to wait for an event, 0 to return at once
+
+        Returns:
+                list: gpio_v2_line_event of the queued events, oldest first, up to event_read_count
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        size = ctypes.sizeof(gpio_v2_line_event)
+        data = os.read(self.fd, size * event_read_count)
+        return [gpio_v2_line_event.from_buffer_copy(data, offset) for offset in range(0, len(data) - size + 1, size)]
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class GPIOPort:
+    """
+    Write and read halves of a GPIO loopback, each requested once, so a whole pattern is
+    applied with one ioctl and sampled with another
+    """
+
+    def __init__(self, chip, write_offsets, read_offsets, consumer="kria-bist", edges=False):
+        """
+        Args:
+                chip: GPIO devpath
+                write_offsets: Offsets of the output lines, bit i of a written pattern drives write_offsets[i]
+                read_offsets: Offsets of the input lines, bit i of a read pattern is read_offsets[i]
+                consumer: Consumer label of the lines
+                edges: True to queue an event on every edge of the input lines, see read_events()
+        """
+        self.width = len(write_offsets)
+        self.write_lines = GPIOLines(chip, write_offsets, "out", consumer=consumer)
+        try:
+            self.read_lines = GPIOLines(chip, read_offsets, "in", consumer=consumer, edges=edges)
+        except Exception:
+            self.write_lines.close()
+            raise
+
+    def write(self, bits):
+        """
+        Args:
+                bits: Bitmask driven on the output lines
+        """
+        self.write_lines.set_values(bits)
+
+    def read(self):
+        """
+        Returns:
+                int: Bitmask sampled on the input lines
+        """
+        return self.read_lines.get_values()
+
+    def read_events(self, timeout=0):
+        """
+        Args:
+                timeout: Seconds to wait for an event, 0 to return at once
+
+        Returns:
+                list: Edge events of the input lines, see GPIOLines.read_events()
+        """
+        return self.read_lines.read_events(timeout)
+
+    def close(self):
+        self.write_lines.close()
+        self.read_lines.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,119 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for the gpio-sim stand-in
+import os
+
+# configfs directory of the gpio-sim module, needs the gpio-sim module and configfs mounted
+configfs_root = "/sys/kernel/config/gpio-sim"
+# Label of the simulated chip, in the format gpio_get_chip expects
+sim_label = "00000000.gpio"
+
+
+def write_attribute(path, value):
+    with open(path, 'w') as f:
+        f.write(value)
+
+
+def read_attribute(path):
+    with open(path, 'r') as f:
+        return f.read().strip()
+
+
+def get_pairs(entries):
+    """
+    Wire the lines of the GPIO config entries of a board as loopback pairs
+
+    Args:
+            entries: Config entries of the gpio module
+
+    Returns:
+            dict: Write offset -> (read offset, True if the loopback inverts the value)
+    """
+    pairs = {}
+    for entry in entries:
+        half = entry['width'] // 2
+        for i in range(half):
+            pairs[entry['offset'] + i] = (entry['offset'] + half + i, entry.get('inverted', False))
+    return pairs
+
+
+class GPIOSim:
+    """
+    gpio-sim chip standing in for the GPIO chip under test
+
+    gpio-sim lines are not connected to each other, so a loopback pair is emulated by
+    setting the pull of the read line after every write of its write line. The kernel
+    then updates the value of the read line and queues its edge events, like on a board.
+    """
+
+    def __init__(self, pairs, name="kria-bist"):
+        """
+        Args:
+                pairs: Write offset -> (read offset, True if the loopback inverts the value)
+                name: Name of the configfs device directory
+        """
+        self.pairs = pairs
+        self.path = os.path.join(configfs_root, name)
+        self.bank = os.path.join(self.path, "bank0")
+        self.devpath = None
+        self.sysfs = None
+        self.pulls = {}
+
+    def create(self):
+        """
+        Provision the chip, with every read line pulled to the level of its write line driven low
+
+        Returns:
+                str: GPIO devpath of the chip
+        """
+        if os.path.isdir(self.path):
+            self.remove()
+        num_lines = max(max(self.pairs), max(read for read, inverted in self.pairs.values())) + 1
+        os.mkdir(self.path)
+        os.mkdir(self.bank)
+        write_attribute(os.path.join(self.bank, "label"), sim_label)
+        write_attribute(os.path.join(self.bank, "num_lines"), str(num_lines))
+        write_attribute(os.path.join(self.path, "live"), "1")
+        chip_name = read_attribute(os.path.join(self.bank, "chip_name"))
+        dev_name = read_attribute(os.path.join(self.path, "dev_name"))
+        self.devpath = f"/dev/{chip_name}"
+        self.sysfs = f"/sys/devices/platform/{dev_name}/{chip_name}"
+        for read, inverted in self.pairs.values():
+            self.set_pull(read, inverted)
+        return self.devpath
+
+    def set_pull(self, offset, value):
+        """
+        Args:
+                offset: Offset of the read line
+                value: Level the line is pulled to
+        """
+        if self.pulls.get(offset) == value:
+            return
+        write_attribute(os.path.join(self.sysfs, f"sim_gpio{offset}", "pull"), "pull-up" if value else "pull-down")
+        self.pulls[offset] = value
+
+    def propagate(self, offsets, bits):
+        """
+        Drive the read lines paired with written lines
+
+        Args:
+                offsets: Offsets of the written lines
+                bits: Bitmask written, bit i for offsets[i]
+        """
+        for i, offset in enumerate(offsets):
+            if offset in self.pairs:
+                read, inverted = self.pairs[offset]
+                self.set_pull(read, bool((bits >> i) & 1) != inverted)
+
+    def remove(self):
+        """
+        Remove the chip
+        """
+        if read_attribute(os.path.join(self.path, "live")) == "1":
+            write_attribute(os.path.join(self.path, "live"), "0")
+        os.rmdir(self.bank)
+        os.rmdir(self.path)
+        self.devpath = None
+        self.pulls.clear()
@@ -20,6 +20,27 @@ def test_gpio(id, helpers):
     label = (id["label"])
     width = (id["width"])
     offset = (id["offset"])
+    inverted = id.get("inverted", False)
 
     # Function call to Test GPIO Loopback
-    assert run_gpio_loopback(label, width, offset, helpers)
+    assert run_gpio_loopback(label, width, offset, inverted, helpers)
+
+
+@pytest.mark.gpio
+@pytest.mark.benchmark
+def test_gpio_benchmark(id, helpers):
+    """
+    Function to parse GPIO Configurations for the loopback benchmark, run with --benchmark
+
+    Args:
+            id: List of configurations
+            helpers: Handle for logging
+
+    """
+    # Parse the configurations
+    label = (id["label"])
+    width = (id["width"])
+    offset = (id["offset"])
+
+    # Function call to benchmark the GPIO Loopback toggle rate and latency
+    assert run_gpio_benchmark(label, width, offset, helpers)
@@ -0,0 +1,278 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for test run history
+import json
+import math
+import statistics
+import time
+from collections import defaultdict, deque
+import results_store
+import dependencies
+
+# Number of most recent runs of a test used for its estimates
+window = 20
+# Seconds assumed for a test that has not run on the board yet
+default_duration = 30.0
+# Finest duration step of the time budget selection, in seconds
+min_resolution = 0.1
+# Maximum number of duration steps of the time budget selection
+max_steps = 2000
+
+# Label -> recent durations in seconds, and recent outcomes (1.0 failed, 0.0 passed)
+durations = defaultdict(lambda: deque(maxlen=window))
+failures = defaultdict(lambda: deque(maxlen=window))
+
+# Node ID -> [label, duration of the phases reported so far, failed, skipped] of the tests not finished yet
+running = {}
+# Node ID -> estimated seconds of the tests not finished yet
+remaining = {}
+# Node ID -> [label, failed] of the tests whose outcome waits for their deferred confirmations
+deferred = {}
+total_tests = 0
+workers = 1
+start_time = None
+
+
+def load(path, board):
+    """
+    Read the durations and outcomes of the recent runs of every test of the board
+
+    Args:
+            path: Path of the JSON lines results file, None if there is none
+            board: Board name
+    """
+    durations.clear()
+    failures.clear()
+    if not path:
+        return
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if record['board'] != board:
+                        continue
+                    if record['metric'] == "test_duration":
+                        durations[record['label']].append(float(record['value']))
+                    elif record['metric'] == "test_failed":
+                        failures[record['label']].append(float(record['value']))
+                except (ValueError, KeyError, TypeError):
+                    continue
+    except OSError:
+        pass
+
+
+def get_label(item):
+    """
+    Args:
+            item: Collected pytest item
+
+    Returns:
+            str: Label of the test, its name if it has no config entry
+    """
+    key = dependencies.get_item_key(item)
+    return key[1] if key else item.name
+
+
+def estimated_duration(label):
+    """
+    Args:
+            label: Test label
+
+    Returns:
+            float: Median duration of the recent runs of the test, default_duration if it has none
+    """
+    if not durations.get(label):
+        return default_duration
+    return statistics.median(durations[label])
+
+
+def failure_rate(label):
+    """
+    Args:
+            label: Test label
+
+    Returns:
+            float: Failure rate of the recent runs of the test, with one pass and one failure
+                   assumed (Laplace), so a test without history counts as 0.5
+    """
+    outcomes = failures.get(label, [])
+    return (sum(outcomes) + 1) / (len(outcomes) + 2)
+
+
+def select(items, budget):
+    """
+    Select the tests most likely to fail that fit in a time budget
+
+    The selection maximizes the sum of the failure rates of the selected tests with the
+    sum of their estimated durations within the budget (0/1 knapsack). A test is charged
+    the durations of its prerequisites among the collected tests, which are selected with it.
+
+    Args:
+            items: Collected pytest items
+            budget: Time budget in seconds
+
+    Returns:
+            list: Selected items, in collection order
+    """
+    resolution = max(min_resolution, budget / max_steps)
+    capacity = int(budget / resolution)
+    if capacity < 1:
+        return []
+    weights = [max(1, math.ceil(estimated_duration(get_label(item)) / resolution)) for item in items]
+    values = [failure_rate(get_label(item)) for item in items]
+    keys = {dependencies.get_item_key(item): index for index, item in enumerate(items)}
+
+    def get_prerequisites(index):
+        prerequisites = set()
+        for key in dependencies.get_item_depends(items[index]):
+            if key in keys:
+                prerequisites |= {keys[key]} | get_prerequisites(keys[key])
+        return prerequisites
+
+    prerequisites = [get_prerequisites(index) for index in range(len(items))]
+    costs = [weights[index] + sum(weights[other] for other in prerequisites[index]) for index in range(len(items))]
+
+    best = [0.0] * (capacity + 1)
+    keep = []
+    for weight, value in zip(costs, values):
+        taken = bytearray(capacity + 1)
+        for size in range(capacity, weight - 1, -1):
+            if best[size - weight] + value > best[size]:
+                best[size] = best[size - weight] + value
+                taken[size] = 1
+        keep.append(taken)
+    chosen = set()
+    size = capacity
+    for index in range(len(items) - 1, -1, -1):
+        if keep[index][size]:
+            chosen |= {index} | prerequisites[index]
+            size -= costs[index]
+
+    # Prerequisites shared by several selected tests were charged more than once, fill the
+    # time left with the most valuable tests per second
+    used = sum(weights[index] for index in chosen)
+    for index in sorted(set(range(len(items))) - chosen, key=lambda index: -values[index] / costs[index]):
+        cost = sum(weights[other] for other in ({index} | prerequisites[index]) - chosen)
+        if used + cost <= capacity:
+            chosen |= {index} | prerequisites[index]
+            used += cost
+    return [item for index, item in enumerate(items) if index in chosen]
+
+
+def order_by_failure(items):
+    """
+    Order the tests to find a failure as soon as possible
+
+    The next tests are the ones with the highest failure rate per second of estimated
+    duration, counting for a test the prerequisites among the collected tests that are not
+    placed yet, which are placed with it. Equal tests keep the collection order.
+
+    Args:
+            items: Collected pytest items, reordered in place
+    """
+    keys = {dependencies.get_item_key(item): item for item in items}
+
+    def get_chain(item, placed):
+        chain = []
+        for key in dependencies.get_item_depends(item):
+            if key in keys and keys[key].nodeid not in placed:
+                chain += [other for other in get_chain(keys[key], placed) if other not in chain]
+        return chain + [item]
+
+    def get_score(chain):
+        duration = sum(estimated_duration(get_label(item)) for item in chain)
+        return sum(failure_rate(get_label(item)) for item in chain) / max(duration, min_resolution)
+
+    ordered = []
+    placed = set()
+    while len(ordered) < len(items):
+        chains = [get_chain(item, placed) for item in items if item.nodeid not in placed]
+        for item in max(chains, key=get_score):
+            ordered.append(item)
+            placed.add(item.nodeid)
+    items[:] = ordered
+
+
+def start_run(items, worker_count):
+    """
+    Start tracking the progress of the run for the ETA
+
+    Args:
+            items: Pytest items in run order
+            worker_count: Number of tests run concurrently
+    """
+    global total_tests, workers, start_time
+    total_tests = len(items)
+    workers = worker_count
+    start_time = time.monotonic()
+    running.clear()
+    remaining.clear()
+    deferred.clear()
+    for item in items:
+        remaining[item.nodeid] = estimated_duration(get_label(item))
+        running[item.nodeid] = [get_label(item), 0.0, False, False]
+
+
+def format_seconds(seconds):
+    """
+    Args:
+            seconds: Duration in seconds
+
+    Returns:
+            str: Duration as eg 1h02m, 3m05s or 42s
+    """
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def add_report(report, record, logger):
+    """
+    Account a phase report of a test, and at the end of the test record its duration and
+    outcome and log the ETA of the run
+
+    The outcome of a test that deferred confirmations is recorded by record_deferred(),
+    once they are answered.
+
+    Args:
+            report: Test report, which may come from a worker process
+            record: True to record the duration and outcome in the results store
+            logger: Handle for logging the ETA
+    """
+    test = running.get(report.nodeid)
+    if test is None:
+        return
+    test[1] += report.duration
+    test[2] = test[2] or report.failed
+    test[3] = test[3] or report.skipped
+    if report.when != "teardown":
+        return
+    label, duration, failed, skipped = running.pop(report.nodeid)
+    remaining.pop(report.nodeid, None)
+    if record and not skipped:
+        results_store.record(label, "test_duration", duration, "s")
+        if getattr(report, "deferred_prompts", None):
+            deferred[report.nodeid] = [label, failed]
+        else:
+            results_store.record(label, "test_failed", 1.0 if failed else 0.0, "")
+    logger.info(f"ETA {format_seconds(sum(remaining.values()) / workers)}, {total_tests - len(remaining)} of "
+                f"{total_tests} tests done in {format_seconds(time.monotonic() - start_time)}")
+
+
+def record_deferred(nodeid, rejected):
+    """
+    Record the outcome of a test whose deferred confirmations were answered
+
+    Args:
+            nodeid: Node ID of the test
+            rejected: True if a confirmation of the test was rejected or left unanswered
+    """
+    if nodeid not in deferred:
+        return
+    label, failed = deferred.pop(nodeid)
+    results_store.record(label, "test_failed", 1.0 if failed or rejected else 0.0, "")
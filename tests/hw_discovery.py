@@ -0,0 +1,411 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for hardware discovery
+import ctypes
+import fcntl
+import glob
+import logging
+import os
+import re
+import subprocess
+from types import MappingProxyType
+from cmd_cache import run_cached
+
+logger = logging.LoggerAdapter(logging.getLogger(__name__), {'label': 'hw_discovery'})
+
+# Index sections needed by each test module marker
+marker_sections = {
+    'video': ('video', 'media'),
+    'i2c': ('i2c',),
+    'can': ('can',),
+    'spi': ('spi',),
+    'tty': ('tty',),
+    'eth': ('eth',),
+    'gpio': ('gpio',),
+}
+
+
+class gpiochip_info(ctypes.Structure):
+    _fields_ = [
+        ('name', ctypes.c_char * 32),
+        ('label', ctypes.c_char * 32),
+        ('lines', ctypes.c_uint32),
+    ]
+
+
+# GPIO_GET_CHIPINFO_IOCTL of linux/gpio.h, _IOR(0xB4, 0x01, struct gpiochip_info)
+GPIO_GET_CHIPINFO_IOCTL = (2 << 30) | (ctypes.sizeof(gpiochip_info) << 16) | (0xB4 << 8) | 0x01
+
+
+def run_tool(cmd, scope):
+    """
+    Run a read-only discovery tool
+
+    Args:
+            cmd: Command as a list of arguments
+            scope: Command output cache scope
+
+    Returns:
+            str/None: Tool output/None if the tool is missing or failed
+    """
+    try:
+        result = run_cached(cmd, scope, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.debug(f"Discovery command '{' '.join(cmd)}' failed - {e}")
+        return None
+    return result.stdout
+
+
+def discover_video():
+    """
+    Map v4l2 device names to their device nodes
+
+    Returns:
+            tuple: (device name line, tuple of device nodes) pairs
+    """
+    output = run_tool(["v4l2-ctl", "--list-devices"], "video")
+    if output is None:
+        return ()
+    devices = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        if line.startswith('\t'):
+            if devices:
+                devices[-1][1].append(line.strip())
+        else:
+            devices.append((line, []))
+    return tuple((name, tuple(nodes)) for name, nodes in devices)
+
+
+def discover_media():
+    """
+    Read the topology of every media device
+
+    Returns:
+            MappingProxyType: Media node devpath -> tuple of topology lines
+    """
+    media = {}
+    for media_node in glob.glob('/dev/media*'):
+        output = run_tool(["media-ctl", "-d", media_node, "-p"], "video")
+        if output is not None:
+            media[media_node] = tuple(output.splitlines())
+    return MappingProxyType(media)
+
+
+def discover_i2c():
+    """
+    List the I2C buses on the board
+
+    Returns:
+            tuple: (bus number, adapter description) pairs
+    """
+    output = run_tool(["i2cdetect", "-l"], "i2c")
+    if output is None:
+        return ()
+    buses = []
+    for line in output.splitlines():
+        match = re.match(r"i2c-(\d+)\s+(.*)", line)
+        if match:
+            buses.append((match.group(1), match.group(2)))
+    return tuple(buses)
+
+
+def discover_can():
+    """
+    Read the modalias of every CAN network interface
+
+    Returns:
+            MappingProxyType: CAN node -> modalias contents
+    """
+    can_nodes = {}
+    for modalias_file in glob.glob("/sys/class/net/can*/device/modalias"):
+        # Extract the can node of the form canX from the modalias file path
+        can_node = os.path.basename(os.path.dirname(os.path.dirname(modalias_file)))
+        with open(modalias_file, 'r') as f:
+            can_nodes[can_node] = f.read()
+    return MappingProxyType(can_nodes)
+
+
+def discover_spi():
+    """
+    Read the modalias of every device on the AXI quad SPI controllers
+
+    Returns:
+            MappingProxyType: Controller address -> tuple of (SPI bus number, modalias contents) pairs
+    """
+    spi_devices = {}
+    for path in glob.glob('/sys/devices/platform/axi/*.axi_quad_spi/spi_master/spi*/spi*/modalias'):
+        controller = path.split('/')[5].split('.')[0]
+        with open(path, 'r') as f:
+            content = f.read()
+        spi_bus = re.search(r'spi(\d+)', path).group(1)
+        spi_devices.setdefault(controller, []).append((spi_bus, content))
+    return MappingProxyType({controller: tuple(devices) for controller, devices in spi_devices.items()})
+
+
+def discover_tty():
+    """
+    Find the tty devices of every serial controller
+
+    Returns:
+            MappingProxyType: Controller name -> tuple of tty device names
+    """
+    tty_devices = {}
+    for serial_path in glob.glob('/sys/devices/platform/axi/*.serial/'):
+        controller = os.path.basename(os.path.dirname(serial_path)).split('.')[0]
+        tty_names = []
+        # Recursively walk through directory structure looking for 'tty' directories
+        for root, dirs, files in os.walk(serial_path):
+            if 'tty' in dirs:
+                tty_dir = os.path.join(root, 'tty')
+                tty_names.extend(file for file in os.listdir(tty_dir) if file.startswith('tty'))
+        tty_devices[controller] = tuple(tty_names)
+    return MappingProxyType(tty_devices)
+
+
+def discover_eth():
+    """
+    Read the PHY address of every eth interface
+
+    Returns:
+            MappingProxyType: Interface -> MappingProxyType with keys phy_addr and has_phy
+    """
+    import netifaces
+
+    interfaces = {}
+    for interface in netifaces.interfaces():
+        if "eth" not in interface:
+            continue
+        has_phy = os.path.exists("/sys/class/net/" + interface + "/phydev")
+        phy_addr = None
+        # The output is left in the command cache for the link speed lookup
+        output = run_tool(["ethtool", interface], "net")
+        if output:
+            match = re.search(r"PHYAD: (\d+)", output)
+            if match:
+                phy_addr = match.group(1)
+        interfaces[interface] = MappingProxyType({'phy_addr': phy_addr, 'has_phy': has_phy})
+    return MappingProxyType(interfaces)
+
+
+def discover_gpio():
+    """
+    Read the label of every GPIO chip with the chip info ioctl, without requesting any line
+
+    Returns:
+            MappingProxyType: GPIO devpath -> chip label, in chip number order
+    """
+    chips = {}
+    devpaths = glob.glob('/dev/gpiochip*')
+    for devpath in sorted(devpaths, key=lambda path: int(re.sub(r"\D", "", path) or 0)):
+        info = gpiochip_info()
+        try:
+            fd = os.open(devpath, os.O_RDONLY | os.O_CLOEXEC)
+            try:
+                fcntl.ioctl(fd, GPIO_GET_CHIPINFO_IOCTL, info)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.debug(f"Reading the chip info of {devpath} failed - {e}")
+            continue
+        chips[devpath] = info.label.decode()
+    return MappingProxyType(chips)
+
+
+discoverers = {
+    'video': discover_video,
+    'media': discover_media,
+    'i2c': discover_i2c,
+    'can': discover_can,
+    'spi': discover_spi,
+    'tty': discover_tty,
+    'eth': discover_eth,
+    'gpio': discover_gpio,
+}
+
+
+class HardwareIndex:
+    """
+    Read-only index of the hardware nodes found on the board
+
+    Each section is discovered once, either up front by discover() or on first
+    lookup, and never changes afterwards.
+    """
+
+    def __init__(self):
+        self._sections = {}
+        self._gpio_chips = {}
+
+    def section(self, name):
+        """
+        Get an index section, discovering it on first use
+
+        Args:
+                name: Section name
+
+        Returns:
+                tuple/MappingProxyType: Section contents
+        """
+        if name not in self._sections:
+            self._sections[name] = discoverers[name]()
+            logger.debug(f"Discovered {name}: {self._sections[name]}")
+        return self._sections[name]
+
+    def video_node(self, pipeline):
+        """
+        Args:
+                pipeline: Name of video pipeline
+
+        Returns:
+                str/None: Video node devpath
+        """
+        for name, nodes in self.section('video'):
+            if pipeline in name and nodes and "video" in nodes[0]:
+                return nodes[0]
+        return None
+
+    def media_node(self, pipeline):
+        """
+        Args:
+                pipeline: Name of video pipeline
+
+        Returns:
+                str/None: Media node devpath
+        """
+        for media_node, lines in self.section('media').items():
+            if any(pipeline in line for line in lines[:-1]):
+                return media_node
+        return None
+
+    def i2c_bus(self, controller):
+        """
+        Args:
+                controller: I2C controller
+
+        Returns:
+                str/None: I2C bus number
+        """
+        for bus_number, description in self.section('i2c'):
+            if controller in description:
+                return bus_number
+        return None
+
+    def i2c_mux_bus(self, parent_bus, mux_channel):
+        """
+        Args:
+                parent_bus: I2C bus number of the mux
+                mux_channel: Channel number of the mux
+
+        Returns:
+                str/None: I2C bus number of the mux channel
+        """
+        mux_name = f"i2c-{parent_bus}-mux (chan_id {mux_channel})"
+        for bus_number, description in self.section('i2c'):
+            if mux_name in description:
+                return bus_number
+        return None
+
+    def can_node(self, can_controller):
+        """
+        Args:
+                can_controller: CAN controller
+
+        Returns:
+                str/None: CAN node
+        """
+        for can_node, modalias in self.section('can').items():
+            if can_controller in modalias:
+                return can_node
+        return None
+
+    def spi_bus(self, controller, spi_device):
+        """
+        Args:
+                controller: SPI controller responsible for the device
+                spi_device: SPI device driver
+
+        Returns:
+                str/None: SPI bus number
+        """
+        for spi_bus, modalias in self.section('spi').get(controller, ()):
+            if spi_device in modalias:
+                return spi_bus
+        return None
+
+    def tty_devices(self, controller_name):
+        """
+        Args:
+                controller_name: Uart controller name
+
+        Returns:
+                tuple: tty device names
+        """
+        return self.section('tty').get(controller_name, ())
+
+    def eth_interfaces(self):
+        """
+        Returns:
+                MappingProxyType: Interface -> interface properties
+        """
+        return self.section('eth')
+
+    def eth_interface(self, phy_addr):
+        """
+        Args:
+                phy_addr: PHY address, None for the interface without a PHY (SFP)
+
+        Returns:
+                str/None: eth interface
+        """
+        for interface, properties in self.section('eth').items():
+            if phy_addr is None and not properties['has_phy']:
+                return interface
+            if phy_addr is not None and properties['phy_addr'] == str(phy_addr):
+                return interface
+        return None
+
+    def gpio_chip(self, label_pattern):
+        """
+        Args:
+                label_pattern: Regular expression matching the whole chip label
+
+        Returns:
+                str/None: Devpath of the first GPIO chip with a matching label
+        """
+        if label_pattern not in self._gpio_chips:
+            self._gpio_chips[label_pattern] = next((devpath for devpath, label in self.section('gpio').items()
+                                                    if re.fullmatch(label_pattern, label)), None)
+        return self._gpio_chips[label_pattern]
+
+
+hw_index = HardwareIndex()
+
+
+def get_index():
+    """
+    Returns:
+            HardwareIndex: Index shared by all tests of the session
+    """
+    return hw_index
+
+
+def discover(markers):
+    """
+    Discover the index sections needed by the selected test modules
+
+    Args:
+            markers: Names of the markers of the selected tests
+    """
+    for marker in markers:
+        for name in marker_sections.get(marker, ()):
+            hw_index.section(name)
+
+
+def reset():
+    """
+    Drop the discovered sections of a long-running process, they are discovered again on next use
+    """
+    global hw_index
+    hw_index = HardwareIndex()
@@ -2,9 +2,11 @@
 # SPDX-License-Identifier: MIT
 
 # Import the 'modules' that are required for test cases execution
-import subprocess
-import periphery
-import re
+import hw_discovery
+import device_pool
+from lazy_import import lazy_import
+
+periphery = lazy_import("periphery")
 
 
 def i2c_bus_lookup(controller, mux_channel, logger):
@@ -19,29 +21,18 @@ def i2c_bus_lookup(controller, mux_channel, logger):
     Returns:
             str: I2C bus number
     """
-    i2cdetect_cmd = "i2cdetect -l"  # List I2C buses on the board
-    i2cdetect_result = subprocess.run(i2cdetect_cmd.split(), capture_output=True, text=True)
-    if i2cdetect_result.returncode:
-        logger.error(f"Error executing command: {i2cdetect_cmd}")
-        return None
-    output_lines = i2cdetect_result.stdout.splitlines()
-    i2c_bus_number = None
-    for line in output_lines:
-        if controller in line:
-            i2c_bus_number = re.match(r"i2c-(\d+)",line).group(1)
-            break
+    hw_index = hw_discovery.get_index()
+    i2c_bus_number = hw_index.i2c_bus(controller)
     if not i2c_bus_number:
         logger.error(f"I2C bus could not be detected for controller {controller}")
         return None
     if mux_channel is None:
         logger.debug(f"I2C bus of controller {controller}: i2c-{i2c_bus_number}")
         return i2c_bus_number
-    mux_pattern = f"i2c-{i2c_bus_number}-mux \\(chan_id {mux_channel}\\)"
-    for line in output_lines:
-        if re.search(mux_pattern, line):
-            i2c_bus_number = re.match(r"i2c-(\d+)",line).group(1)
-            logger.debug(f"I2C bus of mux channel {mux_channel} on controller {controller}: i2c-{i2c_bus_number}")
-            return i2c_bus_number
+    mux_bus_number = hw_index.i2c_mux_bus(i2c_bus_number, mux_channel)
+    if mux_bus_number:
+        logger.debug(f"I2C bus of mux channel {mux_channel} on controller {controller}: i2c-{mux_bus_number}")
+        return mux_bus_number
     logger.error(f"I2C bus could not be detected for mux channel {mux_channel} on controller {controller}")
     return None
 
@@ -58,7 +49,9 @@ def check_i2c_device(i2c_devices, i2c_bus_number, logger):
     Returns:
             bool: True/False
     """
-    i2c_bus = periphery.I2C(f"/dev/i2c-{i2c_bus_number}")  # Open the I2C bus with given bus number
+    # Get the pooled I2C bus with given bus number, closed at the end of the session
+    i2c_bus = device_pool.get_pool().acquire(("i2c", i2c_bus_number), lambda: periphery.I2C(f"/dev/i2c-{i2c_bus_number}"),
+                                             closer=lambda i2c_bus: i2c_bus.close())
     all_i2c_devices_present = True
     for device_type, device_address in i2c_devices.items():
         try:
@@ -69,7 +62,6 @@ def check_i2c_device(i2c_devices, i2c_bus_number, logger):
             # Exception occurs when device is not found
             logger.error(f"Device '{device_type}' could not be detected on i2c-{i2c_bus_number} bus at expected device address {hex(device_address)}")
             all_i2c_devices_present = False
-    i2c_bus.close()  # Close the I2C bus with given bus number
     if not all_i2c_devices_present:
         return False
     return True
@@ -92,10 +84,12 @@ def run_i2c_device_detect_test(label, controller, mux_channel, i2c_devices, help
     logger = helpers.logger_init(label)
     logger.start_test()
     # Obtain I2C bus number based on the controller and mux channel
+    logger.phase("discovery")
     i2c_bus_number = i2c_bus_lookup(controller, mux_channel, logger)
     if i2c_bus_number is None:
         return False
     # Check for I2C devices on the bus
+    logger.phase("measure")
     devices_found = check_i2c_device(i2c_devices, i2c_bus_number, logger)
     if devices_found is False:
         return False
@@ -49,19 +49,22 @@ supported_boards = {
             'label'       : "ps_i2c_bus_main",
             'controller'  : "ff030000", # Address of the controller
             'mux_channel' : None,
-            'i2c_devices' : {**ps_i2c_k26_som, **ps_i2c_kv_cc}
+            'i2c_devices' : {**ps_i2c_k26_som, **ps_i2c_kv_cc},
+            'resources'   : ['ps_i2c']
         },
         {
             'label'       : "axi_i2c_bus_main",
             'controller'  : "80030000.i2c", # Address of the controller
             'mux_channel' : None,
-            'i2c_devices' : {**axi_i2c_kv_cc}
+            'i2c_devices' : {**axi_i2c_kv_cc},
+            'resources'   : ['axi_i2c']
         },
         {
             'label'       : "axi_i2c_bus_ch0",
             'controller'  : "80030000.i2c", # Address of the controller
             'mux_channel' : 0,
-            'i2c_devices' : {**axi_i2c_kv_cc, **{'ap1302' : 0x3c}}
+            'i2c_devices' : {**axi_i2c_kv_cc, **{'ap1302' : 0x3c}},
+            'resources'   : ['axi_i2c']
         }
     ],
     'kr260': [
@@ -69,19 +72,22 @@ supported_boards = {
             'label'       : "ps_i2c_bus_main",
             'controller'  : "ff030000", # Address of the controller
             'mux_channel' : None,
-            'i2c_devices' : {**ps_i2c_k26_som, **ps_i2c_kr_cc}
+            'i2c_devices' : {**ps_i2c_k26_som, **ps_i2c_kr_cc},
+            'resources'   : ['ps_i2c']
         },
         {
             'label'       : "ps_i2c_bus_ch0",
             'controller'  : "ff030000", # Address of the controller
             'mux_channel' : 0,
-            'i2c_devices' : {**ps_i2c_k26_som, **ps_i2c_kr_cc, **{'usb5744' : 0x2d}}
+            'i2c_devices' : {**ps_i2c_k26_som, **ps_i2c_kr_cc, **{'usb5744' : 0x2d}},
+            'resources'   : ['ps_i2c']
         },
         {
             'label'       : "ps_i2c_bus_ch1",
             'controller'  : "ff030000", # Address of the controller
             'mux_channel' : 1,
-            'i2c_devices' : {**ps_i2c_k26_som, **ps_i2c_kr_cc, **{'usb5744' : 0x2d}}
+            'i2c_devices' : {**ps_i2c_k26_som, **ps_i2c_kr_cc, **{'usb5744' : 0x2d}},
+            'resources'   : ['ps_i2c']
         }
     ],
     'kd240': [
@@ -89,7 +95,8 @@ supported_boards = {
             'label'       : "ps_i2c_bus_main",
             'controller'  : "ff030000", # Address of the controller
             'mux_channel' : None,
-            'i2c_devices' : {**ps_i2c_k24_som, **ps_i2c_kd_cc}
+            'i2c_devices' : {**ps_i2c_k24_som, **ps_i2c_kd_cc},
+            'resources'   : ['ps_i2c']
         }
     ]
 }
@@ -1,11 +1,17 @@
 # Copyright (C) 2023 Advanced Micro Devices, Inc.
 # SPDX-License-Identifier: MIT
 
-import iio
+import device_pool
+from lazy_import import lazy_import
+
+iio = lazy_import("iio")
+
+def get_local_context():
+    # Local IIO context, shared by the tests of the session
+    return device_pool.get_pool().acquire(("iio", "local:"), lambda: iio.Context("local:"))
 
 def iio_get_channel(device_name, channel_name, logger):
-    local_context = iio.Context("local:")
-    for dev in local_context.devices:
+    for dev in get_local_context().devices:
         # Find device
         if dev.name == device_name:
             for channel in dev.channels:
@@ -21,14 +27,17 @@ def run_ina260_current_test(label, device_name, channel_name, min_current, max_c
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("discovery")
     channel = iio_get_channel(device_name, channel_name, logger)
     if channel is None:
         logger.test_failed()
         logger.stop_test()
         return False
+    logger.phase("measure")
     raw = float(channel.attrs["raw"].value)
     scale = float(channel.attrs["scale"].value)
     current = raw * scale
+    logger.record_metric("current", current, "mA")
 
     # Check if current is within range
     if current >= min_current and current <= max_current:
@@ -1,6 +1,8 @@
 # Copyright (C) 2023 Advanced Micro Devices, Inc.
 # SPDX-License-Identifier: MIT
 
+# The INA260 measures the current drawn by the whole board, so the current test declares
+# no resources and runs alone when tests are run in parallel
 supported_boards = {
     'kv260': [
         {
@@ -0,0 +1,94 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for queued logging
+import logging
+import logging.handlers
+import os
+import queue
+
+
+class RootForwarder(logging.Handler):
+    """
+    Pass records from the queue to the handlers of the root logger
+
+    Pytest attaches its log file, live log and capture handlers to the root logger,
+    so the background writer resolves them when a record is written, not when it is queued.
+    """
+
+    def emit(self, record):
+        root = logging.getLogger()
+        if root.isEnabledFor(record.levelno):
+            root.handle(record)
+
+
+# Logger -> QueueHandler feeding the background writer
+queue_handlers = {}
+listener = None
+
+
+def start_listener(log_queue):
+    """
+    Start the background writer of a queue
+
+    Args:
+            log_queue: Queue the records are put on
+    """
+    global listener
+    listener = logging.handlers.QueueListener(log_queue, RootForwarder())
+    listener.start()
+
+
+def install(logger):
+    """
+    Route the records of a logger through the queue, the caller never waits on a handler
+
+    Args:
+            logger: Logger to route, installing more than once has no effect
+    """
+    if logger.name in queue_handlers:
+        return
+    if listener is None:
+        start_listener(queue.Queue())
+    handler = logging.handlers.QueueHandler(listener.queue)
+    logger.addHandler(handler)
+    logger.propagate = False
+    queue_handlers[logger.name] = handler
+
+
+def flush():
+    """
+    Wait until the background writer has written every queued record
+    """
+    if listener is not None:
+        listener.queue.join()
+
+
+def stop():
+    """
+    Write the queued records and stop the background writer
+    """
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
+    for name, handler in queue_handlers.items():
+        logger = logging.getLogger(name)
+        logger.removeHandler(handler)
+        logger.propagate = True
+    queue_handlers.clear()
+
+
+def restart_in_child():
+    """
+    Give a forked child its own queue and writer, the parent's writer thread does not exist in it
+    """
+    if listener is None:
+        return
+    log_queue = queue.Queue()
+    for handler in queue_handlers.values():
+        handler.queue = log_queue
+    start_listener(log_queue)
+
+
+os.register_at_fork(after_in_child=restart_in_child)
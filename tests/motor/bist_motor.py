@@ -2,9 +2,105 @@
 # SPDX-License-Identifier: MIT
 
 # Import the 'modules' that are required for test cases execution
-
-import py_foc_motor_ctrl as mcontrol
 import time
+import device_pool
+import state_planner
+from lazy_import import lazy_import
+
+mcontrol = lazy_import("py_foc_motor_ctrl")
+
+# Units of the measured motor objects
+motor_units = {"Speed": "rpm", "Voltage": "V", "Current": "A"}
+
+
+def get_motor_control():
+    """
+    Get the MotorControl instance with session ID 1 and default config path, shared by the
+    tests of the session and switched off at the end of each test, unless the motor is kept
+    spinning for the next test
+
+    Returns:
+            MotorControl/None: MotorControl instance/None if it could not be created
+    """
+    return device_pool.get_pool().acquire(("motor", 1), lambda: mcontrol.MotorControl.getMotorControlInstance(1),
+                                          reset=reset_motor)
+
+
+def reset_motor(mc):
+    """
+    Switch off the motor at the end of a test, also when the test stopped while setting up
+    a spinning motor, before its setup state was recorded
+
+    Args:
+            mc: MotorControl instance
+    """
+    # The setup state is left before the pool is reset, it is only still set if kept for the next test
+    if state_planner.current is None or state_planner.current[3] is not switch_off:
+        mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
+
+
+def switch_off(mc, logger):
+    """
+    Stop the motor when leaving the setup state of a spinning motor
+
+    Args:
+            mc: MotorControl instance
+            logger: Handle for logging
+    """
+    logger.phase("teardown")
+    mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
+    motor_offmode = mc.getOperationMode()
+    logger.info(f"Operation Mode: {motor_offmode}")
+
+
+def start_speed_mode(mc, speed, logger):
+    """
+    Spin the motor at a set speed, reusing the setup state of the previous test if it is the same
+
+    Args:
+            mc: MotorControl instance
+            speed: Motor speed to be set
+            logger: Handle for logging
+
+    Returns:
+            MotorControl: MotorControl instance
+    """
+    def setup():
+        # Initialize the motor by setting mode = OFF
+        mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
+        # Set motor speed
+        mc.setSpeed(speed)
+        logger.info(f"Motor speed: {speed}. Please wait 12 seconds for motor to reach speed setpoint.")
+        # Set the mode = Speed to spin the motor
+        mc.setOperationMode(mcontrol.MotorOpMode.kModeSpeed)
+        logger.phase("settle")
+        time.sleep(12)  # Wait for the motor to stabilize
+        return mc
+
+    return state_planner.enter(setup, switch_off, logger, key=("speed", speed))
+
+
+def start_open_loop(mc, logger):
+    """
+    Spin the motor in open loop mode, reusing the setup state of the previous test if it is the same
+
+    Args:
+            mc: MotorControl instance
+            logger: Handle for logging
+
+    Returns:
+            MotorControl: MotorControl instance
+    """
+    def setup():
+        # Initialize the motor by setting mode = OFF
+        mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
+        # Set the mode = Open loop
+        mc.setOperationMode(mcontrol.MotorOpMode.kModeOpenLoop)
+        logger.phase("settle")
+        time.sleep(1)  # Wait for the motor to stabilize
+        return mc
+
+    return state_planner.enter(setup, switch_off, logger, key=("openloop",))
 
 
 def get_average(mc, iterations, motor_object, logger, iio_channel=None):
@@ -24,6 +120,7 @@ def get_average(mc, iterations, motor_object, logger, iio_channel=None):
     """
     # Take average of the iterations of measured motor object
     motor_object_sum = 0
+    metric = motor_object.lower() if iio_channel is None else f"{motor_object.lower()}_{iio_channel}"
     for iteration in range(iterations):
         if motor_object == "Voltage":
             motor_measurement = mc.getVoltage(iio_channel)
@@ -32,10 +129,11 @@ def get_average(mc, iterations, motor_object, logger, iio_channel=None):
         elif motor_object == "Speed":
             motor_measurement = mc.getSpeed()
         motor_object_sum = motor_object_sum + abs(motor_measurement)
-        logger.debug(f"Measured motor object at iteration {iteration}: {round(motor_measurement, 2)}")
+        logger.sample(metric, motor_measurement)
         time.sleep(0.001)  # Allow 1ms delay to observe changes in motor readings
         iteration += 1
     average = motor_object_sum / iterations
+    logger.record_metric(metric + "_avg", average, motor_units[motor_object])
     return float(average)
 
 
@@ -52,15 +150,6 @@ def run_qei_gate_drive_test(label, speed, helpers):
             bool: True/False
     """
     logger = helpers.logger_init(label)
-
-    # Run dependency test
-    test_result = run_motor_dc_link_volt_adc_fb_test(label, helpers)
-    if test_result:
-        logger.info("DC Link Voltage Test Passed")
-    else:
-        logger.error("DC Link Voltage Test Failed")
-        return False
-
     logger.start_test()
     # Initialize speed parameters
     speed_lower_limit = speed * 0.80
@@ -69,26 +158,18 @@ def run_qei_gate_drive_test(label, speed, helpers):
     logger.debug(f"Motor speed upper limit: {speed_upper_limit}")
     # Iterations for taking average of motor speed measurement
     iterations = 10
-    # Get a MotorControl instance with session ID 1 and default config path
-    mc = mcontrol.MotorControl.getMotorControlInstance(1)
+    logger.phase("setup")
+    # Get the pooled MotorControl instance with session ID 1 and default config path
+    mc = get_motor_control()
     if mc is None:
         logger.error("Unable to get MotorControl instance")
         return False
-    # Use the MotorControl instance to call its member functions
-    # Initialize the motor by setting mode = OFF
-    mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-    # Set motor speed
-    mc.setSpeed(speed)
-    logger.info(f"Motor speed: {speed}. Please wait 12 seconds for motor to reach speed setpoint.")
-    # Set the mode = Speed to spin the motor
-    mc.setOperationMode(mcontrol.MotorOpMode.kModeSpeed)
-    time.sleep(12)  # Wait for the motor to stabilize
+    # Spin the motor at the set speed, or keep it spinning from the previous test at that speed
+    start_speed_mode(mc, speed, logger)
+    logger.phase("measure")
     op_mode = mc.getOperationMode()
     if str(op_mode) != 'MotorOpMode.kModeSpeed':
         logger.error("Error setting the motor mode: Speed")
-        mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-        motor_offmode = mc.getOperationMode()
-        logger.info(f"Operation Mode: {motor_offmode}")
         return False
     logger.info(f"Operation Mode: {op_mode}")
 
@@ -97,14 +178,8 @@ def run_qei_gate_drive_test(label, speed, helpers):
     logger.info(f"Average measured motor speed: {round(motor_speed_avg, 2)}")
     if (motor_speed_avg < speed_lower_limit) or (motor_speed_avg > speed_upper_limit):
         logger.error("Measured motor speed is not within the error margin of set speed")
-        mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-        motor_offmode = mc.getOperationMode()
-        logger.info(f"Operation Mode: {motor_offmode}")
         return False
     logger.info("Motor control QEI gate drive test successful")
-    mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-    motor_offmode = mc.getOperationMode()
-    logger.info(f"Operation Mode: {motor_offmode}")
     return True
 
 
@@ -127,8 +202,9 @@ def run_motor_vlt_adc_fb_modeoff_test(label, helpers):
     voltage_fb_in_range = True
     # Iterations for taking average of adc motor voltage feedback measurement
     iterations = 10
-    # Get a MotorControl instance with session ID 1 and default config path
-    mc = mcontrol.MotorControl.getMotorControlInstance(1)
+    logger.phase("setup")
+    # Get the pooled MotorControl instance with session ID 1 and default config path
+    mc = get_motor_control()
     if mc is None:
         logger.error("Unable to get MotorControl instance")
         return False
@@ -137,7 +213,9 @@ def run_motor_vlt_adc_fb_modeoff_test(label, helpers):
     mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
     iio_voltage_channel = [mcontrol.ElectricalData.kPhaseA, mcontrol.ElectricalData.kPhaseB,
                            mcontrol.ElectricalData.kPhaseC]
+    logger.phase("settle")
     time.sleep(1)  # Wait for the motor to stabilize
+    logger.phase("measure")
     op_mode = mc.getOperationMode()
     if str(op_mode) != 'MotorOpMode.kModeOff':
         logger.error("Error setting the motor mode: Off")
@@ -157,13 +235,12 @@ def run_motor_vlt_adc_fb_modeoff_test(label, helpers):
     return True
 
 
-def run_motor_vlt_adc_fb_modeopenloop_test(label, speed, helpers):
+def run_motor_vlt_adc_fb_modeopenloop_test(label, helpers):
     """
     Motor Voltage ADC feedback test on IIO channels for mode: Speed
 
     Args:
             label: Test label
-            speed: Motor speed to be set
             helpers: Fixture for helper functions
 
     Returns:
@@ -171,14 +248,6 @@ def run_motor_vlt_adc_fb_modeopenloop_test(label, speed, helpers):
     """
     logger = helpers.logger_init(label)
 
-    # Run dependency test
-    test_result = run_qei_gate_drive_test(label, speed, helpers)
-    if test_result:
-        logger.info("QEI Gate Drive Test Passed")
-    else:
-        logger.error("QEI Gate Drive Test Failed")
-        return False
-
     logger.start_test()
     # Initialize parameters
     voltage_fb_lower_limit = 8
@@ -188,17 +257,15 @@ def run_motor_vlt_adc_fb_modeopenloop_test(label, speed, helpers):
     voltage_fb_in_range = True
     # Iterations for taking average of motor voltage measurement
     iterations = 100
-    # Get a MotorControl instance with session ID 1 and default config path
-    mc = mcontrol.MotorControl.getMotorControlInstance(1)
+    logger.phase("setup")
+    # Get the pooled MotorControl instance with session ID 1 and default config path
+    mc = get_motor_control()
     if mc is None:
         logger.error("Unable to get MotorControl instance")
         return False
-    # Use the MotorControl instance to call its member functions
-    # Initialize the motor by setting mode = OFF
-    mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-    # Set the mode = Open loop
-    mc.setOperationMode(mcontrol.MotorOpMode.kModeOpenLoop)
-    time.sleep(1)  # Wait for the motor to stabilize
+    # Spin the motor in open loop mode, or keep it spinning from the previous open loop test
+    start_open_loop(mc, logger)
+    logger.phase("measure")
     op_mode = mc.getOperationMode()
     if str(op_mode) != 'MotorOpMode.kModeOpenLoop':
         logger.error("Error setting the motor mode: Open Loop")
@@ -215,14 +282,8 @@ def run_motor_vlt_adc_fb_modeopenloop_test(label, speed, helpers):
             logger.error(f"Measured motor voltage feedback for {channel} is not within the expected range")
             voltage_fb_in_range = False
     if not voltage_fb_in_range:
-        mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-        motor_offmode = mc.getOperationMode()
-        logger.info(f"Operation Mode: {motor_offmode}")
         return False
     logger.info("Motor voltage ADC feedback test successful in 'Open Loop' mode")
-    mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-    motor_offmode = mc.getOperationMode()
-    logger.info(f"Operation Mode: {motor_offmode}")
     return True
 
 
@@ -245,8 +306,9 @@ def run_motor_curr_adc_fb_modeoff_test(label, helpers):
     current_fb_lower_limit = 0.05
     logger.debug(f"Motor current ADC feedback lower limit: {current_fb_lower_limit}A")
     current_fb_in_range = True
-    # Get a MotorControl instance with session ID 1 and default config path
-    mc = mcontrol.MotorControl.getMotorControlInstance(1)
+    logger.phase("setup")
+    # Get the pooled MotorControl instance with session ID 1 and default config path
+    mc = get_motor_control()
     if mc is None:
         logger.error("Unable to get MotorControl instance")
         return False
@@ -255,7 +317,9 @@ def run_motor_curr_adc_fb_modeoff_test(label, helpers):
     mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
     iio_current_channel = [mcontrol.ElectricalData.kPhaseA, mcontrol.ElectricalData.kPhaseB,
                            mcontrol.ElectricalData.kPhaseC]
+    logger.phase("settle")
     time.sleep(1)  # Wait for the motor to stabilize
+    logger.phase("measure")
     op_mode = mc.getOperationMode()
     if str(op_mode) != 'MotorOpMode.kModeOff':
         logger.error("Error setting the motor mode: Off")
@@ -275,13 +339,12 @@ def run_motor_curr_adc_fb_modeoff_test(label, helpers):
     return True
 
 
-def run_motor_curr_adc_fb_modeopenloop_test(label, speed, helpers):
+def run_motor_curr_adc_fb_modeopenloop_test(label, helpers):
     """
     Motor Current ADC feedback test on IIO channels for mode: Speed
 
     Args:
             label: Test label
-            speed: Motor speed to be set
             helpers: Fixture for helper functions
 
     Returns:
@@ -289,14 +352,6 @@ def run_motor_curr_adc_fb_modeopenloop_test(label, speed, helpers):
     """
     logger = helpers.logger_init(label)
 
-    # Run dependency test
-    test_result = run_qei_gate_drive_test(label, speed, helpers)
-    if test_result:
-        logger.info("QEI Gate Drive Test Passed")
-    else:
-        logger.error("QEI Gate Drive Test Failed")
-        return False
-
     logger.start_test()
     # Initialize parameters
     current_fb_lower_limit = 0.01
@@ -306,17 +361,15 @@ def run_motor_curr_adc_fb_modeopenloop_test(label, speed, helpers):
     current_fb_in_range = True
     # Iterations for taking average of motor current measurement
     iterations = 100
-    # Get a MotorControl instance with session ID 1 and default config path
-    mc = mcontrol.MotorControl.getMotorControlInstance(1)
+    logger.phase("setup")
+    # Get the pooled MotorControl instance with session ID 1 and default config path
+    mc = get_motor_control()
     if mc is None:
         logger.error("Unable to get MotorControl instance")
         return False
-    # Use the MotorControl instance to call its member functions
-    # Initialize the motor by setting mode = OFF
-    mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-    # Set the mode = Open loop
-    mc.setOperationMode(mcontrol.MotorOpMode.kModeOpenLoop)
-    time.sleep(1)  # Wait for the motor to stabilize
+    # Spin the motor in open loop mode, or keep it spinning from the previous open loop test
+    start_open_loop(mc, logger)
+    logger.phase("measure")
     op_mode = mc.getOperationMode()
     if str(op_mode) != 'MotorOpMode.kModeOpenLoop':
         logger.error("Error setting the motor mode: Open Loop")
@@ -333,14 +386,8 @@ def run_motor_curr_adc_fb_modeopenloop_test(label, speed, helpers):
             logger.error(f"Measured motor current feedback for {channel} is not within the expected range")
             current_fb_in_range = False
     if not current_fb_in_range:
-        mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-        motor_offmode = mc.getOperationMode()
-        logger.info(f"Operation Mode: {motor_offmode}")
         return False
     logger.info("Motor current ADC feedback test successful in 'Open Loop' mode")
-    mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
-    motor_offmode = mc.getOperationMode()
-    logger.info(f"Operation Mode: {motor_offmode}")
     return True
 
 
@@ -365,15 +412,18 @@ def run_motor_dc_link_volt_adc_fb_test(label, helpers):
     voltage_fb_upper_limit = 25.2
     logger.debug(f"Motor voltage ADC feedback upper limit: {voltage_fb_upper_limit}V")
     dc_channel = mcontrol.ElectricalData.kDCLink
-    # Get a MotorControl instance with session ID 1 and default config path
-    mc = mcontrol.MotorControl.getMotorControlInstance(1)
+    logger.phase("setup")
+    # Get the pooled MotorControl instance with session ID 1 and default config path
+    mc = get_motor_control()
     if mc is None:
         logger.error("Unable to get MotorControl instance")
         return False
     # Use the MotorControl instance to call its member functions
     # Initialize the motor by setting mode = OFF
     mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
+    logger.phase("settle")
     time.sleep(1)  # Wait for the motor to stabilize
+    logger.phase("measure")
     op_mode = mc.getOperationMode()
     if str(op_mode) != 'MotorOpMode.kModeOff':
         logger.error("Error setting the motor mode: Off")
@@ -409,15 +459,18 @@ def run_motor_dc_link_curr_adc_fb_test(label, helpers):
     current_fb_lower_limit = 0.6
     logger.debug(f"Motor current DC link ADC feedback lower limit: {current_fb_lower_limit}A")
     dc_channel = mcontrol.ElectricalData.kDCLink
-    # Get a MotorControl instance with session ID 1 and default config path
-    mc = mcontrol.MotorControl.getMotorControlInstance(1)
+    logger.phase("setup")
+    # Get the pooled MotorControl instance with session ID 1 and default config path
+    mc = get_motor_control()
     if mc is None:
         logger.error("Unable to get MotorControl instance")
         return False
     # Use the MotorControl instance to call its member functions
     # Initialize the motor by setting mode = OFF
     mc.setOperationMode(mcontrol.MotorOpMode.kModeOff)
+    logger.phase("settle")
     time.sleep(1)  # Wait for the motor to stabilize
+    logger.phase("measure")
     op_mode = mc.getOperationMode()
     if str(op_mode) != 'MotorOpMode.kModeOff':
         logger.error("Error setting the motor mode: Off")
@@ -5,28 +5,39 @@ supported_boards = {
     'kd240': [
         {
             'label': 'qei_gate_drive_test',
-            'speed': 5000
+            'speed': 5000,
+            'resources': ['motor'],
+            'depends': ['dc_link_volt_adc_fb_test'],
+            'setup_state': 'motor_speed:5000'
         },
         {
             'label': 'volt_adc_fb_modeopenloop_test',
-            'speed': 5000
+            'resources': ['motor'],
+            'depends': ['qei_gate_drive_test'],
+            'setup_state': 'motor_openloop'
         },
         {
             'label': 'curr_adc_fb_modeopenloop_test',
-            'speed': 5000
+            'resources': ['motor'],
+            'depends': ['qei_gate_drive_test'],
+            'setup_state': 'motor_openloop'
         },
         {
-            'label': 'volt_adc_fb_modeoff_test'
+            'label': 'volt_adc_fb_modeoff_test',
+            'resources': ['motor']
         },
 
         {
-            'label': 'curr_adc_fb_modeoff_test'
+            'label': 'curr_adc_fb_modeoff_test',
+            'resources': ['motor']
         },
         {
-            'label': 'dc_link_volt_adc_fb_test'
+            'label': 'dc_link_volt_adc_fb_test',
+            'resources': ['motor']
         },
         {
-            'label': 'dc_link_curr_adc_fb_test'
+            'label': 'dc_link_curr_adc_fb_test',
+            'resources': ['motor']
         }
     ]
 }
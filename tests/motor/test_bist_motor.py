@@ -36,12 +36,10 @@ def test_motor(id, helpers):
         test_result = run_qei_gate_drive_test(label, speed, helpers)
 
     elif 'volt_adc_fb_modeopenloop_test' in label:
-        speed = id['speed']
-        test_result = run_motor_vlt_adc_fb_modeopenloop_test(label, speed, helpers)
+        test_result = run_motor_vlt_adc_fb_modeopenloop_test(label, helpers)
 
     elif 'curr_adc_fb_modeopenloop_test' in label:
-        speed = id['speed']
-        test_result = run_motor_curr_adc_fb_modeopenloop_test(label, speed, helpers)
+        test_result = run_motor_curr_adc_fb_modeopenloop_test(label, helpers)
 
     else:
         assert False
@@ -2,10 +2,10 @@
 # SPDX-License-Identifier: MIT
 
 # Import the 'modules' that are required for test cases execution
-import subprocess
 import os
 import filecmp
 import tempfile
+from proc_runner import run
 
 
 def get_user_partition_size(logger):
@@ -20,7 +20,7 @@ def get_user_partition_size(logger):
             float: MTD User partition size
     """
     lsmtd_cmd = "lsmtd -b DEVICE, NAME, SIZE"
-    mtd_result = subprocess.run(lsmtd_cmd.split(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    mtd_result = run(lsmtd_cmd.split(), logger=logger)
     if mtd_result.returncode:
         logger.error("Error listing MTD partitions on the board")
         return None, None
@@ -70,7 +70,7 @@ def mtd_debug_erase(mtd_user_partition, offset, length, logger):
             bool: True/False
     """
     erase_cmd = f"mtd_debug erase /dev/{mtd_user_partition} {offset} {length}"
-    erase_result = subprocess.run(erase_cmd.split(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    erase_result = run(erase_cmd.split(), logger=logger)
     length_mib = length / 1048576  # To convert length to MiB
     if erase_result.returncode:
         logger.error(f"Failed to erase {length_mib}MiB of memory starting at offset of {offset} bytes on MTD User partition")
@@ -94,7 +94,7 @@ def mtd_debug_write(mtd_user_partition, offset, length, test_file, logger):
             bool: True/False
     """
     write_cmd = f"mtd_debug write /dev/{mtd_user_partition} {offset} {length} {test_file}"
-    write_result = subprocess.run(write_cmd.split(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    write_result = run(write_cmd.split(), logger=logger)
     if write_result.returncode:
         logger.error("Error writing test file to QSPI MTD User partition")
         return False
@@ -117,7 +117,7 @@ def mtd_debug_read(mtd_user_partition, offset, length, test_file, logger):
             bool: True/False
     """
     read_cmd = f'mtd_debug read /dev/{mtd_user_partition} {offset} {length} {test_file}'
-    read_result = subprocess.run(read_cmd.split(), stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    read_result = run(read_cmd.split(), logger=logger)
     if read_result.returncode:
         logger.error("Error reading test file from QSPI MTD User partition")
         return False
@@ -185,7 +185,7 @@ def get_qspi_write_performance(mtd_user_partition, offset, block_size, length, l
             float: QSPI write performance in KB/s
     """
     qspi_write_cmd = f'dd if=/dev/urandom of=/dev/{mtd_user_partition} bs={block_size} seek={offset // block_size} count={length // block_size} oflag=dsync iflag=fullblock'
-    qspi_write_result = subprocess.run(qspi_write_cmd.split(), capture_output=True, text=True)
+    qspi_write_result = run(qspi_write_cmd.split(), logger=logger)
     if qspi_write_result.returncode:
         logger.error(f"{qspi_write_cmd} failed with return code: {str(qspi_write_result.returncode)}")
         return None
@@ -214,7 +214,7 @@ def get_qspi_read_performance(mtd_user_partition, offset, block_size, length, lo
             float: QSPI read performance in MB/s
     """
     qspi_read_cmd = f'dd of=/dev/null if=/dev/{mtd_user_partition} bs={block_size} skip={offset // block_size} count={length // block_size} oflag=dsync iflag=fullblock'
-    qspi_read_result = subprocess.run(qspi_read_cmd.split(), capture_output=True, text=True)
+    qspi_read_result = run(qspi_read_cmd.split(), logger=logger)
     if qspi_read_result.returncode:
         logger.error(f"{qspi_read_cmd} failed with return code: {str(qspi_read_result.returncode)}")
         return None
@@ -244,13 +244,19 @@ def log_qspi_performance(qspi_measured_speed, mode, qspi_min_speed, logger):
     if mode == "Read":
         logger.info(f"\nMinimum expected {mode} speed for QSPI MTD partition: {qspi_min_speed} MB/s")
         logger.info(f"Measured {mode} speed: {str(qspi_measured_speed)} MB/s")
+        logger.record_metric("read_speed", qspi_measured_speed, "MB/s")
     else:
         logger.info(f"\nMinimum expected {mode} speed for QSPI MTD partition: {qspi_min_speed} KB/s")
         logger.info(f"Measured {mode} speed: {str(qspi_measured_speed)} KB/s")
+        logger.record_metric("write_speed", qspi_measured_speed, "KB/s")
     # Compare measured speed with expected speed
     if float(qspi_measured_speed) < qspi_min_speed:
         logger.error(f"\nQSPI {mode} performance test failed")
         return False
+    # Compare measured speed with the QSPI on other boards
+    if not logger.check_regression(f"{mode.lower()}_speed", qspi_measured_speed):
+        logger.error(f"\nQSPI {mode} performance test failed")
+        return False
     logger.info(f"\nQSPI {mode} performance test passed")
     return True
 
@@ -275,18 +281,21 @@ def run_qspi_read_write_test(label, helpers):
     bist_mtd_write_file = tempfile.NamedTemporaryFile(delete=False)
     bist_mtd_read_file = tempfile.NamedTemporaryFile(delete=False)
     # Obtain MTD User partition and size of the partition
+    logger.phase("discovery")
     mtd_user_partition, mtd_partition_size = get_user_partition_size(logger)
     if mtd_user_partition is None:
         return False
     if mtd_partition_size < data_size:
         logger.error(f"Insufficient memory on MTD User partition. Need minimum of {data_size}MiB for test")
         return False
+    logger.phase("setup")
     mtd_test_file_write = write_random_data(length, bist_mtd_write_file, logger)
     if mtd_test_file_write is False:
         return False
     erase_partition = mtd_debug_erase(mtd_user_partition, offset, length, logger)
     if erase_partition is False:
         return False
+    logger.phase("measure")
     mtd_write = mtd_debug_write(mtd_user_partition, offset, length, bist_mtd_write_file.name, logger)
     if mtd_write is False:
         return False
@@ -327,12 +336,14 @@ def run_qspi_performance_test(label, mode, helpers):
     qspi_min_write_speed = 285 # Minimum expected QSPI write speed in KB/s
     qspi_min_read_speed = 9 # Minimum expected QSPI read speed in MB/s
     # Obtain MTD user partition and size of the partition
+    logger.phase("discovery")
     mtd_user_partition, mtd_partition_size = get_user_partition_size(logger)
     if mtd_user_partition is None:
         return False
     if mtd_partition_size < data_size:
         logger.error(f"Insufficient memory on MTD User partition. Need minimum of {data_size}MiB for test")
         return False
+    logger.phase("measure")
     cache_cleared = clear_cache(logger)
     if not cache_cleared:
         return False
@@ -3,20 +3,20 @@
 
 supported_boards = {
     'kv260': [
-            {'label': 'qspi_read_write'},
-            {'label': 'qspi_read_performance'},
-            {'label': 'qspi_write_performance'}
+            {'label': 'qspi_read_write', 'resources': ['qspi']},
+            {'label': 'qspi_read_performance', 'resources': ['qspi', 'drop_caches']},
+            {'label': 'qspi_write_performance', 'resources': ['qspi', 'drop_caches']}
     ],
 
     'kr260': [
-            {'label': 'qspi_read_write'},
-            {'label': 'qspi_read_performance'},
-            {'label': 'qspi_write_performance'}
+            {'label': 'qspi_read_write', 'resources': ['qspi']},
+            {'label': 'qspi_read_performance', 'resources': ['qspi', 'drop_caches']},
+            {'label': 'qspi_write_performance', 'resources': ['qspi', 'drop_caches']}
     ],
 
     'kd240': [
-            {'label': 'qspi_read_write'},
-            {'label': 'qspi_read_performance'},
-            {'label': 'qspi_write_performance'}
+            {'label': 'qspi_read_write', 'resources': ['qspi']},
+            {'label': 'qspi_read_performance', 'resources': ['qspi', 'drop_caches']},
+            {'label': 'qspi_write_performance', 'resources': ['qspi', 'drop_caches']}
     ]
 }
@@ -0,0 +1,206 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for running external commands
+import os
+import selectors
+import signal
+import subprocess
+import time
+
+
+class ProcessResult(subprocess.CompletedProcess):
+    """
+    Completed command with its resource usage
+
+    Attributes (in addition to args, returncode, stdout and stderr):
+            timed_out: True if the command was killed at its deadline
+            wall_time: Seconds from spawn to exit
+            user_time: User CPU seconds of the command and its waited-for children
+            sys_time: System CPU seconds of the command and its waited-for children
+            max_rss: Maximum resident set size in KB
+    """
+
+    def __init__(self, args, returncode, stdout, stderr, timed_out, wall_time, rusage):
+        super().__init__(args, returncode, stdout, stderr)
+        self.timed_out = timed_out
+        self.wall_time = wall_time
+        self.user_time = rusage.ru_utime
+        self.sys_time = rusage.ru_stime
+        self.max_rss = rusage.ru_maxrss
+
+    def summary(self):
+        """
+        Returns:
+                str: One line description of the exit status and resource usage
+        """
+        status = "timed out" if self.timed_out else f"exit {self.returncode}"
+        return (f"{status} in {self.wall_time:.3f}s, cpu {self.user_time:.3f}s user {self.sys_time:.3f}s sys, "
+                f"max rss {self.max_rss} KB")
+
+
+class Process:
+    """
+    Command running in its own process group
+
+    Output is read as it is produced, so a command cannot stall on a full pipe and the
+    output up to a timeout is kept. Stopping the command kills its whole process group,
+    so no child of a pipeline is left behind.
+    """
+
+    def __init__(self, cmd, capture=True, text=True, shell=False, logger=None):
+        self.args = cmd
+        self.text = text
+        self.logger = logger
+        output = subprocess.PIPE if capture else subprocess.DEVNULL
+        self.start_time = time.monotonic()
+        self.popen = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=output, stderr=output,
+                                      shell=shell, start_new_session=True)
+        self.pid = self.popen.pid
+        self.chunks = {}
+        self.pipes = {}
+        for name, pipe in (('stdout', self.popen.stdout), ('stderr', self.popen.stderr)):
+            if pipe is not None:
+                self.chunks[name] = []
+                self.pipes[pipe.fileno()] = name
+        self.timed_out = False
+        self.result = None
+
+    def kill(self):
+        """
+        Kill every process of the command's process group
+        """
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def exited(self):
+        """
+        Returns:
+                bool: True if the command has exited, without reaping it
+        """
+        return os.waitid(os.P_PID, self.pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+
+    def wait(self, timeout=None):
+        """
+        Wait for the command to exit, killing it at the deadline
+
+        Args:
+                timeout: Seconds to wait, None waits indefinitely
+
+        Returns:
+                ProcessResult: Completed command
+        """
+        if self.result is not None:
+            return self.result
+        deadline = None if timeout is None else time.monotonic() + timeout
+        has_exited = False
+        with selectors.DefaultSelector() as selector:
+            for fd in self.pipes:
+                selector.register(fd, selectors.EVENT_READ)
+            pidfd = None
+            if hasattr(os, "pidfd_open"):
+                try:
+                    pidfd = os.pidfd_open(self.pid)
+                    selector.register(pidfd, selectors.EVENT_READ)
+                except OSError:
+                    pidfd = None
+            try:
+                while not has_exited or selector.get_map().keys() - {pidfd}:
+                    select_timeout = None if pidfd is not None else 0.05
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.timed_out = True
+                            self.kill()
+                            deadline = None
+                            continue
+                        select_timeout = remaining if select_timeout is None else min(remaining, select_timeout)
+                    for key, events in selector.select(select_timeout):
+                        if key.fd == pidfd:
+                            selector.unregister(pidfd)
+                            has_exited = True
+                            continue
+                        data = os.read(key.fd, 65536)
+                        if data:
+                            self.chunks[self.pipes[key.fd]].append(data)
+                        else:
+                            selector.unregister(key.fd)
+                    if not has_exited and pidfd is None:
+                        has_exited = self.exited()
+                    if has_exited:
+                        # Children left in the group still hold the pipes open
+                        self.kill()
+            finally:
+                if pidfd is not None:
+                    os.close(pidfd)
+
+        pid, status, rusage = os.wait4(self.pid, 0)
+        self.popen.returncode = os.waitstatus_to_exitcode(status)
+        for pipe in (self.popen.stdout, self.popen.stderr):
+            if pipe is not None:
+                pipe.close()
+        output = {}
+        for name, chunks in self.chunks.items():
+            data = b"".join(chunks)
+            output[name] = data.decode(errors='replace') if self.text else data
+        self.result = ProcessResult(self.args, self.popen.returncode, output.get('stdout'), output.get('stderr'),
+                                    self.timed_out, time.monotonic() - self.start_time, rusage)
+        if self.logger is not None:
+            command = self.args if isinstance(self.args, str) else " ".join(self.args)
+            self.logger.debug(f"{command}: {self.result.summary()}")
+        return self.result
+
+    def stop(self):
+        """
+        Kill the command and wait for it
+
+        Returns:
+                ProcessResult: Completed command
+        """
+        if self.result is None:
+            self.kill()
+        return self.wait()
+
+
+def spawn(cmd, capture=True, text=True, shell=False, logger=None):
+    """
+    Start a command in its own process group
+
+    Args:
+            cmd: Command as a list of arguments, or a string with shell=True
+            capture: True to capture stdout and stderr, False to discard them
+            text: True to decode the output as text
+            shell: True to run the command through the shell
+            logger: Handle for logging the resource usage, None to not log it
+
+    Returns:
+            Process: Running command
+    """
+    return Process(cmd, capture, text, shell, logger)
+
+
+def run(cmd, timeout=None, check=False, capture=True, text=True, shell=False, logger=None):
+    """
+    Run a command to completion in its own process group
+
+    Args:
+            cmd: Command as a list of arguments, or a string with shell=True
+            timeout: Seconds before the command's process group is killed, None for no deadline
+            check: True to raise CalledProcessError on a non-zero exit status
+            capture: True to capture stdout and stderr, False to discard them
+            text: True to decode the output as text
+            shell: True to run the command through the shell
+            logger: Handle for logging the resource usage, None to not log it
+
+    Returns:
+            ProcessResult: Completed command
+
+    Raises:
+            subprocess.CalledProcessError: check is True and the command failed
+    """
+    result = spawn(cmd, capture, text, shell, logger).wait(timeout)
+    if check and result.returncode:
+        raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
+    return result
@@ -0,0 +1,186 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for human confirmations
+import json
+import time
+from timeout_handler import input_timeout, TimeoutException
+
+# Seconds to wait for the answer to a single prompt
+prompt_timeout = 30
+
+# Defer confirmations to a single batch at the end of the session
+defer = False
+# File of "<label> Y|N" lines answering deferred confirmations, may be written while the session runs
+answers_file = None
+
+# Confirmations deferred by the running test
+test_prompts = []
+# Confirmations deferred by the tests of the session, answered at the end
+pending = []
+# (deferred confirmation, answer) of the batch asked at the end of the session
+answered = []
+
+
+def configure(defer_prompts, answers_path):
+    """
+    Set how confirmations are asked
+
+    Args:
+            defer_prompts: True to record confirmations and ask them at the end of the session
+            answers_path: File of "<label> Y|N" lines answering deferred confirmations, None if not used
+    """
+    global defer, answers_file
+    defer = defer_prompts
+    answers_file = answers_path
+    test_prompts.clear()
+    pending.clear()
+    answered.clear()
+
+
+def ask(logger, timeout=prompt_timeout):
+    """
+    Read a Y or N answer from the console
+
+    Args:
+            logger: Handle for logging
+            timeout: Seconds to wait for each line of input
+
+    Returns:
+            bool: True for Y, False for N
+
+    Raises:
+            TimeoutException: No answer within the timeout
+            EOFError: Input closed before an answer
+    """
+    while(1):
+        var = input_timeout(timeout).strip().upper()
+        if var in ('Y', 'N'):
+            return var == 'Y'
+        logger.info("Invalid input, please try again")
+
+
+def confirm(label, question, logger, observe_time=0, evidence=None):
+    """
+    Ask the user to confirm a visual check, now or at the end of the session
+
+    Args:
+            label: Test label
+            question: Question answered with Y or N
+            logger: Handle for logging
+            observe_time: Seconds the stimulus is left on before a deferred confirmation returns
+            evidence: Dict describing what the user was shown, listed with a deferred confirmation
+
+    Returns:
+            bool: True if confirmed or deferred, False if rejected or the user input timed out
+    """
+    if defer:
+        time.sleep(observe_time)
+        test_prompts.append({'label': label, 'question': question, 'time': time.strftime("%H:%M:%S"),
+                             'evidence': evidence or {}})
+        logger.info(f"Confirmation deferred to the end of the session: {question}?")
+        return True
+
+    logger.info(f"{question} [Y/N]?")
+    try:
+        answer = ask(logger)
+    except TimeoutException:
+        logger.error("No user input entered after " + str(prompt_timeout) + " seconds, aborting test")
+        return False
+    except EOFError:
+        logger.error("Input closed before an answer, aborting test")
+        return False
+    if answer:
+        logger.info("User confirms: " + question)
+    else:
+        logger.error("User rejects: " + question)
+    return answer
+
+
+def take_test_prompts():
+    """
+    Returns:
+            list: Confirmations deferred by the running test, as JSON strings
+    """
+    prompts = [json.dumps(prompt) for prompt in test_prompts]
+    test_prompts.clear()
+    return prompts
+
+
+def add_pending(prompt, nodeid, location):
+    """
+    Add a confirmation deferred by a test, which may have run in a worker process
+
+    Args:
+            prompt: Deferred confirmation as a JSON string
+            nodeid: Node ID of the test, reported as failed if the confirmation is rejected
+            location: Location of the test, as in its reports
+    """
+    prompt = json.loads(prompt)
+    prompt['nodeid'] = nodeid
+    prompt['location'] = tuple(location)
+    pending.append(prompt)
+
+
+def read_answers():
+    """
+    Returns:
+            dict: Label -> answer given in the answers file
+    """
+    answers = {}
+    if not answers_file:
+        return answers
+    try:
+        with open(answers_file, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) == 2 and fields[1].upper() in ('Y', 'N'):
+                    answers[fields[0]] = fields[1].upper() == 'Y'
+    except OSError:
+        pass
+    return answers
+
+
+def run_batch(logger):
+    """
+    Ask every deferred confirmation in a single session
+
+    Confirmations answered in the answers file are not asked. The others are listed
+    together and answered with one line of Y/N, one letter per confirmation in order.
+
+    Args:
+            logger: Handle for logging
+
+    Returns:
+            list: (deferred confirmation, True/False/None if unanswered) of every deferred confirmation
+    """
+    answers = read_answers()
+    results = [[prompt, answers.get(prompt['label'])] for prompt in pending]
+    unanswered = [result for result in results if result[1] is None]
+    if unanswered:
+        logger.info("------------------------------------------")
+        logger.info("Deferred confirmations")
+        for number, (prompt, answer) in enumerate(unanswered, 1):
+            details = ", ".join(f"{key} {value}" for key, value in prompt['evidence'].items())
+            logger.info(f"{number}. [{prompt['label']}] at {prompt['time']}: {prompt['question']}?"
+                        + (f" ({details})" if details else ""))
+        logger.info(f"Answer with {len(unanswered)} letters of Y/N in the order above, eg {'Y' * len(unanswered)}:")
+        try:
+            while(1):
+                var = input_timeout(prompt_timeout * len(unanswered)).strip().upper()
+                if len(var) == len(unanswered) and set(var) <= {'Y', 'N'}:
+                    break
+                logger.info("Invalid input, please try again")
+            for result, letter in zip(unanswered, var):
+                result[1] = letter == 'Y'
+        except (TimeoutException, EOFError):
+            logger.error("No user input entered, deferred confirmations left unanswered")
+
+    for prompt, answer in results:
+        if answer is None:
+            logger.error(f"[{prompt['label']}] Not confirmed: {prompt['question']}")
+        elif not answer:
+            logger.error(f"[{prompt['label']}] User rejects: {prompt['question']}")
+    pending.clear()
+    answered.extend(tuple(result) for result in results)
+    return answered
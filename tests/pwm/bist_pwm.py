@@ -2,7 +2,45 @@
 # SPDX-License-Identifier: MIT
 
 import glob
+import time
 from timeout_handler import input_timeout, TimeoutException
+import prompt_manager
+
+
+def run_fancontrol_sequence(label, pwm_file, fan_speed_slow, fan_speed_max, logger):
+    """
+    Slow the fan down for a while and restore it without waiting on the user,
+    who confirms the change at the end of the session
+
+    Args:
+            label: Test label
+            pwm_file: Sysfs PWM file of the fan
+            fan_speed_slow: Reduced PWM value
+            fan_speed_max: Full speed PWM value
+            logger: Handle for logging
+
+    Returns:
+            bool: True, the confirmation is deferred
+    """
+    fan_observe_time = 10
+    slow_percent = int(fan_speed_slow/fan_speed_max*100)
+    logger.phase("measure")
+    logger.info("Reducing fan speed to " + str(slow_percent) + "% for " + str(fan_observe_time) +
+                " seconds, please observe the fan")
+    slowed_at = time.strftime("%H:%M:%S")
+    try:
+        logger.debug("Writing " + str(fan_speed_slow) + " to " + str(pwm_file))
+        with open(pwm_file, "w") as pf:
+            pf.write(str(fan_speed_slow))
+        time.sleep(fan_observe_time)
+    finally:
+        logger.info("Setting fan back to max speed")
+        with open(pwm_file, "w") as pf:
+            pf.write(str(fan_speed_max))
+    logger.phase("confirm")
+    return prompt_manager.confirm(label, "Did the fan slow down for " + str(fan_observe_time) +
+                                  " seconds and then return to full speed", logger,
+                                  evidence={'slowed at': slowed_at, 'reduced to': str(slow_percent) + "%"})
 
 
 def run_fancontrol_test(label, helpers):
@@ -15,6 +53,7 @@ def run_fancontrol_test(label, helpers):
     user_input_timeout = 30
 
     # Get pwm file based on hwmon name
+    logger.phase("discovery")
     hwmon_devices = glob.glob("/sys/class/hwmon/*/name")
     for file in hwmon_devices:
         with open(file) as f:
@@ -27,6 +66,12 @@ def run_fancontrol_test(label, helpers):
         logger.error("Failed to get pwm file")
         return False
 
+    if prompt_manager.defer:
+        logger.info("Please stop the fancontrol service before running this test "
+                    "and remember to restart the service after the test is complete.")
+        return run_fancontrol_sequence(label, pwm_file, fan_speed_slow, fan_speed_max, logger)
+
+    logger.phase("confirm")
     logger.info("Please stop the fancontrol service before running this test "
                 "and remember to restart the service after the test is complete."
                 "\nTo perform this test, use the prompt below to reduce the fan speed, "
@@ -3,14 +3,14 @@
 
 supported_boards = {
     'kv260': [
-        {'label': 'fan'}
+        {'label': 'fan', 'resources': ['fan', 'console']}
     ],
 
     'kr260': [
-        {'label': 'fan'}
+        {'label': 'fan', 'resources': ['fan', 'console']}
     ],
 
     'kd240': [
-        {'label': 'fan'}
+        {'label': 'fan', 'resources': ['fan', 'console']}
     ]
 }
@@ -0,0 +1,156 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for storing measurements
+import json
+import os
+import socket
+import threading
+import time
+import board_id
+
+# Number of buffered records that triggers a write to the results file
+batch_size = 32
+
+
+class ResultStore:
+    """
+    Append-only JSON lines sink for numeric test results
+
+    Records are buffered and appended in batches. Each batch is written with a
+    single write() on an O_APPEND descriptor so that forked workers can share
+    the file.
+    """
+
+    def __init__(self, path, env):
+        self.path = path
+        self.env = env
+        self.pending = []
+        self.lock = threading.Lock()
+
+    def record(self, label, metric, value, units):
+        """
+        Buffer one measurement
+
+        Args:
+                label: Label of the test that took the measurement
+                metric: Name of the measured quantity
+                value: Measured value
+                units: Units of the value
+        """
+        record = {
+            'timestamp': time.time(),
+            'serial': self.env['serial'],
+            'board': self.env['board'],
+            'label': label,
+            'metric': metric,
+            'value': float(value),
+            'units': units,
+            'env': self.env,
+        }
+        with self.lock:
+            self.pending.append(json.dumps(record))
+            if len(self.pending) < batch_size:
+                return
+        self.flush()
+
+    def flush(self):
+        """
+        Append the buffered measurements to the results file
+        """
+        with self.lock:
+            if not self.pending:
+                return
+            data = ("\n".join(self.pending) + "\n").encode()
+            self.pending = []
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def discard(self):
+        """
+        Drop the buffered measurements without writing them
+        """
+        with self.lock:
+            self.pending = []
+
+
+def get_board_serial():
+    """
+    Read the serial number of the SOM from its FRU EEPROM
+
+    Returns:
+            str: SOM serial number/"unknown" if it cannot be read
+    """
+    board_info = board_id.read_board_info('50')
+    if not board_info or not board_info.get('serial_number'):
+        return "unknown"
+    return board_info['serial_number']
+
+
+def get_environment(board):
+    """
+    Describe the board and software the measurements were taken on
+
+    Args:
+            board: Board name given with --board
+
+    Returns:
+            dict: Environment of the run
+    """
+    return {
+        'board': board,
+        'serial': get_board_serial(),
+        'kernel': os.uname().release,
+        'hostname': socket.gethostname(),
+    }
+
+
+store = None
+
+
+def configure(path, board):
+    """
+    Open the results store of the session
+
+    Args:
+            path: Path of the JSON lines results file, None disables recording
+            board: Board name given with --board
+    """
+    global store
+    store = ResultStore(path, get_environment(board)) if path else None
+
+
+def record(label, metric, value, units):
+    """
+    Record a measurement in the session's results store, if any
+
+    Args:
+            label: Label of the test that took the measurement
+            metric: Name of the measured quantity
+            value: Measured value
+            units: Units of the value
+    """
+    if store is not None:
+        store.record(label, metric, value, units)
+
+
+def flush():
+    """
+    Write the buffered measurements of the session's results store, if any
+    """
+    if store is not None:
+        store.flush()
+
+
+def discard_pending():
+    """
+    Drop the records inherited from the parent in a forked child, the parent writes them
+    """
+    if store is not None:
+        store.discard()
+
+
+os.register_at_fork(after_in_child=discard_pending)
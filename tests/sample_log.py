@@ -0,0 +1,139 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for the binary sample log
+import os
+import struct
+import sys
+import time
+
+# Series definition: record type, series ID, length of the "label/metric" name that follows
+series_format = struct.Struct('<BHH')
+# Sample: record type, series ID, time since the epoch, value
+sample_format = struct.Struct('<BHdd')
+series_type = 0
+sample_type = 1
+
+
+class SampleLog:
+    """
+    Buffer of per-sample measurements written to a compact binary file
+
+    Samples are packed in memory and written with a single append per flush, so a
+    measurement loop never waits on the file. Every flushed chunk defines the series
+    it uses, so chunks appended by concurrent workers can be read independently.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.series = {}
+        self.pending = bytearray()
+
+    def sample(self, label, metric, value):
+        key = (label, metric)
+        series_id = self.series.get(key)
+        if series_id is None:
+            series_id = len(self.series)
+            self.series[key] = series_id
+        self.pending += sample_format.pack(sample_type, series_id, time.time(), value)
+
+    def flush(self):
+        if not self.pending:
+            return
+        chunk = bytearray()
+        for (label, metric), series_id in self.series.items():
+            name = f"{label}/{metric}".encode()
+            chunk += series_format.pack(series_type, series_id, len(name)) + name
+        chunk += self.pending
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, chunk)
+        finally:
+            os.close(fd)
+        self.discard()
+
+    def discard(self):
+        self.series = {}
+        self.pending = bytearray()
+
+
+def read_samples(path):
+    """
+    Read a binary sample log
+
+    Args:
+            path: Path of the sample log
+
+    Returns:
+            list: (label, metric, time, value) of every sample
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    names = {}
+    samples = []
+    offset = 0
+    while offset < len(data):
+        if data[offset] == series_type:
+            record_type, series_id, length = series_format.unpack_from(data, offset)
+            offset += series_format.size
+            names[series_id] = data[offset:offset + length].decode().split('/', 1)
+            offset += length
+        else:
+            record_type, series_id, timestamp, value = sample_format.unpack_from(data, offset)
+            offset += sample_format.size
+            label, metric = names[series_id]
+            samples.append((label, metric, timestamp, value))
+    return samples
+
+
+log = None
+
+
+def configure(path):
+    """
+    Open the sample log of the session
+
+    Args:
+            path: Path of the sample log, None disables it
+    """
+    global log
+    log = SampleLog(path) if path else None
+
+
+def sample(label, metric, value):
+    """
+    Buffer a sample in the session's sample log, if any
+
+    Args:
+            label: Label of the test that took the sample
+            metric: Name of the sampled quantity
+            value: Sampled value
+    """
+    if log is not None:
+        log.sample(label, metric, value)
+
+
+def flush():
+    """
+    Write the buffered samples of the session's sample log, if any
+    """
+    if log is not None:
+        log.flush()
+
+
+def discard_pending():
+    """
+    Drop the samples inherited from the parent in a forked child, the parent writes them
+    """
+    if log is not None:
+        log.discard()
+
+
+os.register_at_fork(after_in_child=discard_pending)
+
+
+if __name__ == "__main__":
+    # Print a sample log as CSV, eg python3 sample_log.py kria_bist_samples.bin
+    print("label,metric,time,value")
+    for label, metric, timestamp, value in read_samples(sys.argv[1]):
+        print(f"{label},{metric},{timestamp:.6f},{value}")
@@ -0,0 +1,184 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for parallel test execution
+import os
+import sys
+import signal
+import pickle
+import selectors
+import pytest
+from _pytest.runner import runtestprotocol
+import results_store
+import sample_log
+import log_queue
+import dependencies
+
+
+def get_item_resources(item):
+    """
+    Get the hardware resources declared by the config entry of a test
+
+    Args:
+            item: Collected pytest item
+
+    Returns:
+            frozenset/None: Declared resources/None if the entry does not declare any,
+                            in which case the test has to run alone on the board
+    """
+    callspec = getattr(item, "callspec", None)
+    if callspec is None:
+        return None
+    config_entry = callspec.params.get("id")
+    if not isinstance(config_entry, dict) or "resources" not in config_entry:
+        return None
+    return frozenset(config_entry["resources"])
+
+
+def spawn_item(item):
+    """
+    Run a single test in a forked worker process
+
+    The worker runs the full setup/call/teardown protocol and sends the serialized
+    reports back to the scheduler through a pipe.
+
+    Args:
+            item: Collected pytest item
+
+    Returns:
+            int: Worker pid
+            int: Read end of the report pipe
+    """
+    # Flush buffered output so it is not written twice after the fork
+    sys.stdout.flush()
+    sys.stderr.flush()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 0
+        try:
+            reports = runtestprotocol(item, log=False, nextitem=None)
+            results_store.flush()
+            sample_log.flush()
+            log_queue.flush()
+            data = [item.config.hook.pytest_report_to_serializable(config=item.config, report=report)
+                    for report in reports]
+            with os.fdopen(write_fd, "wb") as f:
+                pickle.dump(data, f)
+        except BaseException:
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+    os.close(write_fd)
+    return pid, read_fd
+
+
+def report_item(item, data, exit_status):
+    """
+    Replay the reports of a finished worker through the scheduler's hooks
+
+    Args:
+            item: Collected pytest item
+            data: Pickled list of serialized reports sent by the worker
+            exit_status: Wait status of the worker process
+    """
+    config = item.config
+    try:
+        reports = [config.hook.pytest_report_from_serializable(config=config, data=report)
+                   for report in pickle.loads(data)]
+    except Exception:
+        reports = []
+    if not reports:
+        # Worker crashed before sending its reports
+        exit_code = os.waitstatus_to_exitcode(exit_status)
+        reports = [pytest.TestReport(item.nodeid, item.location, {keyword: 1 for keyword in item.keywords},
+                                     "failed", f"Worker process exited with code {exit_code}", "call")]
+    for report in reports:
+        item.ihook.pytest_runtest_logreport(report=report)
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+
+
+def run_parallel(session, workers):
+    """
+    Run the collected tests concurrently in forked worker processes
+
+    A test is started as soon as a worker is free and none of its declared resources
+    are held by a running test and its prerequisites have finished. Tests that do not
+    declare resources only run when the board is otherwise idle, and block other tests
+    while they run.
+
+    Args:
+            session: Pytest session
+            workers: Maximum number of concurrently running tests
+
+    Returns:
+            bool: True, as the run loop has been handled
+    """
+    pending = list(session.items)
+    running = {}  # Read fd of the report pipe -> (item, pid, resources, data)
+    held = set()
+    exclusive_running = False
+    selector = selectors.DefaultSelector()
+
+    try:
+        while pending or running:
+            if session.shouldfail or session.shouldstop:
+                pending = []
+
+            # Start every pending test whose resources are free, in collection order
+            unfinished = pending + [item for item, pid, resources, data in running.values()]
+            for item in list(pending):
+                if len(running) >= workers or exclusive_running:
+                    break
+                if dependencies.is_waiting(item, unfinished, [other for other, *_ in running.values()]):
+                    continue
+                resources = get_item_resources(item)
+                if resources is None:
+                    if running:
+                        continue
+                elif held & resources:
+                    continue
+                pending.remove(item)
+                item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+                pid, read_fd = spawn_item(item)
+                selector.register(read_fd, selectors.EVENT_READ)
+                running[read_fd] = (item, pid, resources, bytearray())
+                if resources is None:
+                    exclusive_running = True
+                else:
+                    held |= resources
+
+            if not running:
+                continue
+
+            # Collect report data and finish the tests whose worker closed its pipe
+            for key, _ in selector.select():
+                read_fd = key.fd
+                item, pid, resources, data = running[read_fd]
+                chunk = os.read(read_fd, 65536)
+                if chunk:
+                    data.extend(chunk)
+                    continue
+                selector.unregister(read_fd)
+                os.close(read_fd)
+                del running[read_fd]
+                _, exit_status = os.waitpid(pid, 0)
+                if resources is None:
+                    exclusive_running = False
+                else:
+                    held -= resources
+                report_item(item, bytes(data), exit_status)
+    finally:
+        # Do not leave workers behind on interrupt
+        for read_fd, (item, pid, resources, data) in running.items():
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+            os.close(read_fd)
+        selector.close()
+    return True
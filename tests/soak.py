@@ -0,0 +1,284 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for soak runs
+import logging
+import math
+import time
+import pytest
+from _pytest.runner import runtestprotocol
+import dependencies
+import prompt_manager
+
+# Log records below WARNING passed per second for each test label, after a burst
+log_rate = 1.0
+log_burst = 100
+
+# Minimum seconds between progress messages
+progress_interval = 60
+
+# Soak limits, a soak run is active if either is set
+duration = None
+iterations = None
+
+# Node ID -> TestStats of every test of the soak run
+test_stats = {}
+# (label, metric) -> RunningStats of the recorded metrics
+metric_stats = {}
+# (label, metric) -> units of the recorded metrics
+metric_units = {}
+completed_iterations = 0
+
+
+class RunningStats:
+    """
+    Count, mean, standard deviation and range of a series, updated in constant memory (Welford)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class TestStats:
+    """
+    Outcomes of a test over the iterations of a soak run
+    """
+
+    def __init__(self):
+        self.outcomes = {'passed': 0, 'failed': 0, 'skipped': 0}
+        self.first_failure = None
+        self.duration = 0.0
+
+    def add(self, iteration, reports):
+        outcome = "passed"
+        for report in reports:
+            self.duration += report.duration
+            if report.failed:
+                outcome = "failed"
+            elif report.skipped and outcome == "passed":
+                outcome = "skipped"
+        self.outcomes[outcome] += 1
+        if outcome == "failed" and self.first_failure is None:
+            self.first_failure = iteration
+
+    @property
+    def runs(self):
+        return self.outcomes['passed'] + self.outcomes['failed']
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Pass every warning and error, and other records of each test label at a limited rate
+
+    Each label has a token bucket of log_burst records refilled at log_rate records per
+    second, so the first iteration is logged in full and later ones are sampled. The next
+    record passed notes how many were dropped.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.buckets = {}
+        self.dropped = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        label = getattr(record, 'label', None)
+        now = time.monotonic()
+        tokens, last = self.buckets.get(label, (log_burst, now))
+        tokens = min(log_burst, tokens + (now - last) * log_rate)
+        if tokens < 1:
+            self.buckets[label] = (tokens, now)
+            self.dropped[label] = self.dropped.get(label, 0) + 1
+            return False
+        self.buckets[label] = (tokens - 1, now)
+        dropped = self.dropped.pop(label, 0)
+        if dropped and not record.args:
+            record.msg = f"{record.msg} ({dropped} log records dropped)"
+        return True
+
+
+def parse_duration(value):
+    """
+    Args:
+            value: Duration in seconds, or with an s, m or h suffix, eg 24h
+
+    Returns:
+            float: Duration in seconds
+    """
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if value[-1:].lower() in units:
+        return float(value[:-1]) * units[value[-1].lower()]
+    return float(value)
+
+
+def configure(soak_duration, soak_iterations, logger):
+    """
+    Set the limits of the soak run
+
+    Args:
+            soak_duration: Duration of the run, see parse_duration(), None for no limit
+            soak_iterations: Number of iterations, None for no limit
+            logger: Logger whose records are rate limited during the run
+    """
+    global duration, iterations, completed_iterations
+    duration = parse_duration(soak_duration) if soak_duration else None
+    iterations = soak_iterations
+    completed_iterations = 0
+    test_stats.clear()
+    metric_stats.clear()
+    metric_units.clear()
+    if active():
+        logger.addFilter(RateLimitFilter())
+
+
+def active():
+    """
+    Returns:
+            bool: True if a soak run was requested
+    """
+    return duration is not None or iterations is not None
+
+
+def record_metric(label, metric, value, units):
+    """
+    Add a measurement to the distribution of its metric
+
+    Args:
+            label: Label of the test that took the measurement
+            metric: Name of the measured quantity
+            value: Measured value
+            units: Units of the value
+    """
+    if not active():
+        return
+    key = (label, metric)
+    if key not in metric_stats:
+        metric_stats[key] = RunningStats()
+        metric_units[key] = units
+    metric_stats[key].add(float(value))
+
+
+def aggregate_reports(item, stats):
+    """
+    Build the reports of a test summarizing all its iterations
+
+    Args:
+            item: Collected pytest item
+            stats: TestStats of the item
+
+    Returns:
+            list: Setup, call and teardown reports
+    """
+    keywords = {keyword: 1 for keyword in item.keywords}
+    summary = (f"{stats.outcomes['passed']} of {stats.runs} iterations passed"
+               + (f", first failure at iteration {stats.first_failure}" if stats.first_failure else ""))
+    if stats.outcomes['failed']:
+        outcome, longrepr = "failed", f"Soak: {summary}"
+    elif stats.runs:
+        outcome, longrepr = "passed", None
+    else:
+        outcome, longrepr = "skipped", (str(item.path), item.location[1], "Skipped in every iteration")
+    reports = []
+    for when in ("setup", "call", "teardown"):
+        reports.append(pytest.TestReport(item.nodeid, item.location, keywords,
+                                         outcome if when == "call" else "passed",
+                                         longrepr if when == "call" else None, when,
+                                         user_properties=[("soak", summary)] if when == "call" else [],
+                                         duration=stats.duration if when == "call" else 0))
+    return reports
+
+
+def run(session, logger):
+    """
+    Run the collected tests in a loop until the soak duration or iteration count is reached
+
+    Tests run in this process, so imported libraries, the hardware index and open
+    device handles are reused between iterations. Each test is reported once at the
+    end, failed if any of its iterations failed.
+
+    Args:
+            session: Pytest session
+            logger: Handle for logging
+
+    Returns:
+            bool: True, the tests were run
+    """
+    global completed_iterations
+    items = session.items
+    deadline = None if duration is None else time.monotonic() + duration
+    last_progress = -math.inf
+    # Failed test runs, the reports are not logged so pytest does not count them for -x/--maxfail
+    failures = 0
+    maxfail = session.config.getoption("maxfail")
+    while (iterations is None or completed_iterations < iterations) and \
+          (deadline is None or time.monotonic() < deadline):
+        iteration = completed_iterations + 1
+        # Prerequisites are run again in every iteration
+        dependencies.reset()
+        for index, item in enumerate(items):
+            # Fixtures shared with the next test, also across iterations, are not torn down
+            nextitem = items[(index + 1) % len(items)] if len(items) > 1 else None
+            item.user_properties.clear()
+            reports = runtestprotocol(item, log=False, nextitem=nextitem)
+            dependencies.record_reports(reports)
+            # The reports are not logged, ask the confirmations deferred by the iteration at the end of the session
+            for report in reports:
+                for prompt in getattr(report, "deferred_prompts", []):
+                    prompt_manager.add_pending(prompt, report.nodeid, report.location)
+            test_stats.setdefault(item.nodeid, TestStats()).add(iteration, reports)
+            if any(report.failed for report in reports):
+                failures += 1
+                if maxfail and failures >= maxfail:
+                    session.shouldfail = f"stopping after {failures} failures"
+            if session.shouldstop or session.shouldfail:
+                break
+        completed_iterations = iteration
+        if time.monotonic() - last_progress >= progress_interval:
+            last_progress = time.monotonic()
+            failed = sum(1 for stats in test_stats.values() if stats.first_failure)
+            logger.info(f"Soak iteration {iteration} done, {failed} of {len(items)} tests failed at least once")
+        if session.shouldstop or session.shouldfail:
+            break
+
+    for item in items:
+        if item.nodeid not in test_stats:
+            continue
+        item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+        for report in aggregate_reports(item, test_stats[item.nodeid]):
+            item.ihook.pytest_runtest_logreport(report=report)
+        item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+def summary_lines():
+    """
+    Returns:
+            list: Pass rate of every test and distribution of every metric of the soak run
+    """
+    lines = [f"{completed_iterations} iterations"]
+    for nodeid, stats in test_stats.items():
+        rate = 100 * stats.outcomes['passed'] / stats.runs if stats.runs else 0
+        lines.append(f"{nodeid}: {stats.outcomes['passed']}/{stats.runs} passed ({rate:.1f}%)"
+                     + (f", first failure at iteration {stats.first_failure}" if stats.first_failure else ""))
+    for (label, metric), stats in metric_stats.items():
+        units = metric_units[(label, metric)]
+        lines.append(f"{label} {metric} [{units}]: mean {stats.mean:.3f} std {stats.std:.3f} "
+                     f"min {stats.min:.3f} max {stats.max:.3f} (n={stats.count})")
+    return lines
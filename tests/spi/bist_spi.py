@@ -2,10 +2,12 @@
 # SPDX-License-Identifier: MIT
 
 # Import the 'modules' that are required for test cases execution
-import periphery
 import time
-import glob
-import re
+import hw_discovery
+import device_pool
+from lazy_import import lazy_import
+
+periphery = lazy_import("periphery")
 
 
 def get_spidev_path(controller, spi_device, channel_select, device_name, logger):
@@ -22,17 +24,11 @@ def get_spidev_path(controller, spi_device, channel_select, device_name, logger)
     Returns:
             str: SPI device path
     """
-    spi_path = f'/sys/devices/platform/axi/{controller}.axi_quad_spi/spi_master/spi*/spi*/modalias'
-    spidev_match_paths = glob.glob(spi_path)
-    for path in spidev_match_paths:
-        with open(path, 'r') as file:
-            content = file.read()
-        if spi_device in content:
-            spi_bus = re.search(r'spi(\d+)', path).group(1)
-            if spi_bus is not None:
-                logger.info(f"Device {device_name} detected on SPI bus {spi_bus} with slave select channel {channel_select}")
-                spi_dev_path = f"/dev/spidev{spi_bus}.{channel_select}"  # To choose spi bus & device (chip select)
-                return spi_dev_path
+    spi_bus = hw_discovery.get_index().spi_bus(controller, spi_device)
+    if spi_bus is not None:
+        logger.info(f"Device {device_name} detected on SPI bus {spi_bus} with slave select channel {channel_select}")
+        spi_dev_path = f"/dev/spidev{spi_bus}.{channel_select}"  # To choose spi bus & device (chip select)
+        return spi_dev_path
     logger.error(f"Device {device_name} could not be detected on the SPI bus")
     return None
 
@@ -46,15 +42,17 @@ def initialize_ad7797_sensor(spi_dev_path, logger):
             logger: Calling function's logger object
 
     Returns:
-            periphery: SPI device object
+            periphery: SPI device object, shared by the tests of the session
     """
     spi_mode = 0  # To choose spi mode 0
     speed_hz = 1000000  # Set clock frequency to 1MHz
     try:
-        # Create a SPI device object
-        spi_dev = periphery.SPI(spi_dev_path, spi_mode, speed_hz)
+        # Get the pooled SPI device object, opened by the first test using it
+        spi_dev = device_pool.get_pool().acquire(("spi", spi_dev_path),
+                                                 lambda: periphery.SPI(spi_dev_path, spi_mode, speed_hz),
+                                                 closer=lambda spi_dev: spi_dev.close())
         logger.debug(f"Opened SPI communication for Torque sensor on {spi_dev_path}")
-    except periphery.spi.SPIError as e:
+    except periphery.SPIError as e:
         logger.error(f"Error opening SPI communication for Torque sensor on {spi_dev_path} - {e}")
         return None
     # Reset Torque sensor
@@ -62,8 +60,9 @@ def initialize_ad7797_sensor(spi_dev_path, logger):
         spi_dev.transfer([0xFF, 0xFF, 0xFF, 0xFF])
         logger.info(f"Initialized Torque sensor on {spi_dev_path}")
         return spi_dev
-    except periphery.spi_dev.SPIError as e:
+    except periphery.SPIError as e:
         logger.error(f"Error: SPI communication failed for sensor reset - {e}")
+        device_pool.get_pool().discard(("spi", spi_dev_path), logger)
         return None
 
 
@@ -86,7 +85,7 @@ def spi_transfer_command(spi_dev, spi_command, logger):
         logger.debug(f"SPI command sent: {spi_command_hex}")
         logger.debug(f"Response received: {response_hex}")
         return response
-    except periphery.spi_dev.SPIError as e:
+    except periphery.SPIError as e:
         logger.error(f"Error: SPI communication failed for command: {spi_command} - {e}")
         return None
 
@@ -109,14 +108,17 @@ def run_ad7797_id_test(label, controller, channel_select, spi_device, helpers):
     logger.start_test()
     spi_torque_sensor_id = '0x5b'
     # Get spi device path of the form /dev/spidevX.Y - X represents spi bus and Y represents slave channel select
+    logger.phase("discovery")
     spi_dev_path = get_spidev_path(controller, spi_device, channel_select, "AD7797", logger)
     if spi_dev_path is None:
         return False
     # Obtain spi device object on initializing Torque sensor
+    logger.phase("setup")
     spi_dev = initialize_ad7797_sensor(spi_dev_path, logger)
     if spi_dev is None:
         return False
     # Spi command to read ID register on the device
+    logger.phase("measure")
     spi_read_id_command = [0x60,0x80]
     spi_response = spi_transfer_command(spi_dev, spi_read_id_command, logger)
     if spi_response is None:
@@ -149,10 +151,12 @@ def run_ad7797_temperature_test(label, controller, channel_select, spi_device, h
     logger = helpers.logger_init(label)
     logger.start_test()
     # Get spi device path of the form /dev/spidevX.Y for X represents spi bus and Y represents slave channel select
+    logger.phase("discovery")
     spi_dev_path = get_spidev_path(controller, spi_device, channel_select, "AD7797", logger)
     if spi_dev_path is None:
         return False
     # Obtain spi device object on initializing Torque sensor
+    logger.phase("setup")
     spi_dev = initialize_ad7797_sensor(spi_dev_path, logger)
     if spi_dev is None:
         return False
@@ -163,6 +167,7 @@ def run_ad7797_temperature_test(label, controller, channel_select, spi_device, h
             3: Read temperature from data register - [0x58, 0x80, 0x80, 0x80]
     '''
     # Spi command to write configuration register
+    logger.phase("measure")
     spi_write_conf_command = [0x10, 0x17, 0x16, 0x80]
     spi_write_conf_response = spi_transfer_command(spi_dev, spi_write_conf_command, logger)
     if spi_write_conf_response is None:
@@ -173,7 +178,9 @@ def run_ad7797_temperature_test(label, controller, channel_select, spi_device, h
     if spi_read_conf_response is None:
         return False
     # Sleep for 1s before reading the temperature in order to avoid reading incorrect values
+    logger.phase("settle")
     time.sleep(1)
+    logger.phase("measure")
     # Spi command to read temperature from data register
     spi_read_temp_command = [0x58, 0x80, 0x80, 0x80]
     spi_read_temp_response = spi_transfer_command(spi_dev, spi_read_temp_command, logger)
@@ -0,0 +1,194 @@
+# Copyright (C) 2025 Advanced Micro Devices, Inc.
+# SPDX-License-Identifier: MIT
+
+# Import the 'modules' that are required for setup state planning
+import os
+import dependencies
+
+# Estimated seconds to enter and leave a setup state, by kind (the part of the
+# 'setup_state' name before ':')
+state_costs = {
+    'motor_openloop': 2.0,   # Mode changes and settle time
+    'motor_speed': 13.0,
+    'mount': 1.0,            # mount, lazy umount and test directory removal
+    'can_link': 0.5,         # ip link up/down of both nodes and bus setup
+    'imx547_pipeline': 0.5,  # media-ctl and MMIO configuration
+}
+default_cost = 1.0
+
+# Node ID -> setup state of the next planned test, None if it has none or is the last one
+next_states = {}
+# Estimated seconds saved by reusing setup states in the planned order
+estimated_saving = 0.0
+# Number of tests sharing a setup state with the previous test in the planned order
+reused_tests = 0
+
+# Setup state declared by the running test
+declared = None
+# True if the running test failed, its setup state is not reused
+failed = False
+# Setup state that is set up, [name, key, value, teardown]
+current = None
+# True in a forked worker, which runs a single test
+in_worker = False
+
+
+def get_item_state(item):
+    """
+    Args:
+            item: Collected pytest item
+
+    Returns:
+            str/None: Setup state declared by the config entry of the test/None if it declares none
+    """
+    callspec = getattr(item, "callspec", None)
+    entry = callspec.params.get("id") if callspec else None
+    if not isinstance(entry, dict):
+        return None
+    return entry.get('setup_state')
+
+
+def get_cost(state):
+    """
+    Args:
+            state: Setup state name, eg mount:usb1
+
+    Returns:
+            float: Estimated seconds to enter and leave the state
+    """
+    return state_costs.get(state.split(':')[0], default_cost)
+
+
+def order_items(items):
+    """
+    Move the tests sharing a setup state next to the first test using it, so the state is
+    set up once for all of them
+
+    A test is only moved ahead of the tests between them if none of its prerequisites
+    is among those.
+
+    Args:
+            items: Collected pytest items, reordered in place
+    """
+    remaining = list(items)
+    ordered = []
+    while remaining:
+        item = remaining.pop(0)
+        ordered.append(item)
+        state = get_item_state(item)
+        if state is None:
+            continue
+        for other in list(remaining):
+            if get_item_state(other) != state:
+                continue
+            waiting = {dependencies.get_item_key(test) for test in remaining if test is not other}
+            if any(key in waiting for key in dependencies.get_item_depends(other)):
+                continue
+            remaining.remove(other)
+            ordered.append(other)
+    items[:] = ordered
+
+
+def plan(items):
+    """
+    Record the setup state following each test, and estimate the time saved by reusing
+    setup states instead of setting them up in every test
+
+    Args:
+            items: Pytest items in run order
+    """
+    global estimated_saving, reused_tests
+    next_states.clear()
+    estimated_saving = 0.0
+    reused_tests = 0
+    states = [get_item_state(item) for item in items]
+    for index, item in enumerate(items):
+        next_states[item.nodeid] = states[index + 1] if index + 1 < len(items) else None
+        if index and states[index] is not None and states[index] == states[index - 1]:
+            estimated_saving += get_cost(states[index])
+            reused_tests += 1
+
+
+def begin_test(state):
+    """
+    Args:
+            state: Setup state declared by the test about to run, None if it declares none
+    """
+    global declared, failed
+    declared = state
+    failed = False
+
+
+def enter(setup, teardown, logger, key=None):
+    """
+    Set up the state declared by the running test, or reuse it if the previous test left it set up
+
+    Args:
+            setup: Function setting up the state, returning a value used by the test or None/False on failure
+            teardown: Function called with the value and a logger to leave the state
+            logger: Handle for logging
+            key: Parameters the state depends on, it is only reused if they match
+
+    Returns:
+            object/None/False: Value returned by setup
+    """
+    global current
+    if current is not None and declared is not None and current[:2] == [declared, key]:
+        logger.info(f"Reusing setup state {declared}")
+        return current[2]
+    leave(logger)
+    value = setup()
+    if value is not None and value is not False:
+        current = [declared, key, value, teardown]
+    return value
+
+
+def leave(logger):
+    """
+    Tear down the current setup state
+
+    Args:
+            logger: Handle for logging
+    """
+    global current
+    if current is None:
+        return
+    name, key, value, teardown = current
+    current = None
+    try:
+        teardown(value, logger)
+    except Exception as e:
+        logger.error(f"Leaving setup state {name} failed - {e}")
+
+
+def mark_failed():
+    """
+    Leave the setup state at the end of the running test, as the test failed
+    """
+    global failed
+    failed = True
+
+
+def end_test(next_state, logger):
+    """
+    Keep the setup state for the next test if it declares the same state, otherwise leave it
+
+    Args:
+            next_state: Setup state declared by the next test, None if it declares none
+            logger: Handle for logging
+    """
+    if current is None:
+        return
+    if failed or in_worker or declared is None or next_state != current[0]:
+        leave(logger)
+
+
+def set_in_worker():
+    """
+    Leave the setup state after the test in a forked worker, the next test runs in another process
+    """
+    global in_worker
+    in_worker = True
+
+
+os.register_at_fork(after_in_child=set_in_worker)
@@ -1,7 +1,15 @@
 # Copyright (C) 2024 Advanced Micro Devices, Inc.
 # SPDX-License-Identifier: MIT
 
-import signal
+import asyncio
+import os
+import selectors
+import stat
+import sys
+import threading
+import time
+from collections import deque
+import log_queue
 
 class TimeoutException(Exception):
     """
@@ -10,31 +18,135 @@ class TimeoutException(Exception):
     pass
 
 
-def timeout_handler(signum, frame):
+class LineReader:
     """
-    Handles SIGALRM signal(timeout event) by raising a TimeoutException
+    Reads lines from a file descriptor for any number of concurrent prompts
+
+    Prompts get lines in the order they started waiting. One waiting prompt at a time
+    polls the descriptor, up to its own deadline, and hands the lines it reads to the others.
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.partial = b""
+        self.lines = deque()
+        self.waiters = deque()
+        self.reading = False
+        self.eof = False
+        self.cond = threading.Condition()
+
+    def wait_readable(self, timeout):
+        # epoll rejects regular files and devices such as /dev/null, reads from them never block
+        if stat.S_ISREG(os.fstat(self.fd).st_mode):
+            return True
+        with selectors.DefaultSelector() as selector:
+            try:
+                selector.register(self.fd, selectors.EVENT_READ)
+            except PermissionError:
+                return True
+            return bool(selector.select(timeout))
+
+    def read(self, timeout):
+        # Called with the condition released, only one prompt reads at a time
+        if not self.wait_readable(timeout):
+            return None
+        return os.read(self.fd, 4096)
+
+    def readline(self, seconds):
+        deadline = time.monotonic() + seconds
+        waiter = object()
+        with self.cond:
+            self.waiters.append(waiter)
+            try:
+                while(1):
+                    if self.lines and self.waiters[0] is waiter:
+                        return self.lines.popleft()
+                    if self.eof and not self.lines:
+                        raise EOFError
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutException
+                    if self.reading or self.lines:
+                        self.cond.wait(remaining)
+                        continue
+                    self.reading = True
+                    self.cond.release()
+                    try:
+                        data = self.read(remaining)
+                    finally:
+                        self.cond.acquire()
+                        self.reading = False
+                    if data == b"":
+                        self.eof = True
+                        if self.partial:
+                            self.lines.append(self.partial.decode(errors='replace'))
+                            self.partial = b""
+                    elif data:
+                        *lines, self.partial = (self.partial + data).split(b"\n")
+                        self.lines.extend(line.decode(errors='replace').rstrip("\r") for line in lines)
+                    self.cond.notify_all()
+            finally:
+                self.waiters.remove(waiter)
+                self.cond.notify_all()
+
+
+# File descriptor -> LineReader
+readers = {}
+readers_lock = threading.Lock()
+
+
+def get_reader(fd):
+    """
+    Args:
+            fd: File descriptor to read
+
+    Returns:
+            LineReader: Shared reader of the file descriptor
     """
-    raise TimeoutException
+    with readers_lock:
+        if fd not in readers:
+            readers[fd] = LineReader(fd)
+        return readers[fd]
+
 
 def input_timeout(seconds):
     """
     Wait for user input with a timeout
 
+    Polls stdin up to a monotonic deadline instead of using SIGALRM, so it can be
+    called from any thread and by several prompts at once.
+
     Args:
             seconds: Timeout in seconds
     Returns:
             str/timeout: Returns user input string/TimeoutException if timeout complete
+
+    Raises:
+            EOFError: stdin is at end of file, as for input()
+    """
+    # Show the queued prompt before waiting on the user
+    log_queue.flush()
+    sys.stdout.flush()
+    return get_reader(sys.stdin.fileno()).readline(seconds)
+
+
+async def input_timeout_async(seconds):
+    """
+    Wait for user input with a timeout without blocking the event loop
+
+    Args:
+            seconds: Timeout in seconds
+    Returns:
+            str/timeout: Returns user input string/TimeoutException if timeout complete
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, input_timeout, seconds)
+
+
+def reset_readers():
+    """
+    Drop the readers inherited from the parent in a forked child, their state belongs to the parent's threads
     """
-    # Set signal alarm to trigger timeout_handler if alarm goes off
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(seconds)
-
-    try:
-        # Wait for user input
-        user_input = input()
-        #If input is received before timeout, cancel the alarm
-        signal.alarm(0)
-        return user_input
-    except TimeoutException:
-        # Raise timeout occurred exception if no input entered within "seconds"
-        raise TimeoutException
+    readers.clear()
+
+
+os.register_at_fork(after_in_child=reset_readers)
@@ -1,15 +1,16 @@
 # Copyright (C) 2023 Advanced Micro Devices, Inc.
 # SPDX-License-Identifier: MIT
 
-import subprocess
 import os
 import re
+from proc_runner import run
 
 def run_tpm2_getcap_test(label, helpers):
     """List all capabilities and verify expected capabilities"""
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("measure")
     cmd = "tpm2_getcap -l"
     logger.info("Running " + cmd)
     expected = [
@@ -27,7 +28,7 @@ def run_tpm2_getcap_test(label, helpers):
         "handles-loaded-session",
         "handles-saved-session",
     ]
-    ret = subprocess.run(cmd.split(' '), check=True, capture_output=True, text=True)
+    ret = run(cmd.split(' '), logger=logger)
     if ret.returncode:
         logger.error("Failed to run " + cmd)
         return False
@@ -47,11 +48,12 @@ def run_tpm2_selftest_test(label, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("measure")
     cmd = "tpm2_selftest"
     logger.info("Running " + cmd)
-    ret = subprocess.run(cmd, check=True)
+    ret = run(cmd.split(' '), logger=logger)
     if ret.returncode:
-        logger.error(cmd + " failed with return code: " + ret)
+        logger.error(cmd + " failed with return code: " + str(ret.returncode))
         return False
     else:
         return True
@@ -61,15 +63,16 @@ def run_tpm2_getrandom_test(label, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("measure")
     # Command to get random hash key with byte length of 30
     cmd = "tpm2_getrandom --hex 30"
     logger.info("Running " + cmd + " test")
     random_data = []
     # Generate 10 hash keys
     for i in range(10):
-        ret = subprocess.run(cmd.split(' '), check=True, capture_output=True, text=True)
+        ret = run(cmd.split(' '), logger=logger)
         if ret.returncode:
-            logger.error(cmd + " failed with return code: " + ret)
+            logger.error(cmd + " failed with return code: " + str(ret.returncode))
             return False
         output = ret.stdout
         if not output:
@@ -89,16 +92,18 @@ def run_tpm2_hash_test(label, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("setup")
     output_dir = helpers.get_output_dir(__file__)
     test_file_name = label + "_test.txt"
     with open(output_dir + '/' + test_file_name, 'w') as f:
         f.write("This is a test file to verify tpm2_hash output.")
 
+    logger.phase("measure")
     cmd = "tpm2_hash " + output_dir + "/" + test_file_name + " --hex"
     logger.info("Running " + cmd)
-    ret = subprocess.run(cmd.split(' '), check=True, capture_output=True, text=True)
+    ret = run(cmd.split(' '), logger=logger)
     if ret.returncode:
-        logger.error(cmd + " failed with return code: " + ret)
+        logger.error(cmd + " failed with return code: " + str(ret.returncode))
         return False
     output = ret.stdout
     if not output:
@@ -118,9 +123,9 @@ def tpm_pcrread(pcr_banks, sha, logger):
     """Helper function to read PCR registers"""
     cmd = "tpm2_pcrread sha" + sha + ":" + pcr_banks
     logger.info("Running " + cmd)
-    ret = subprocess.run(cmd.split(' '), check=True, capture_output=True, text=True)
+    ret = run(cmd.split(' '), logger=logger)
     if ret.returncode:
-        logger.error(cmd + " failed with return code: " + ret)
+        logger.error(cmd + " failed with return code: " + str(ret.returncode))
         return False
     output = ret.stdout
     if not output:
@@ -136,6 +141,7 @@ def run_tpm2_pcrread_test(label, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("measure")
     # PCRs 0-16 should read 0 for both hash algorithms
     hash_algorithms = ['1', '256']
     pcr_banks = '0,1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16'
@@ -155,9 +161,9 @@ def tpm_pcrextend(pcr_register, hash_algorithm, sha_data, logger):
     """Helper function to extend PCR register"""
     cmd = "tpm2_pcrextend " + pcr_register + ":sha" + hash_algorithm + "=" + sha_data
     logger.info("Running " + cmd)
-    ret = subprocess.run(cmd.split(' '), check=True, capture_output=True, text=True)
+    ret = run(cmd.split(' '), logger=logger)
     if ret.returncode:
-        logger.error(cmd + " failed with return code: " + ret)
+        logger.error(cmd + " failed with return code: " + str(ret.returncode))
         return False
     output = tpm_pcrread(pcr_register, hash_algorithm, logger)
     if not output:
@@ -170,6 +176,7 @@ def run_tpm2_pcrextend_test(label, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("measure")
     # Try to extend PCR register 23 with pre-defined hash for both hash algorithms
     # Pass 20 bytes for hash algorithm 1, 32 bytes for 256
     hash_algorithms = ['1', '256']
@@ -200,6 +207,7 @@ def run_tpm2_pcrreset_test(label, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("measure")
     # Try to extend PCR register 23 with pre-defined hash for both hash algorithms,
     # and verify the value is 0 after tpm2_pcrreset
     # Pass 20 bytes for hash algorithm 1, 32 bytes for 256
@@ -217,9 +225,9 @@ def run_tpm2_pcrreset_test(label, helpers):
             return False
         cmd = "tpm2_pcrreset " + pcr_register
         logger.info("Running " + cmd)
-        ret = subprocess.run(cmd.split(' '), check=True)
+        ret = run(cmd.split(' '), logger=logger)
         if ret.returncode:
-            logger.error(cmd + " failed with return code: " + ret)
+            logger.error(cmd + " failed with return code: " + str(ret.returncode))
             return False
         output = tpm_pcrread(pcr_register, hash_algorithms[i], logger)
         if not output:
@@ -3,13 +3,13 @@
 
 supported_boards = {
     'kv260': [
-        {'label': 'tpm2_getcap'},
-        {'label': 'tpm2_selftest'},
-        {'label': 'tpm2_getrandom'},
-        {'label': 'tpm2_hash'},
-        {'label': 'tpm2_pcrread'},
-        {'label': 'tpm2_pcrextend'},
-        {'label': 'tpm2_pcrreset'}
+        {'label': 'tpm2_getcap', 'resources': ['tpm']},
+        {'label': 'tpm2_selftest', 'resources': ['tpm']},
+        {'label': 'tpm2_getrandom', 'resources': ['tpm']},
+        {'label': 'tpm2_hash', 'resources': ['tpm']},
+        {'label': 'tpm2_pcrread', 'resources': ['tpm']},
+        {'label': 'tpm2_pcrextend', 'resources': ['tpm']},
+        {'label': 'tpm2_pcrreset', 'resources': ['tpm']}
     ]
 }
 
@@ -2,8 +2,11 @@
 # SPDX-License-Identifier: MIT
 
 import glob
-import os
-from pymodbus.client import ModbusSerialClient
+import hw_discovery
+import device_pool
+from lazy_import import lazy_import
+
+pymodbus_client = lazy_import("pymodbus.client")
 
 def get_tty_dev_path(controller_name, logger):
     """
@@ -15,26 +18,30 @@ def get_tty_dev_path(controller_name, logger):
     Returns:
             str: Tty dev path or None
     """
-    serial_path = f'/sys/devices/platform/axi/{controller_name}.serial/'
-    tty_path_list = []
-    # Recusrsively walk through directory structure
-    for root, dirs, files in os.walk(serial_path):
-        # Look for directories that start with 'tty'
-        if 'tty' in dirs:
-            tty_dir = os.path.join(root, 'tty')
-            # Check for files starting with 'tty' within 'tty' directory
-            for file in os.listdir(tty_dir):
-                if file.startswith('tty'):
-                    tty_path_list.append(os.path.join(tty_dir, file))
-    if not tty_path_list:
+    tty_devices = hw_discovery.get_index().tty_devices(controller_name)
+    if not tty_devices:
         logger.error("No tty device found for the controller_name: " + controller_name)
         return None
-    tty_number = tty_path_list[0].split('/')[-1]
+    tty_number = tty_devices[0]
     tty_device_path = f"/dev/{tty_number}"
     logger.debug("Controller_name: " + controller_name + ", tty device path: " + tty_device_path)
     return tty_device_path
 
 
+def open_modbus_client(tty_dev_path):
+    """
+    Open a Modbus RTU client on a tty device
+    Args:
+            tty_dev_path: Tty dev path
+
+    Returns:
+            ModbusSerialClient: Connected client
+    """
+    client = pymodbus_client.ModbusSerialClient(method='rtu',port=tty_dev_path,baudrate=9600,bytesize=8,parity='N',stopbits=1)
+    client.connect()
+    return client
+
+
 def run_rs485_temp_humidity_sensor_read(label, controller_name, helpers):
     """
     Measure Temperate and humidity from RS485-temp sensor
@@ -48,15 +55,19 @@ def run_rs485_temp_humidity_sensor_read(label, controller_name, helpers):
     logger = helpers.logger_init(label)
     logger.start_test()
     # Fetch the tty dev path for uart controller
+    logger.phase("discovery")
     tty_dev_path = get_tty_dev_path(controller_name, logger)
     if tty_dev_path is None:
         return False
+    logger.phase("setup")
     try:
-        client = ModbusSerialClient(method='rtu',port=tty_dev_path,baudrate=9600,bytesize=8,parity='N',stopbits=1)
+        # The client is shared by the tests of the session and closed at its end
+        client = device_pool.get_pool().acquire(("modbus", tty_dev_path), lambda: open_modbus_client(tty_dev_path),
+                                                closer=lambda client: client.close())
     except:
         logger.error("Connection with RS485 could not be established. Please make sure the sensor is connected correctly")
         return False
-    client.connect()
+    logger.phase("measure")
     values = client.read_holding_registers(address=0x0,count=0x4,slave=1)
     if values.isError():
         logger.error("Values were not recorded. Please make sure the sensor is connected correctly")
@@ -65,7 +76,6 @@ def run_rs485_temp_humidity_sensor_read(label, controller_name, helpers):
         return False
     logger.info("Temperature: " + str(values.registers[0] / 10) + " Deg C")
     logger.info("Humidity: " + str(values.registers[1] / 10) + " %")
-    client.close()
     logger.test_passed() 
     logger.stop_test()
     return True
@@ -5,7 +5,8 @@ supported_boards = {
     'kd240': [
         {
             'label': 'rs485_temp_humidity_sensor_read',
-            'controller_name': 'ff000000'
+            'controller_name': 'ff000000',
+            'resources': ['rs485']
         }
     ]
 }
\ No newline at end of file
@@ -2,15 +2,18 @@
 # SPDX-License-Identifier: MIT
 
 # Import the 'modules' that are required for test cases execution
-import subprocess
-import glob
 import re
 import filecmp
 import os
-import signal
 import time
-from periphery import MMIO
-from timeout_handler import input_timeout, TimeoutException
+import prompt_manager
+import hw_discovery
+import state_planner
+from cmd_cache import run_cached, invalidate
+from proc_runner import run, spawn
+from lazy_import import lazy_import
+
+periphery = lazy_import("periphery")
 
 
 def get_video_node(pipeline):
@@ -23,15 +26,7 @@ def get_video_node(pipeline):
     Returns:
             string: Video node devpath
     """
-    video_cmd = f"v4l2-ctl --list-devices"
-    video_devices = subprocess.run(video_cmd.split(' '),check=True, capture_output=True, text=True)
-    video_devices = video_devices.stdout.splitlines()
-    for i in range(len(video_devices)):
-        if pipeline in video_devices[i] and i < len(video_devices) - 1:
-            video_node = video_devices[i + 1].replace('\t', '')
-            if "video" in video_node:
-                return video_node
-    return None
+    return hw_discovery.get_index().video_node(pipeline)
 
 
 def get_media_node(pipeline):
@@ -44,16 +39,7 @@ def get_media_node(pipeline):
     Returns:
             string: Media node devpath
     """
-    medias = glob.glob('/dev/media*')
-
-    for media_node in medias:
-        media_cmd = f"media-ctl -d {media_node} -p"
-        media_devices = subprocess.run(media_cmd.split(' '),capture_output=True, check=True, text=True)
-        media_devices = media_devices.stdout.splitlines()
-        for i in range(len(media_devices)):
-            if pipeline in media_devices[i] and i < len(media_devices) - 1:
-                return media_node
-    return None
+    return hw_discovery.get_index().media_node(pipeline)
 
 def lookup_tpg_pattern_name(label, tpg_pattern, video_node):
     """
@@ -68,7 +54,7 @@ def lookup_tpg_pattern_name(label, tpg_pattern, video_node):
             string: Test pattern number
     """
     video_cmd = f"v4l2-ctl -d {video_node} -L"
-    video_settings = subprocess.check_output(video_cmd,shell=True,text=True)
+    video_settings = run_cached(video_cmd.split(' '), "video", check=True).stdout
 
     # Regex for x : "Test Pattern"
     pattern = rf"(\d+)\s*:\s*{tpg_pattern}"
@@ -94,7 +80,8 @@ def set_test_pattern(video_node, tpg_pattern, logger):
     """
     # Set test pattern on given video node
     video_cmd = f"v4l2-ctl -d {video_node} -c test_pattern={tpg_pattern}"
-    process = subprocess.run(video_cmd.split(' '), capture_output=True, check=True, text=True)
+    process = run(video_cmd.split(' '), logger=logger)
+    invalidate("video")
     if process.returncode:
         logger.error("Failed to run v4l2-ctl set test pattern command")
         return False
@@ -121,21 +108,22 @@ def configure_pipeline_imx547(label, media_node, width, height, fps, logger):
     """
     # Configure sensor pad
     cmd = f'media-ctl -d /dev/media0 -V "\\"imx547 7-001a\\":0 [fmt:Y10_1X10/1920x1080 field:none @1/60]"'
-    process = subprocess.run(cmd, shell=True, capture_output=True)
+    process = run(cmd, shell=True, logger=logger)
+    invalidate("video")
     if process.returncode:
         return False
     # Configure PPi-Video IP
-    ppi_ip = MMIO(0xa0030000, 32)
+    ppi_ip = periphery.MMIO(0xa0030000, 32)
     ppi_ip.write32(0,0x000009A8) # 0x9A8 is 2472 pixels (width)
     ppi_ip.close()
-    ppi_ip = MMIO(0xa0030004, 32)
+    ppi_ip = periphery.MMIO(0xa0030004, 32)
     ppi_ip.write32(0,0x00000850) # 0x850 is 2128 lines of pixels (height)
     ppi_ip.close()
     # Configure SLVS-EC IP Core
-    slvs_ip = MMIO(0xa0020000, 32)
+    slvs_ip = periphery.MMIO(0xa0020000, 32)
     slvs_ip.write32(0,0x0000000A)
     slvs_ip.close()
-    slvs_ip = MMIO(0xa002000c, 32)
+    slvs_ip = periphery.MMIO(0xa002000c, 32)
     slvs_ip.write32(0,0x00000001)
     slvs_ip.close()
     logger.info("Extra imx547 pipeline configuration successful")
@@ -155,7 +143,8 @@ def set_test_pattern_ap1302_debugfs(video_node, tpg_pattern, ar1335_tpg_reg, log
     """
     # Disable ap1302 test pattern
     video_cmd = f"v4l2-ctl -d {video_node} -c test_pattern=0"
-    process = subprocess.run(video_cmd.split(' '), capture_output=True, check=True, text=True)
+    process = run(video_cmd.split(' '), logger=logger)
+    invalidate("video")
     if process.returncode:
         logger.error("Failed to run v4l2-ctl disable test pattern command")
         return False
@@ -232,18 +221,15 @@ def run_perf_pipeline(media_node, width, height, fps, fmt, logger):
     # Run the pipeline
     gst_cmd = f"gst-launch-1.0 mediasrcbin media-device={media_node} v4l2src0::num-buffers={buffers} ! video/x-raw," \
               f"width={width},height={height},framerate={fps}/1,format={fmt} ! perf ! fakevideosink"
-    try:
-        process = subprocess.Popen(gst_cmd.split(' '), stdout=subprocess.PIPE)
-        stdout, stderr = process.communicate(timeout=15)
-    except subprocess.TimeoutExpired as e:
-        logger.error("Gstreamer command timed out after " + str(e.timeout) + " seconds. Sensor not connected or faulty")
-        os.kill(process.pid, signal.SIGKILL)
+    gst_timeout = 15
+    process = run(gst_cmd.split(' '), timeout=gst_timeout, logger=logger)
+    if process.timed_out:
+        logger.error("Gstreamer command timed out after " + str(gst_timeout) + " seconds. Sensor not connected or faulty")
         return False
     if process.returncode:
         logger.error("Failed to run Gstreamer command")
         return False
-    perf_output = stdout.decode('utf8')
-    return perf_output
+    return process.stdout
 
 
 def compare_images(test_image_path, golden_image_path, logger):
@@ -287,12 +273,10 @@ def run_filesink_pipeline(label, media_node, width, height, fps, fmt, test_image
     # Run the pipeline
     gst_cmd = f"gst-launch-1.0 mediasrcbin media-device={media_node} v4l2src0::num-buffers=1 ! video/x-raw,width={width}" \
               f",height={height},framerate={fps}/1,format={fmt} ! filesink location={test_image_path}"
-    try:
-        process = subprocess.Popen(gst_cmd.split(' '), stdout=subprocess.PIPE)
-        stdout,stderr = process.communicate(timeout=10)
-    except subprocess.TimeoutExpired as e:
-        logger.error("Gstreamer command timed out after " + str(e.timeout) + " seconds. Sensor not connected or faulty")
-        os.kill(process.pid, signal.SIGKILL)
+    gst_timeout = 10
+    process = run(gst_cmd.split(' '), timeout=gst_timeout, logger=logger)
+    if process.timed_out:
+        logger.error("Gstreamer command timed out after " + str(gst_timeout) + " seconds. Sensor not connected or faulty")
         return False
     if process.returncode:
         logger.error("Failed to run Gstreamer command")
@@ -318,39 +302,25 @@ def run_ximagesink_pipeline(media_node, width, height, fps, fmt, logger, label,
     # Run the pipeline
     gst_cmd = f"gst-launch-1.0 mediasrcbin media-device={media_node} v4l2src0::stride-align=256 ! video/x-raw," \
               f"width={width},height={height},framerate={fps}/1,format={fmt} ! videoconvert ! ximagesink sync=false"
+    logger.phase("confirm")
     logger.info("Please observe the pop-up window")
-    logger.info("Do you see color bar test pattern in the window [Y/N]?")
-    try:
-        process = subprocess.Popen(gst_cmd.split(' '), stdout=subprocess.PIPE)
-        # Test pattern at sensor does not produce expected result with a single write to tgp_reg
-        # Gstreamer pipeline needs to be in running state when second write is performed
-        # When pipeline is running, the second write to tpg_reg is done inside if check which sets the test pattern
-        # This if check block is a temporary workaround
-        if "ar1335_ap1302" in label:
-            ar1335_tpg_reg = "0x02000600"
-            time.sleep(3)
-            result = set_test_pattern_ap1302_debugfs(video_node, tpg_pattern, ar1335_tpg_reg, logger)
-            if not result:
-                ret_val = False
-                os.kill(process.pid, signal.SIGKILL)
-                return ret_val
-        while(1):
-            user_timeout = 30
-            var = input_timeout(user_timeout).strip().upper()
-            if var == 'Y':
-                logger.info("User reports that pattern was observed in the window")
-                ret_val = True
-                break
-            elif var == 'N':
-                logger.error("User reports that pattern was not observed in the window")
-                ret_val = False
-                break
-            else:
-                logger.info("Invalid input, try again")
-    except TimeoutException:
-        logger.error("No user input entered after " + str(user_timeout) + " seconds, aborting test")
-        ret_val = False
-    os.kill(process.pid, signal.SIGKILL)
+    process = spawn(gst_cmd.split(' '), capture=False, logger=logger)
+    # Test pattern at sensor does not produce expected result with a single write to tgp_reg
+    # Gstreamer pipeline needs to be in running state when second write is performed
+    # When pipeline is running, the second write to tpg_reg is done inside if check which sets the test pattern
+    # This if check block is a temporary workaround
+    if "ar1335_ap1302" in label:
+        ar1335_tpg_reg = "0x02000600"
+        time.sleep(3)
+        result = set_test_pattern_ap1302_debugfs(video_node, tpg_pattern, ar1335_tpg_reg, logger)
+        if not result:
+            process.stop()
+            return False
+    # A deferred confirmation leaves the window up for 10s before the test continues
+    ret_val = prompt_manager.confirm(label, "Do you see color bar test pattern in the window", logger,
+                                     observe_time=10,
+                                     evidence={'resolution': f"{width}x{height}@{fps}", 'format': fmt, 'shown for': "10s"})
+    process.stop()
     return ret_val
 
 
@@ -370,6 +340,7 @@ def run_video_filesink_test(label, pipeline, width, height, fps, fmt, tpg_patter
     """
     logger = helpers.logger_init(label)
     logger.start_test()
+    logger.phase("discovery")
     # Function call to fetch video node
     video_node = get_video_node(pipeline)
     if video_node == None:
@@ -389,6 +360,7 @@ def run_video_filesink_test(label, pipeline, width, height, fps, fmt, tpg_patter
         return False
 
     # Function call to set Test pattern
+    logger.phase("setup")
     result = set_test_pattern(video_node, tpg_pattern_num, logger)
     if not result:
         return False
@@ -402,13 +374,17 @@ def run_video_filesink_test(label, pipeline, width, height, fps, fmt, tpg_patter
     golden_image_path = data_dir + "/" + label + "_golden.raw"
 
     # Workaround: Configure imx547 pipeline
+    logger.phase("setup")
     if "imx547" in label:
-        result = configure_pipeline_imx547(label, media_node, width, height, fps, logger)
+        # The configuration is kept for the next test using the same pipeline settings
+        result = state_planner.enter(lambda: configure_pipeline_imx547(label, media_node, width, height, fps, logger),
+                                     lambda configured, logger: None, logger, key=(media_node, width, height, fps))
         if not result:
             logger.error("Failed to configure imx547 pipeline")
             return False
 
     # Function call to generate test image
+    logger.phase("measure")
     output = run_filesink_pipeline(label, media_node, width, height, fps, fmt, test_image_path, logger)
     if not output:
         return False
@@ -437,6 +413,7 @@ def run_video_perf_test(label, pipeline, width, height, fps, fmt, helpers):
     """
     logger = helpers.logger_init(label)
     logger.start_test()
+    logger.phase("discovery")
     # Function call to fetch media node
     media_node = get_media_node(pipeline)
     if media_node == None:
@@ -444,13 +421,17 @@ def run_video_perf_test(label, pipeline, width, height, fps, fmt, helpers):
         return False
 
     # Workaround: Configure imx547 pipeline
+    logger.phase("setup")
     if "imx547" in label:
-        result = configure_pipeline_imx547(label, media_node, width, height, fps, logger)
+        # The configuration is kept for the next test using the same pipeline settings
+        result = state_planner.enter(lambda: configure_pipeline_imx547(label, media_node, width, height, fps, logger),
+                                     lambda configured, logger: None, logger, key=(media_node, width, height, fps))
         if not result:
             logger.error("Failed to configure imx547 pipeline")
             return False
 
     # Function call to fetch perf output
+    logger.phase("measure")
     perf_output = run_perf_pipeline(media_node, width, height, fps, fmt, logger)
     if not perf_output:
         return False
@@ -458,6 +439,7 @@ def run_video_perf_test(label, pipeline, width, height, fps, fmt, helpers):
 
     # Function call to get actual video framerate for captured buffers
     actual_fps = get_framerate(perf_output)
+    logger.record_metric("fps", actual_fps, "fps")
 
     # Function call to check if actual_fps is within accepted range of targetted fps
     result = within_percentage(actual_fps, fps)
@@ -465,7 +447,8 @@ def run_video_perf_test(label, pipeline, width, height, fps, fmt, helpers):
     # Check result and declare pass/fail
     if result:
         logger.info("Actual fps: " + str(actual_fps) + ", Target fps:" + str(fps) + " - Actual fps within accepted range")
-        return True
+        # Compare actual fps with the same pipeline on other boards
+        return logger.check_regression("fps", actual_fps)
     else:
         logger.error("Actual fps: " + str(actual_fps) + ", Target fps:" + str(fps) + " - Actual fps not within accepted range")
         return False
@@ -488,6 +471,7 @@ def run_video_ximagesink_test(label, pipeline, width, height, fps, fmt, tpg_patt
     logger = helpers.logger_init(label)
     logger.start_test()
 
+    logger.phase("discovery")
     # Function call to fetch media node
     media_node = get_media_node(pipeline)
     if media_node == None:
@@ -501,6 +485,7 @@ def run_video_ximagesink_test(label, pipeline, width, height, fps, fmt, tpg_patt
         return False
 
     # Function call to set Test pattern
+    logger.phase("setup")
     if "ar1335_ap1302" in label:
         ar1335_tpg_reg = "0x02000600"
         result = set_test_pattern_ap1302_debugfs(video_node, tpg_pattern, ar1335_tpg_reg, logger)